@@ -0,0 +1,305 @@
+"""İndirme motorları için yerel benchmark aracı
+
+Kullanım:
+    python bench.py engines --files 200 --size 1048576 --concurrency 50 200
+    python bench.py io --size 1073741824 --repeat 3
+    python bench.py providers --files 200 --folders 20 --workers 1 4 8 --output yeni.json --compare eski.json
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from time import perf_counter, process_time, time
+
+from requests import Session
+
+from bot import AsyncEngine, ChunkReader, CloudMailDownloader, GoFileDownloader, Metrics, _format_speed
+from fakeservers import FakeCloudMailServer, FakeGoFileServer, FileServer, make_tree
+
+# Sağlayıcı: (sahte sunucu, indirici, API adresi değişkeni, API yolu, indirme dizini değişkeni, tarama değişkeni)
+PROVIDERS: dict[str, tuple] = {
+    "gofile": (FakeGoFileServer, GoFileDownloader, "GF_APIURL", "", "GF_DOWNLOADDIR", "GF_CRAWLWORKERS"),
+    "cloudmail": (FakeCloudMailServer, CloudMailDownloader, "CM_APIURL", "/api/v2", "CM_DOWNLOADDIR", "CM_CRAWLWORKERS")
+}
+
+
+def _thread_download(url: str, tmp_file: str, local: threading.local) -> None:
+    """Thread havuzu yolundaki akışla indirme döngüsü"""
+    session: Session | None = getattr(local, "session", None)
+    if session is None:
+        session = local.session = Session()
+
+    with session.get(url, stream=True, timeout=(9, 27)) as response:
+        with open(tmp_file, "ab") as handler:
+            for chunk in response.iter_content(chunk_size=65536):
+                handler.write(chunk)
+
+
+def bench_threads(urls: list[str], workdir: str, concurrency: int) -> None:
+    """Thread havuzu yolunu çalıştırma fonksiyonu"""
+    local: threading.local = threading.local()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        wait([
+            executor.submit(_thread_download, url, os.path.join(workdir, f"{i}.part"), local)
+            for i, url in enumerate(urls)
+        ])
+
+
+def bench_async(urls: list[str], workdir: str, concurrency: int) -> None:
+    """asyncio motoru yolunu çalıştırma fonksiyonu"""
+    engine: AsyncEngine = AsyncEngine(limit=concurrency, limit_per_host=concurrency)
+    wait([
+        engine.submit(engine.fetch(url, {}, os.path.join(workdir, f"{i}.part"), lambda size: None))
+        for i, url in enumerate(urls)
+    ])
+    engine.close()
+
+
+class ThreadSampler:
+    """Ölçüm boyunca en yüksek thread sayısını izleyen yardımcı sınıf"""
+
+    def __init__(self, interval: float = 0.01) -> None:
+        self.peak: int = threading.active_count()
+        self._interval: float = interval
+        self._stop: threading.Event = threading.Event()
+        self._thread: threading.Thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            self.peak = max(self.peak, threading.active_count())
+
+    def __enter__(self) -> "ThreadSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def run_engines(args: argparse.Namespace) -> None:
+    """Thread ve asyncio yollarını aynı yük altında karşılaştırma fonksiyonu"""
+    base_url, server = FileServer.spawn({f"f{i}": args.size for i in range(args.files)})
+    urls: list[str] = [f"{base_url}/files/f{i}" for i in range(args.files)]
+    total: int = args.files * args.size
+
+    print(f"{'motor':<8}{'eşzamanlı':>10}{'süre (sn)':>12}{'hız':>14}{'CPU sn/GB':>12}{'thread':>8}")
+    for concurrency in args.concurrency:
+        for name, runner in (("thread", bench_threads), ("async", bench_async)):
+            workdir: str = tempfile.mkdtemp(prefix="bench-")
+            wall: float = perf_counter()
+            cpu: float = process_time()
+
+            with ThreadSampler() as sampler:
+                runner(urls, workdir, concurrency)
+
+            wall = perf_counter() - wall
+            cpu = process_time() - cpu
+            threads: int = sampler.peak
+            shutil.rmtree(workdir)
+
+            print(
+                f"{name:<8}{concurrency:>10}{wall:>12.2f}{_format_speed(total / wall):>14}"
+                f"{cpu / (total / 1024 ** 3):>12.2f}{threads:>8}"
+            )
+
+    server.terminate()
+
+
+def _legacy_copy(session: Session, url: str, tmp_file: str) -> None:
+    """Sabit 16 KB parçalarla ve varsayılan tamponlu dosyayla eski indirme döngüsü"""
+    with session.get(url, stream=True, timeout=(9, 27)) as response:
+        with open(tmp_file, "wb") as handler:
+            for chunk in response.iter_content(chunk_size=16384):
+                handler.write(chunk)
+
+
+def _reader_copy(session: Session, url: str, tmp_file: str) -> None:
+    """Uyarlanır parça boyutu ve yeniden kullanılan tamponla yeni indirme döngüsü"""
+    with session.get(url, stream=True, timeout=(9, 27)) as response:
+        with open(tmp_file, "wb") as handler:
+            ChunkReader.from_env().copy(response, handler.write)
+
+
+def run_io(args: argparse.Namespace) -> None:
+    """Tek akışlı indirmede eski ve yeni G/Ç katmanının GB başına CPU süresini karşılaştırma fonksiyonu"""
+    base_url, server = FileServer.spawn({"io": args.size})
+    url: str = f"{base_url}/files/io"
+    session: Session = Session()
+    workdir: str = tempfile.mkdtemp(prefix="bench-")
+    tmp_file: str = os.path.join(workdir, "io.part")
+
+    print(f"{'yol':<8}{'tekrar':>8}{'süre (sn)':>12}{'hız':>14}{'CPU sn/GB':>12}")
+    for name, runner in (("eski", _legacy_copy), ("yeni", _reader_copy)):
+        for run in range(args.repeat):
+            wall: float = perf_counter()
+            cpu: float = process_time()
+            runner(session, url, tmp_file)
+            wall = perf_counter() - wall
+            cpu = process_time() - cpu
+
+            if os.path.getsize(tmp_file) != args.size:
+                raise RuntimeError(f"{name}: eksik dosya {os.path.getsize(tmp_file)}/{args.size}")
+
+            print(
+                f"{name:<8}{run + 1:>8}{wall:>12.2f}{_format_speed(args.size / wall):>14}"
+                f"{cpu / (args.size / 1024 ** 3):>12.2f}"
+            )
+
+    shutil.rmtree(workdir)
+    server.terminate()
+
+
+def _version() -> str:
+    """Sonuçları etiketlemek için git sürümünü döndürme fonksiyonu"""
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "yerel"
+
+
+def _disk_bytes(root: str) -> tuple[int, int]:
+    """Dizindeki (dosya sayısı, toplam boyut) ikilisini döndürme fonksiyonu"""
+    count, total = 0, 0
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            count += 1
+            total += os.path.getsize(os.path.join(dirpath, filename))
+
+    return count, total
+
+
+def bench_provider(name: str, url: str, workers: int, segments: int) -> dict:
+    """İndiriciyi sahte sunucudaki ağacın tamamı için bir kez çalıştırıp ölçümleri döndürme fonksiyonu"""
+    _, downloader, _, _, dir_env, crawl_env = PROVIDERS[name]
+    workdir: str = tempfile.mkdtemp(prefix="bench-")
+    os.environ[dir_env] = workdir
+    os.environ[crawl_env] = str(workers)
+
+    metrics: Metrics = Metrics.shared()
+    crawl: float = metrics.value("dl_stage_seconds", stage="crawl", provider=name)
+    wall: float = perf_counter()
+    cpu: float = process_time()
+
+    downloader(url, max_workers=workers, segments=segments).run()
+
+    wall = perf_counter() - wall
+    cpu = process_time() - cpu
+    crawl = metrics.value("dl_stage_seconds", stage="crawl", provider=name) - crawl
+    files, total = _disk_bytes(workdir)
+    shutil.rmtree(workdir)
+
+    return {
+        "provider": name,
+        "workers": workers,
+        "files": files,
+        "bytes": total,
+        "seconds": round(wall, 4),
+        "crawl_seconds": round(crawl, 4),
+        "speed": round(total / wall),
+        "cpu_per_gb": round(cpu / (total / 1024 ** 3), 4) if total else None
+    }
+
+
+def run_providers(args: argparse.Namespace) -> None:
+    """GoFile ve Cloud Mail.ru indiricilerini sahte sunuculara karşı farklı işçi sayılarıyla ölçme fonksiyonu"""
+    # Ölçümler önbelleklerden etkilenmesin, çalışma dizinine veritabanı yazılmasın
+    os.environ.update(DL_CREDENTIALDB="", DL_CACHEDB="")
+    tree: dict[str, int] = make_tree(args.files, args.size, args.folders, args.depth)
+    expected: int = sum(tree.values())
+    options: dict = {
+        "latency": args.latency,
+        "bandwidth": args.bandwidth,
+        "fail_rate": args.fail_rate,
+        "drop_rate": args.drop_rate,
+        "seed": 1
+    }
+
+    results: list[dict] = []
+    for name in args.providers:
+        server_class, _, api_env, api_path, _, _ = PROVIDERS[name]
+        base_url, server = server_class.spawn(tree, **options)
+        os.environ[api_env] = f"{base_url}{api_path}"
+
+        for workers in args.workers:
+            for _ in range(args.repeat):
+                result: dict = bench_provider(name, f"{base_url}{server_class.ROOT}", workers, args.segments)
+                if result["files"] != len(tree) or result["bytes"] != expected:
+                    raise RuntimeError(f"{name}: eksik indirme {result['files']}/{len(tree)} dosya")
+                results.append(result)
+
+        server.terminate()
+
+    # İndiriciler konsola ilerleme yazdığı için tablo tüm ölçümler bitince basılır
+    baseline: dict[tuple[str, int], dict] = {}
+    if args.compare:
+        with open(args.compare) as f:
+            previous: dict = json.load(f)
+        baseline = {(result["provider"], result["workers"]): result for result in previous["results"]}
+        print(f"Karşılaştırma: {previous['version']} ({args.compare})")
+
+    print(f"{'sağlayıcı':<11}{'işçi':>6}{'süre (sn)':>11}{'tarama (sn)':>13}{'hız':>14}{'CPU sn/GB':>11}{'fark':>9}")
+    for result in results:
+        old: dict | None = baseline.get((result["provider"], result["workers"]))
+        change: str = f"{(result['speed'] / old['speed'] - 1) * 100:+.1f}%" if old else ""
+        print(
+            f"{result['provider']:<11}{result['workers']:>6}{result['seconds']:>11.2f}{result['crawl_seconds']:>13.2f}"
+            f"{_format_speed(result['speed']):>14}{result['cpu_per_gb'] or 0:>11.2f}{change:>9}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "version": _version(),
+                "time": round(time()),
+                "options": {"files": args.files, "size": args.size, "folders": args.folders, "depth": args.depth, **options},
+                "results": results
+            }, f, indent=2)
+        print(f"Sonuçlar {args.output} dosyasına kaydedildi.")
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    engines = commands.add_parser("engines", help="thread havuzu ile asyncio motorunu karşılaştır")
+    engines.add_argument("--files", type=int, default=200)
+    engines.add_argument("--size", type=int, default=1024 * 1024)
+    engines.add_argument("--concurrency", type=int, nargs="+", default=[16, 64, 200])
+    engines.set_defaults(func=run_engines)
+
+    io = commands.add_parser("io", help="eski ve yeni G/Ç katmanını tek akışta karşılaştır")
+    io.add_argument("--size", type=int, default=1024 ** 3)
+    io.add_argument("--repeat", type=int, default=3)
+    io.set_defaults(func=run_io)
+
+    providers = commands.add_parser("providers", help="GoFile ve Cloud Mail.ru indiricilerini sahte sunuculara karşı ölç")
+    providers.add_argument("--providers", nargs="+", choices=list(PROVIDERS), default=list(PROVIDERS))
+    providers.add_argument("--files", type=int, default=200)
+    providers.add_argument("--size", type=int, default=1024 * 1024)
+    providers.add_argument("--folders", type=int, default=20)
+    providers.add_argument("--depth", type=int, default=2)
+    providers.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    providers.add_argument("--segments", type=int, default=4)
+    providers.add_argument("--repeat", type=int, default=1)
+    providers.add_argument("--latency", type=float, default=0.02, help="sahte sunucuda yanıt başına gecikme (sn)")
+    providers.add_argument("--bandwidth", type=int, default=0, help="bağlantı başına hız (byte/sn), 0 = sınırsız")
+    providers.add_argument("--fail-rate", type=float, default=0.0, help="503 ile reddedilen istek oranı")
+    providers.add_argument("--drop-rate", type=float, default=0.0, help="yarıda kesilen dosya akışı oranı")
+    providers.add_argument("--output", help="sonuçların yazılacağı JSON dosyası (verilmezse yalnızca tablo basılır)")
+    providers.add_argument("--compare", help="hızları karşılaştırılacak önceki sonuç dosyası")
+    providers.set_defaults(func=run_providers)
+
+    args: argparse.Namespace = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,35 @@
+import argparse
+import asyncio
+import json
 import os
 import shutil
+import sqlite3
 import sys
-from os import chdir, getcwd, getenv, listdir, mkdir, path, rmdir
+from abc import ABC, abstractmethod
+from math import ceil
+from os import getcwd, getenv, mkdir, path, rmdir
+from pathlib import Path
+from urllib.parse import quote, unquote, urlsplit
 from sys import exit, stdout, stderr
-from typing import Any, NoReturn, TextIO
+from typing import Any, Callable, NoReturn, TextIO
 from requests import get, post, Session
-from concurrent.futures import ThreadPoolExecutor
-from threading import Lock
+from requests.exceptions import RequestException
+from urllib3.exceptions import HTTPError as Urllib3Error
+from collections import deque
+from contextlib import ExitStack, contextmanager
+from heapq import heappop, heappush
+from email.utils import parsedate_to_datetime
+from http.client import HTTPException
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from random import uniform
+from socket import timeout as socket_timeout
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from threading import BoundedSemaphore, Condition, Event, Lock, Thread, local
 from platform import system
-from hashlib import sha256
+from hashlib import md5, sha1, sha256
+from importlib import import_module
 from shutil import move
-from time import perf_counter
-
-from telegram.ext import Updater, CommandHandler, MessageHandler, Filters
+from time import perf_counter, sleep, time
 
 # Telegram Bot Token ve Hedef Chat ID'yi buraya girin
 TELEGRAM_BOT_TOKEN = 'YOUR_API_KEY'
@@ -20,6 +37,9 @@ TARGET_CHAT_ID = 'YOUR_CHAT_ID'
 
 NEW_LINE: str = "\n" if system() != "Windows" else "\r\n"
 
+# Parçalı indirmede bir segmentin alabileceği en küçük boyut
+SEGMENT_MIN_SIZE: int = 8 * 1024 * 1024
+
 def _print(msg: str, error: bool = False) -> None:
     """Konsola mesaj yazdırma fonksiyonu"""
     output: TextIO = stderr if error else stdout
@@ -31,105 +51,3602 @@ def die(msg: str) -> NoReturn:
     _print(f"{msg}{NEW_LINE}", True)
     exit(-1)
 
+# Host adı → servis adı; link yönlendirmesi servis modülü içe aktarılmadan tek sözlük aramasıyla yapılır
+PROVIDER_HOSTS: dict[str, str] = {}
+# Servis adı → servis sınıfı veya ilk kullanımda içe aktarılacak "modül:Sınıf" yolu
+PROVIDERS: dict[str, Any] = {}
+
+def register_provider(name: str, hosts: tuple[str, ...], provider: Any) -> None:
+    """`Provider` alt sınıfını (veya "modül:Sınıf" yolunu) servis adı ve host adlarıyla kaydetme fonksiyonu"""
+    PROVIDERS[name] = provider
+    for host in hosts:
+        PROVIDER_HOSTS[host.lower()] = name
+
+def get_provider(name: str) -> Any:
+    """Servis adına kayıtlı sınıfı gerekirse modülünü içe aktararak döndürme fonksiyonu, kayıt yoksa None döner"""
+    provider: Any = PROVIDERS.get(name)
+    if isinstance(provider, str):
+        module, _, attribute = provider.partition(":")
+        provider = PROVIDERS[name] = getattr(import_module(module), attribute)
+
+    return provider
+
 def detect_service(url: str) -> str:
-    """URL'nin hangi servise ait olduğunu tespit eden fonksiyon"""
-    if "gofile.io" in url.lower():
-        return "gofile"
-    elif "cloud.mail.ru" in url.lower():
-        return "cloudmail"
-    else:
-        return "unknown"
+    """URL'nin hangi servise ait olduğunu host tablosundan tespit eden fonksiyon"""
+    host: str = (urlsplit(url if "://" in url else f"//{url}").hostname or "").lower()
+    # Alt alan adları (www., store1.) üst alan adının kaydına düşer
+    while host:
+        if host in PROVIDER_HOSTS:
+            return PROVIDER_HOSTS[host]
+        host = host.partition(".")[2]
+
+    return "unknown"
 
-class GoFileDownloader:
-    def __init__(self, url: str, password: str | None = None, max_workers: int = 5, bot=None, chat_id=None) -> None:
-        root_dir: str | None = getenv("GF_DOWNLOADDIR")
+def _format_speed(bytes_per_second: float) -> str:
+    """İndirme hızını formatla"""
+    for unit in ['B/s', 'KB/s', 'MB/s', 'GB/s']:
+        if bytes_per_second < 1024:
+            return f"{bytes_per_second:.1f} {unit}"
+        bytes_per_second /= 1024
+    return f"{bytes_per_second:.1f} TB/s"
 
-        if root_dir and path.exists(root_dir):
-            chdir(root_dir)
+def _format_size(size: float) -> str:
+    """Byte sayısını okunabilir biçime çevirme fonksiyonu"""
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
 
+class Metrics:
+    """Süreç genelindeki sayaç, gösterge ve süre ölçümlerinin kaydı
+
+    Ölçümler istek, dosya ve aşama sınırlarında alınır; parça döngüsünde
+    yalnızca `counter` ile önceden bağlanmış byte sayacı artırılır, böylece
+    indirme hızına etkisi olmaz. `render` Prometheus metin biçimini
+    döndürür; `event` ile yazılan olaylar `log_path` verildiyse JSON satırları
+    olarak o dosyaya ("-" ise stderr'e) eklenir.
+    """
+
+    HELP: dict[str, str] = {
+        "dl_stage_seconds": "Aşama süreleri (auth, crawl, download, upload, job)",
+        "dl_stage_active": "Şu anda çalışan aşama sayısı",
+        "dl_errors_total": "Aşama başına hata sayısı",
+        "dl_bytes_total": "Bu süreçte ağdan indirilen byte sayısı",
+        "dl_files_total": "Sonucuna göre işlenen dosya sayısı",
+        "dl_retries_total": "Geri çekilerek tekrarlanan istek sayısı",
+        "dl_request_failures_total": "Host başına başarısız istek sayısı",
+        "dl_breaker_trips_total": "Host başına açılan devre kesici sayısı",
+        "dl_batch_queue": "Toplu işlerde indirilmeyi bekleyen dosya sayısı",
+        "tg_upload_queue": "Telegram'a gönderilmeyi bekleyen dosya ve mesaj sayısı",
+        "tg_upload_bytes_total": "Telegram'a gönderilen byte sayısı",
+        "bot_jobs_pending": "Kuyrukta bekleyen iş sayısı",
+        "bot_jobs_running": "Çalışan iş sayısı",
+        "bot_jobs_total": "Sonucuna göre biten iş sayısı"
+    }
+    BUCKETS: tuple[float, ...] = (0.05, 0.25, 1, 5, 15, 60, 300, 1800)
+
+    _shared: "Metrics | None" = None
+    _shared_lock: Lock = Lock()
+
+    def __init__(self, log_path: str | None = None) -> None:
         self._lock: Lock = Lock()
-        self._max_workers: int = max_workers
-        token: str | None = getenv("GF_TOKEN")
-        self._message: str = " "
-        self._content_dir: str | None = None
+        self._types: dict[str, str] = {}
+        self._series: dict[str, dict[tuple[tuple[str, str], ...], Any]] = {}
+        self._callbacks: dict[str, Callable[[], float]] = {}
+        self._log: TextIO | None = None
+        if log_path:
+            self._log = stderr if log_path == "-" else open(log_path, "a", buffering=1, encoding="utf-8")
 
-        # Telegram bot ve chat id
-        self.bot = bot
-        self.chat_id = chat_id
+    @classmethod
+    def shared(cls) -> "Metrics":
+        """Süreç genelindeki kaydı ortam değişkenindeki JSON log yoluyla döndürme fonksiyonu"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(getenv("DL_JSONLOG"))
 
-        self._recursive_files_index: int = 0
-        self._files_info: dict[str, dict[str, str]] = {}
+            return cls._shared
 
-        self._root_dir: str = root_dir if root_dir else getcwd()
-        self._token: str = token if token else self._get_token()
+    def _get(self, kind: str, name: str, labels: dict[str, Any]) -> tuple[dict, tuple[tuple[str, str], ...]]:
+        """Metriğin seri sözlüğünü ve etiket anahtarını döndürme fonksiyonu, kilit altında çağrılmalıdır"""
+        self._types.setdefault(name, kind)
+        return self._series.setdefault(name, {}), tuple(sorted((key, str(value)) for key, value in labels.items()))
 
-        self._parse_url_or_file(url, password)
-        
-        # İndirme tamamlandıktan sonra dosyaları Telegram'a gönder
-        self._send_files_to_telegram()
+    def inc(self, name: str, amount: float = 1, **labels: Any) -> None:
+        """Sayacı artırma fonksiyonu"""
+        with self._lock:
+            series, key = self._get("counter", name, labels)
+            series[key] = series.get(key, 0) + amount
 
-    def _send_files_to_telegram(self):
-        """İndirilen dosyaları Telegram'a gönderme fonksiyonu"""
-        if not self._content_dir or not self.bot or not self.chat_id:
+    def counter(self, name: str, **labels: Any) -> Callable[[float], None]:
+        """Etiketleri önceden çözülmüş sayaç artırma fonksiyonu döndürme fonksiyonu, parça başına çağrılan yerler içindir"""
+        with self._lock:
+            series, key = self._get("counter", name, labels)
+            series.setdefault(key, 0)
+
+        def inc(amount: float = 1) -> None:
+            with self._lock:
+                series[key] += amount
+
+        return inc
+
+    def add(self, name: str, amount: float, **labels: Any) -> None:
+        """Göstergeyi verilen miktar kadar değiştirme fonksiyonu"""
+        with self._lock:
+            series, key = self._get("gauge", name, labels)
+            series[key] = series.get(key, 0) + amount
+
+    def value(self, name: str, **labels: Any) -> float:
+        """Serinin güncel değerini, histogramda toplam süreyi döndürme fonksiyonu"""
+        with self._lock:
+            value: Any = self._series.get(name, {}).get(tuple(sorted((key, str(label)) for key, label in labels.items())), 0)
+
+        return value[1] if isinstance(value, tuple) else value
+
+    def register(self, name: str, callback: Callable[[], float]) -> None:
+        """Değeri her okumada `callback` ile hesaplanan göstergeyi kaydetme fonksiyonu"""
+        with self._lock:
+            self._types[name] = "gauge"
+            self._callbacks[name] = callback
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """Süre ölçümünü histograma ekleme fonksiyonu"""
+        with self._lock:
+            series, key = self._get("histogram", name, labels)
+            buckets, total, count = series.get(key) or ([0] * len(self.BUCKETS), 0.0, 0)
+            for i, bound in enumerate(self.BUCKETS):
+                if value <= bound:
+                    buckets[i] += 1
+            series[key] = (buckets, total + value, count + 1)
+
+    @contextmanager
+    def stage(self, stage: str, provider: str, **fields: Any):
+        """Bloğun süresini aşama histogramına ekleyen, hatalarını sayıp olay olarak yazan bağlam yöneticisi"""
+        self.add("dl_stage_active", 1, stage=stage, provider=provider)
+        start: float = perf_counter()
+        ok: bool = True
+        try:
+            yield
+        except BaseException:
+            ok = False
+            self.inc("dl_errors_total", stage=stage, provider=provider)
+            raise
+        finally:
+            elapsed: float = perf_counter() - start
+            self.add("dl_stage_active", -1, stage=stage, provider=provider)
+            self.observe("dl_stage_seconds", elapsed, stage=stage, provider=provider)
+            self.event("stage", stage=stage, provider=provider, seconds=round(elapsed, 6), ok=ok, **fields)
+
+    def event(self, event: str, **fields: Any) -> None:
+        """Olayı JSON satırı olarak loga yazma fonksiyonu, log kapalıysa hiçbir şey yapmaz"""
+        if not self._log:
             return
 
-        for root, dirs, files in os.walk(self._content_dir):
-            for file in files:
-                file_path = os.path.join(root, file)
+        line: str = json.dumps({"time": round(time(), 3), "event": event, **fields}, ensure_ascii=False, default=str)
+        with self._lock:
+            self._log.write(f"{line}\n")
+
+    def render(self) -> str:
+        """Tüm metrikleri Prometheus metin biçiminde döndürme fonksiyonu"""
+        values: dict[str, float] = {name: callback() for name, callback in list(self._callbacks.items())}
+        lines: list[str] = []
+
+        def labels_text(key: tuple[tuple[str, str], ...], extra: tuple[tuple[str, str], ...] = ()) -> str:
+            # JSON dizgesi kaçışları Prometheus etiket değeri kaçışlarıyla (\\, \", \n) aynıdır
+            pairs: list[str] = [f"{label}={json.dumps(value, ensure_ascii=False)}" for label, value in key + extra]
+            return f"{{{','.join(pairs)}}}" if pairs else ""
+
+        with self._lock:
+            for name in sorted(self._types):
+                kind: str = self._types[name]
+                lines.append(f"# HELP {name} {self.HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} {kind}")
+
+                if name in values:
+                    lines.append(f"{name} {values[name]}")
+                    continue
+
+                for key, value in sorted(self._series.get(name, {}).items()):
+                    if kind != "histogram":
+                        lines.append(f"{name}{labels_text(key)} {value}")
+                        continue
+
+                    buckets, total, count = value
+                    for bound, bucket in zip(self.BUCKETS, buckets):
+                        lines.append(f"{name}_bucket{labels_text(key, (('le', str(bound)),))} {bucket}")
+                    lines.append(f"{name}_bucket{labels_text(key, (('le', '+Inf'),))} {count}")
+                    lines.append(f"{name}_sum{labels_text(key)} {total}")
+                    lines.append(f"{name}_count{labels_text(key)} {count}")
+
+        return "\n".join(lines) + "\n"
+
+def serve_metrics(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Metrikleri `/metrics` adresinden sunan HTTP sunucusunu arka plan thread'inde başlatma fonksiyonu"""
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+        def do_GET(self) -> None:
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+
+            body: bytes = Metrics.shared().render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server: ThreadingHTTPServer = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
+
+def probe_size(url: str, headers: dict[str, str], get_func: Callable = get) -> tuple[int | None, bool]:
+    """Range isteğiyle dosya boyutunu ve Range desteğini yoklama fonksiyonu"""
+    probe_headers: dict[str, str] = dict(headers)
+    probe_headers["Range"] = "bytes=0-0"
+    probe_headers["Accept-Encoding"] = "identity"
+
+    with get_func(url, headers=probe_headers, stream=True, timeout=(9, 27)) as response:
+        if response.status_code == 206:
+            total: str = response.headers.get("Content-Range", "").split("/")[-1]
+            if total.isdigit():
+                return int(total), True
+
+        if response.status_code == 200:
+            length: str | None = response.headers.get("Content-Length")
+            return (int(length) if length else None), False
+
+    return None, False
+
+# Bağlantı kopması ve zaman aşımı gibi yeniden denendiğinde düzelebilecek hatalar
+TRANSIENT_ERRORS: tuple[type[BaseException], ...] = (
+    RequestException, Urllib3Error, HTTPException, ConnectionError, TimeoutError, socket_timeout
+)
+
+class CircuitOpenError(Exception):
+    """Host'un devre kesicisi açıkken istek gönderilmediğini bildiren hata"""
+
+class RetryPolicy:
+    """Geçici hataları üstel geri çekilme ve jitter ile yeniden deneyen ortak katman
+
+    `Retry-After` başlığına uyulur ve bu süre boyunca aynı host'a hiç istek
+    gönderilmez. Bir host'ta art arda `breaker_failures` hata olursa devre
+    kesici `breaker_cooldown` saniye açılır; bu sürede o host'a giden istekler
+    ağa çıkmadan bekler, süre dolunca tek bir deneme isteği geçirilir ve
+    sonucuna göre devre kapanır ya da yeniden açılır. Böylece servis kesintisinde
+    yüzlerce worker aynı anda yeniden deneme fırtınası oluşturmaz.
+    """
+
+    RETRY_STATUSES: frozenset[int] = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+    _shared: "RetryPolicy | None" = None
+    _shared_lock: Lock = Lock()
+
+    def __init__(
+        self,
+        attempts: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        breaker_failures: int = 5,
+        breaker_cooldown: float = 30.0
+    ) -> None:
+        self.attempts: int = max(attempts, 1)
+        self.base_delay: float = base_delay
+        self.max_delay: float = max_delay
+        self.breaker_failures: int = breaker_failures
+        self.breaker_cooldown: float = breaker_cooldown
+        self._lock: Lock = Lock()
+        # Host -> {"failures": art arda hata, "open_until": devrenin açık kalacağı an, "probe": deneme isteği anı}
+        self._hosts: dict[str, dict[str, float]] = {}
+
+    @classmethod
+    def shared(cls) -> "RetryPolicy":
+        """Süreç genelindeki politikayı döndürme fonksiyonu"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(
+                    int(getenv("DL_RETRIES", "5")),
+                    float(getenv("DL_RETRYDELAY", "1")),
+                    float(getenv("DL_RETRYMAXDELAY", "60")),
+                    int(getenv("DL_BREAKERFAILURES", "5")),
+                    float(getenv("DL_BREAKERCOOLDOWN", "30"))
+                )
+
+            return cls._shared
+
+    @staticmethod
+    def retry_after(value: str | None) -> float | None:
+        """Saniye veya HTTP tarihi biçimindeki `Retry-After` değerini saniyeye çevirme fonksiyonu"""
+        if not value:
+            return None
+
+        try:
+            seconds: float = float(value)
+        except ValueError:
+            try:
+                seconds = parsedate_to_datetime(value).timestamp() - time()
+            except (TypeError, ValueError):
+                return None
+
+        # Hatalı veya aşırı büyük değerler işi süresiz bekletmesin
+        return min(max(seconds, 0.0), 600.0)
+
+    def backoff(self, attempt: int, retry_after: float | None = None) -> float:
+        """`attempt`. denemeden sonra beklenecek süreyi döndürme fonksiyonu (tam jitter)"""
+        Metrics.shared().inc("dl_retries_total")
+        if retry_after is not None:
+            return retry_after
+
+        return uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def blocked(self, host: str) -> float:
+        """Host'a istek gönderilebiliyorsa 0, değilse beklenecek süreyi döndürme fonksiyonu"""
+        with self._lock:
+            state: dict[str, float] | None = self._hosts.get(host)
+            if not state:
+                return 0.0
+
+            now: float = time()
+            if now < state["open_until"]:
+                return state["open_until"] - now
+
+            if state["failures"] >= self.breaker_failures:
+                # Yarı açık devre: aynı anda yalnızca bir deneme isteği geçer, diğerleri sonucunu bekler
+                if now - state["probe"] < self.breaker_cooldown:
+                    return min(self.breaker_cooldown, 1.0)
+                state["probe"] = now
+
+            return 0.0
+
+    def record(self, host: str, ok: bool, retry_after: float | None = None) -> None:
+        """İsteğin sonucunu host'un devre kesicisine bildirme fonksiyonu"""
+        if not ok:
+            Metrics.shared().inc("dl_request_failures_total", host=host)
+
+        with self._lock:
+            if ok:
+                self._hosts.pop(host, None)
+                return
+
+            state: dict[str, float] = self._hosts.setdefault(host, {"failures": 0, "open_until": 0.0, "probe": 0.0})
+            state["failures"] += 1
+            state["probe"] = 0.0
+            now: float = time()
+            if state["failures"] >= self.breaker_failures:
+                if state["failures"] == self.breaker_failures:
+                    Metrics.shared().inc("dl_breaker_trips_total", host=host)
+                    Metrics.shared().event("breaker_open", host=host, cooldown=self.breaker_cooldown)
+                    _print(f"{host} art arda {self.breaker_failures} kez hata verdi, istekler {self.breaker_cooldown:.0f} sn durduruluyor.{NEW_LINE}")
+                state["open_until"] = max(state["open_until"], now + self.breaker_cooldown)
+            if retry_after:
+                state["open_until"] = max(state["open_until"], now + retry_after)
+
+    def pause(self, delay: float, cancelled: Callable[[], bool] | None = None) -> bool:
+        """İptal edilmedikçe `delay` saniye bekleme fonksiyonu, iptal edildiyse False döner"""
+        deadline: float = perf_counter() + delay
+        while not (cancelled and cancelled()):
+            remaining: float = deadline - perf_counter()
+            if remaining <= 0:
+                return True
+            sleep(min(remaining, 0.25))
+
+        return False
+
+    def call(self, url: str, send: Callable[[], Any], cancelled: Callable[[], bool] | None = None) -> Any:
+        """`send` ile yapılan isteği geçici hatalarda yeniden deneme fonksiyonu
+
+        Son denemede de yeniden denenebilir bir durum kodu dönerse yanıt çağırana
+        verilir; bağlantı hataları ve açık devre ise son hatayla birlikte atılır.
+        """
+        host: str = urlsplit(url).netloc
+        error: BaseException | None = None
+
+        for attempt in range(self.attempts):
+            delay: float = self.blocked(host)
+            if delay:
+                error = CircuitOpenError(f"{host} geçici olarak devre dışı")
+            else:
                 try:
-                    with open(file_path, 'rb') as f:
-                        # Dosyayı Telegram'a gönder
-                        self.bot.send_document(self.chat_id, f)
-                    
-                    # Dosyayı gönderdikten sonra sil
-                    os.remove(file_path)
-                except Exception as e:
-                    self.bot.send_message(self.chat_id, f"Dosya gönderme hatası: {e}")
+                    response: Any = send()
+                except TRANSIENT_ERRORS as e:
+                    self.record(host, False)
+                    error = e
+                    delay = self.backoff(attempt)
+                else:
+                    if response.status_code not in self.RETRY_STATUSES:
+                        self.record(host, True)
+                        return response
 
-        # İçerik dizinini sil
-        if os.path.exists(self._content_dir):
-            shutil.rmtree(self._content_dir)
+                    retry_after: float | None = self.retry_after(response.headers.get("Retry-After"))
+                    self.record(host, False, retry_after)
+                    if attempt == self.attempts - 1:
+                        return response
 
-    def _get_token(self) -> str:
-        """GoFile token alma fonksiyonu"""
-        user_agent: str | None = getenv("GF_USERAGENT")
-        headers: dict[str, str] = {
-            "User-Agent": user_agent if user_agent else "Mozilla/5.0",
-            "Accept-Encoding": "gzip, deflate, br",
-            "Accept": "*/*",
-            "Connection": "keep-alive",
+                    response.close()
+                    error = Exception(f"HTTP {response.status_code}")
+                    delay = self.backoff(attempt, retry_after)
+
+            if attempt == self.attempts - 1:
+                break
+
+            _print(f"{url} yeniden deneniyor ({attempt + 2}/{self.attempts}), {delay:.1f} sn sonra: {str(error)}{NEW_LINE}")
+            if not self.pause(delay, cancelled):
+                break
+
+        raise error
+
+def _body_reader(response: Any) -> Callable[[memoryview], int]:
+    """Yanıt gövdesini verilen tampona okuyan fonksiyonu döndürme fonksiyonu
+
+    Sıkıştırılmamış yanıtlarda alttaki http.client akışına doğrudan `readinto`
+    yapılır ve veri ara `bytes` nesnesi oluşmadan tampona iner. Sıkıştırılmış
+    yanıtlarda açılan veri requests üzerinden okunup tampona kopyalanır.
+    """
+    fp: Any = getattr(response.raw, "_fp", None)
+    if response.headers.get("Content-Encoding", "identity").lower() == "identity" and hasattr(fp, "readinto"):
+        def read(view: memoryview) -> int:
+            size: int = fp.readinto(view) or 0
+            if not size:
+                # Gövde sonuna kadar okunduğu için bağlantı havuza geri verilebilir
+                response._content_consumed = True
+            return size
+
+        return read
+
+    chunks = response.iter_content(chunk_size=65536)
+    pending: bytes = b""
+
+    def read_decoded(view: memoryview) -> int:
+        nonlocal pending
+        if not pending:
+            pending = next(chunks, b"")
+
+        size: int = min(len(view), len(pending))
+        view[:size] = pending[:size]
+        pending = pending[size:]
+        return size
+
+    return read_decoded
+
+class ChunkReader:
+    """Yanıt gövdesini yeniden kullanılan bir tampona okuyup büyük bloklar halinde yazan sınıf
+
+    Okuma boyutu gözlenen hıza göre `min_chunk` ile `max_chunk` arasında
+    büyütülüp küçültülür; hızlı bağlantılarda parça başına Python yükü azalır,
+    yavaş bağlantılarda ilerleme ve iptal gecikmesi kısa kalır. Veri tampon
+    (`buffer_size`) dolana kadar biriktirilip tek seferde yazılır. Tamponlar
+    thread başına bir kez ayrılır ve sonraki indirmelerde yeniden kullanılır.
+    """
+
+    _buffers: local = local()
+
+    def __init__(
+        self,
+        min_chunk: int = 64 * 1024,
+        max_chunk: int = 1024 * 1024,
+        buffer_size: int = 2 * 1024 * 1024,
+        target_time: float = 0.05
+    ) -> None:
+        self.buffer_size: int = max(buffer_size, min_chunk)
+        self.min_chunk: int = min_chunk
+        self.max_chunk: int = min(max(max_chunk, min_chunk), self.buffer_size)
+        self.target_time: float = target_time
+
+    @classmethod
+    def from_env(cls) -> "ChunkReader":
+        """Ortam değişkenlerindeki ayarlarla okuyucu oluşturma fonksiyonu"""
+        return cls(
+            parse_size(getenv("DL_MINCHUNK")) or 64 * 1024,
+            parse_size(getenv("DL_MAXCHUNK")) or 1024 * 1024,
+            parse_size(getenv("DL_WRITEBUFFER")) or 2 * 1024 * 1024
+        )
+
+    def _buffer(self) -> memoryview:
+        """Bu thread'in tamponunu döndürme, yoksa veya küçükse ayırma fonksiyonu"""
+        buffer: memoryview | None = getattr(self._buffers, "buffer", None)
+        if buffer is None or len(buffer) < self.buffer_size:
+            buffer = self._buffers.buffer = memoryview(bytearray(self.buffer_size))
+
+        return buffer[:self.buffer_size]
+
+    def copy(
+        self,
+        response: Any,
+        write: Callable[[memoryview], None],
+        on_chunk: Callable[[int], None] | None = None,
+        cancelled: Callable[[], bool] | None = None,
+        limit: int | None = None,
+        throttle: Callable[[int], None] | None = None
+    ) -> int:
+        """Yanıt gövdesini (en fazla `limit` byte) `write` ile yazma fonksiyonu, okunan byte sayısını döndürür
+
+        `write` tampona ait bir memoryview alır; veriyi çağrı dönmeden yazmalı veya kopyalamalıdır.
+        `throttle` her okumadan sonra okunan byte sayısıyla çağrılır ve hız sınırı için bekletebilir.
+        """
+        read: Callable[[memoryview], int] = _body_reader(response)
+        buffer: memoryview = self._buffer()
+        chunk: int = self.min_chunk
+        filled: int = 0
+        total: int = 0
+
+        try:
+            while limit is None or total < limit:
+                if cancelled and cancelled():
+                    break
+
+                size: int = min(chunk, len(buffer) - filled)
+                if limit is not None:
+                    size = min(size, limit - total)
+
+                start: float = perf_counter()
+                received: int = read(buffer[filled:filled + size])
+                if not received:
+                    break
+                elapsed: float = perf_counter() - start
+
+                filled += received
+                total += received
+                if on_chunk:
+                    on_chunk(received)
+                if throttle:
+                    throttle(received)
+
+                # Hedef süreden hızlı dolan okumalarda parça büyütülür, yavaş olanlarda küçültülür
+                if received == size and elapsed < self.target_time / 2:
+                    chunk = min(chunk * 2, self.max_chunk)
+                elif elapsed > self.target_time * 2:
+                    chunk = max(chunk // 2, self.min_chunk)
+
+                if filled == len(buffer):
+                    write(buffer)
+                    filled = 0
+        finally:
+            if filled:
+                write(buffer[:filled])
+
+        return total
+
+class BandwidthLimiter:
+    """Tüm indirme thread'lerinin paylaştığı token kovası tabanlı bant genişliği sınırlayıcı
+
+    Her iş kendi kovasına sahiptir ve aynı işin tüm thread'leri bu kovadan
+    harcar. Genel sınır, son `window` saniyede veri alan işler arasında adil
+    paylaştırılır: kendi sınırı payının altında kalan işin artanı diğerlerine
+    dağıtılır. Böylece beş worker'lı büyük bir iş tek worker'lı işi ezemez.
+    Sınırlar çalışırken `set_global` ve `set_job` ile değiştirilebilir; 0 sınırsız demektir.
+    """
+
+    _shared: "BandwidthLimiter | None" = None
+    _shared_lock: Lock = Lock()
+
+    def __init__(self, global_rate: int = 0, job_rate: int = 0, burst: float = 0.25, window: float = 1.0) -> None:
+        self._lock: Lock = Lock()
+        self.global_rate: int = global_rate
+        self.job_rate: int = job_rate
+        self._burst: float = burst
+        self._window: float = window
+        # İş -> {"limit": özel sınır veya None, "rate": güncel pay, "tat": kovanın boşalacağı an, "seen": son veri}
+        self._jobs: dict[Any, dict[str, Any]] = {}
+        self._balanced: float = 0.0
+
+    @classmethod
+    def shared(cls) -> "BandwidthLimiter":
+        """Süreç genelindeki sınırlayıcıyı döndürme fonksiyonu"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(parse_size(getenv("DL_RATELIMIT")), parse_size(getenv("DL_JOBRATELIMIT")))
+
+            return cls._shared
+
+    def _job(self, job_id: Any) -> dict[str, Any]:
+        """İşin kova durumunu döndürme, yoksa oluşturma fonksiyonu"""
+        job: dict[str, Any] | None = self._jobs.get(job_id)
+        if job is None:
+            job = self._jobs[job_id] = {"limit": None, "rate": 0.0, "tat": 0.0, "seen": 0.0}
+        return job
+
+    def _rebalance(self, now: float) -> None:
+        """Genel sınırı etkin işler arasında en küçük sınırdan başlayarak paylaştırma fonksiyonu"""
+        self._balanced = now
+        caps: list[tuple[float, dict[str, Any]]] = []
+        for job in self._jobs.values():
+            limit: int = job["limit"] if job["limit"] is not None else self.job_rate
+            job["rate"] = float(limit)
+            if now - job["seen"] <= self._window:
+                caps.append((float(limit) or float("inf"), job))
+
+        if not self.global_rate:
+            return
+
+        remaining: float = float(self.global_rate)
+        caps.sort(key=lambda item: item[0])
+        for count, (cap, job) in enumerate(caps):
+            job["rate"] = min(cap, remaining / (len(caps) - count))
+            remaining -= job["rate"]
+
+    def set_global(self, rate: int) -> None:
+        """Genel sınırı değiştirme fonksiyonu"""
+        with self._lock:
+            self.global_rate = rate
+            self._rebalance(perf_counter())
+
+    def set_job_default(self, rate: int) -> None:
+        """Özel sınırı olmayan işlerin varsayılan sınırını değiştirme fonksiyonu"""
+        with self._lock:
+            self.job_rate = rate
+            self._rebalance(perf_counter())
+
+    def set_job(self, job_id: Any, rate: int | None) -> None:
+        """İşe özel sınırı değiştirme fonksiyonu, None verilirse varsayılan iş sınırına döner"""
+        with self._lock:
+            self._job(job_id)["limit"] = rate
+            self._rebalance(perf_counter())
+
+    def job_limit(self, job_id: Any) -> int:
+        """İşe özel veya varsayılan sınırı döndürme fonksiyonu"""
+        with self._lock:
+            job: dict[str, Any] | None = self._jobs.get(job_id)
+            return job["limit"] if job and job["limit"] is not None else self.job_rate
+
+    def rates(self) -> dict[Any, float]:
+        """Etkin işlerin güncel paylarını döndürme fonksiyonu, 0 sınırsız demektir"""
+        with self._lock:
+            now: float = perf_counter()
+            return {job_id: job["rate"] for job_id, job in self._jobs.items() if now - job["seen"] <= self._window}
+
+    def release(self, job_id: Any) -> None:
+        """Biten işin kovasını silip payını diğer işlere bırakma fonksiyonu"""
+        with self._lock:
+            if self._jobs.pop(job_id, None) is not None:
+                self._rebalance(perf_counter())
+
+    def reserve(self, job_id: Any, size: int) -> float:
+        """İşin kovasından `size` byte harcayıp beklenmesi gereken süreyi döndürme fonksiyonu"""
+        with self._lock:
+            now: float = perf_counter()
+            job: dict[str, Any] = self._job(job_id)
+            if now - job["seen"] > self._window:
+                # Yeni etkinleşen iş paylaşıma katılır, uzun süre boşta kalan kova birikmiş hak taşımaz
+                job["seen"] = job["tat"] = now
+                self._rebalance(now)
+            elif now - self._balanced > self._window / 4:
+                # Boşa çıkan işlerin payı düzenli aralıklarla diğerlerine dağıtılır
+                job["seen"] = now
+                self._rebalance(now)
+            job["seen"] = now
+
+            rate: float = job["rate"]
+            if not rate:
+                return 0.0
+
+            # GCRA: kova `burst` saniyelik veriyi bekletmeden geçirir, fazlası hız oranında bekletilir
+            job["tat"] = max(job["tat"], now) + size / rate
+            # Bekleyen iş, beklemesi bitene kadar etkin sayılır ve payını korur
+            job["seen"] = max(now, job["tat"] - self._burst)
+            return max(job["tat"] - now - self._burst, 0.0)
+
+    def throttle(self, job_id: Any, size: int, cancelled: Callable[[], bool] | None = None) -> None:
+        """Sınır aşıldıysa gerektiği kadar bekleme fonksiyonu, iptalde beklemeyi keser"""
+        delay: float = self.reserve(job_id, size)
+        deadline: float = perf_counter() + delay
+        while delay > 0 and not (cancelled and cancelled()):
+            sleep(min(delay, 0.25))
+            delay = deadline - perf_counter()
+
+    async def throttle_async(self, job_id: Any, size: int) -> None:
+        """`throttle` fonksiyonunun olay döngüsünü bloklamayan sürümü"""
+        delay: float = self.reserve(job_id, size)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+class MailRuHash:
+    """Cloud Mail.ru dosya özetini hashlib arayüzüyle hesaplayan sınıf
+
+    20 byte ve daha kısa dosyalarda özet içeriğin sıfırla 20 byte'a tamamlanmış
+    halidir, daha uzun dosyalarda sha1("mrCloud" + içerik + ondalık boyut) olur.
+    """
+
+    def __init__(self) -> None:
+        self._sha1 = sha1(b"mrCloud")
+        self._head: bytearray = bytearray()
+        self._size: int = 0
+
+    def update(self, data: bytes | memoryview) -> None:
+        """Özete veri ekleme fonksiyonu"""
+        if self._size < 20:
+            self._head += data[:20 - self._size]
+        self._sha1.update(data)
+        self._size += len(data)
+
+    def hexdigest(self) -> str:
+        """Özeti büyük harfli onaltılık olarak döndürme fonksiyonu"""
+        if self._size <= 20:
+            return bytes(self._head).ljust(20, b"\0").hex().upper()
+
+        digest = self._sha1.copy()
+        digest.update(str(self._size).encode())
+        return digest.hexdigest().upper()
+
+class StreamHasher:
+    """Dosyaya yazılan veriyi yazılırken özetleyip sağlayıcının bildirdiği özetle karşılaştıran sınıf
+
+    Özet sıralı hesaplandığı için yalnızca özetlenmiş kısmın hemen arkasına
+    yazılan veri anında özete eklenir. Paralel segmentlerin ileride yazdığı
+    aralıklar yalnızca kaydedilir ve özet o aralığa ulaştığında diskten
+    (genellikle sayfa önbelleğinden) okunur. Tek akışlı indirmelerde veri hiç
+    yeniden okunmaz; kaldığı yerden devam eden indirmelerde yalnızca önceki
+    çalışmada yazılmış kısım bir kez okunur.
+    """
+
+    ALGORITHMS: dict[str, Callable[[], Any]] = {"md5": md5, "mailru": MailRuHash}
+
+    def __init__(self, filepath: str, algorithm: str, expected: str) -> None:
+        self.filepath: str = filepath
+        self.algorithm: str = algorithm
+        self.expected: str = expected.lower()
+        self.digest: str | None = None
+        self._hash: Any = self.ALGORITHMS[algorithm]()
+        self._frontier: int = 0
+        # Özetin henüz ulaşmadığı, diske yazılmış aralıklar (başlangıç -> bitiş)
+        self._extents: dict[int, int] = {}
+        self._lock: Lock = Lock()
+
+    def update(self, offset: int, data: bytes | memoryview) -> None:
+        """Dosyada `offset` konumuna yazılmış veriyi özete ekleme veya sonrası için kaydetme fonksiyonu"""
+        end: int = offset + len(data)
+        with self._lock:
+            if offset <= self._frontier < end:
+                self._hash.update(data[self._frontier - offset:])
+                self._frontier = end
+                self._catch_up()
+            elif offset > self._frontier:
+                self._record(offset, end)
+
+    def written(self, start: int, end: int) -> None:
+        """Önceki çalışmada diske yazılmış aralığı özete katılmak üzere kaydetme fonksiyonu"""
+        with self._lock:
+            if end > self._frontier:
+                self._record(max(start, self._frontier), end)
+                self._catch_up()
+
+    def _record(self, start: int, end: int) -> None:
+        """Aralığı, bitişik veya çakışan bir kaydı genişleterek ekleme fonksiyonu"""
+        for known_start, known_end in self._extents.items():
+            if known_start <= start <= known_end:
+                self._extents[known_start] = max(known_end, end)
+                return
+
+        self._extents[start] = end
+
+    def _catch_up(self) -> None:
+        """Özetin ulaştığı kayıtlı aralıkları diskten okuyup özete ekleme fonksiyonu"""
+        while True:
+            for start in [start for start, end in self._extents.items() if end <= self._frontier]:
+                del self._extents[start]
+
+            start: int | None = next((start for start in self._extents if start <= self._frontier), None)
+            if start is None:
+                return
+
+            self._read(self._extents.pop(start))
+
+    def _read(self, end: int) -> None:
+        """Dosyanın özetlenmemiş kısmını `end` byte'ına kadar okuyup özete ekleme fonksiyonu"""
+        buffer: memoryview = memoryview(bytearray(1024 * 1024))
+        with open(self.filepath, "rb") as f:
+            f.seek(self._frontier)
+            while self._frontier < end:
+                size: int = f.readinto(buffer[:min(len(buffer), end - self._frontier)])
+                if not size:
+                    break
+                self._hash.update(buffer[:size])
+                self._frontier += size
+
+    def verify(self, size: int) -> bool:
+        """Özeti `size` byte'a tamamlayıp sağlayıcının özetiyle karşılaştırma fonksiyonu"""
+        with self._lock:
+            if self._frontier < size:
+                self._read(size)
+            self.digest = self._hash.hexdigest().lower()
+
+        return self.digest == self.expected
+
+class SegmentedDownload:
+    """Bir dosyayı byte aralıklarına bölüp paralel indiren sınıf
+
+    Segmentler önceden ayrılmış `.part` dosyasına kendi ofsetlerinden yazılır,
+    tamamlanan segmentler `.segments` dosyasında tutulur. Böylece yarıda kalan
+    bir indirme yalnızca eksik segmentlerden devam eder.
+
+    `part_size` verilirse her segment `dosya.001`, `dosya.002` ... adlı ayrı bir
+    parça dosyasına yazılır ve SHA-256 özeti yazılırken hesaplanır; biten
+    parçalar `on_part` ile numara sırasıyla bildirilir, önündeki parça henüz
+    inmemiş parça onu bekler. `throttle` verilirse okunan her blok
+    için çağrılır ve hız sınırı için bekletebilir. `retry` verilirse yarıda
+    kopan segment son yazılan byte'tan Range ile yeniden bağlanarak tamamlanır.
+    `hasher` verilirse segmentler yazılırken özetlenir ve özeti tutmayan dosya
+    silinip `corrupt` işaretlenir.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        filepath: str,
+        total_size: int,
+        headers: dict[str, str],
+        segments: int,
+        get_func: Callable = get,
+        cancel_event: Event | None = None,
+        part_size: int = 0,
+        throttle: Callable[[int], None] | None = None,
+        retry: RetryPolicy | None = None,
+        hasher: StreamHasher | None = None
+    ) -> None:
+        self.url: str = url
+        self.filepath: str = filepath
+        self.tmp_file: str = f"{filepath}.part"
+        self.state_file: str = f"{filepath}.segments"
+        self.total_size: int = total_size
+        self.part_size: int = part_size
+        self._get = get_func
+        self._cancel_event: Event | None = cancel_event
+        self._throttle: Callable[[int], None] | None = throttle
+        self._retry: RetryPolicy | None = retry
+        # Parça dosyalarına bölünen indirmelerde tüm dosya diskte bir arada durmadığı için özetlenmez
+        self._hasher: StreamHasher | None = hasher if not part_size else None
+        self.corrupt: bool = False
+        self._lock: Lock = Lock()
+
+        self._headers: dict[str, str] = dict(headers)
+        self._headers["Accept-Encoding"] = "identity"
+        self._headers.pop("Range", None)
+
+        segment_size: int = part_size or max(ceil(total_size / max(segments, 1)), SEGMENT_MIN_SIZE)
+        self._done: set[int] = set()
+        self.hashes: dict[int, str] = {}
+        # Biten ama sırası gelmediği için henüz bildirilmeyen parçalar ve sıradaki parça
+        self._ready: set[int] = set()
+        self._next_part: int = 0
+        self._notify_lock: Lock = Lock()
+
+        state: dict[str, Any] = self._load_state()
+        if state.get("size") == total_size and state.get("part_size", 0) == part_size \
+                and (part_size or path.isfile(self.tmp_file)):
+            segment_size = state["segment_size"]
+            self._done = set(state["done"])
+            self.hashes = {int(index): digest for index, digest in state.get("hashes", {}).items()}
+
+        self.segment_size: int = segment_size
+        self.count: int = ceil(total_size / segment_size)
+        self.downloaded: int = sum(self._segment_length(i) for i in self._done)
+
+        self._fd: int | None = None
+        if not part_size:
+            flags: int = os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0)
+            self._fd = os.open(self.tmp_file, flags)
+            if not self._done:
+                # Durum dosyası dosya büyütülmeden önce yazılır; böylece tam boyutlu ama
+                # içi boş bir .part, segment durumu olmadan diskte kalmaz ve tamamlanmış sanılmaz
+                self._save_state()
+                os.ftruncate(self._fd, total_size)
+                # İstenirse bloklar baştan ayrılır; dosya parçalanmaz, disk dolarsa indirme başlamadan anlaşılır
+                if getenv("DL_FALLOCATE") == "1" and hasattr(os, "posix_fallocate"):
+                    os.posix_fallocate(self._fd, 0, total_size)
+
+        # Önceki çalışmada tamamlanan segmentler özet onlara ulaştığında diskten okunur
+        if self._hasher:
+            for index in sorted(self._done):
+                start, end = self._segment_range(index)
+                self._hasher.written(start, end + 1)
+
+    def _load_state(self) -> dict[str, Any]:
+        """Segment durum dosyasını okuma fonksiyonu"""
+        try:
+            with open(self.state_file, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self) -> None:
+        """Segment durum dosyasını atomik olarak yazma fonksiyonu"""
+        state: dict[str, Any] = {
+            "size": self.total_size,
+            "segment_size": self.segment_size,
+            "part_size": self.part_size,
+            "done": sorted(self._done),
+            "hashes": self.hashes
         }
+        tmp_state: str = f"{self.state_file}.tmp"
+        with open(tmp_state, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_state, self.state_file)
 
-        create_account_response: dict[Any, Any] = post("https://api.gofile.io/accounts", headers=headers).json()
+    def _segment_range(self, index: int) -> tuple[int, int]:
+        """Segmentin başlangıç ve bitiş byte'ını döndürme fonksiyonu"""
+        start: int = index * self.segment_size
+        end: int = min(start + self.segment_size, self.total_size) - 1
+        return start, end
 
-        if create_account_response["status"] != "ok":
-            die("Account creation failed!")
+    def _segment_length(self, index: int) -> int:
+        """Segmentin byte cinsinden uzunluğunu döndürme fonksiyonu"""
+        start, end = self._segment_range(index)
+        return end - start + 1
 
-        return create_account_response["data"]["token"]
+    def part_path(self, index: int) -> str:
+        """Parça dosyasının yolunu döndürme fonksiyonu"""
+        return f"{self.filepath}.{index + 1:03d}"
+
+    def _write(self, data: bytes, offset: int) -> None:
+        """Veriyi dosyada verilen ofsete yazma fonksiyonu"""
+        if hasattr(os, "pwrite"):
+            view = memoryview(data)
+            while view:
+                written: int = os.pwrite(self._fd, view, offset)
+                view = view[written:]
+                offset += written
+            return
+
+        with self._lock:
+            os.lseek(self._fd, offset, os.SEEK_SET)
+            os.write(self._fd, data)
+
+    def _fetch(
+        self,
+        index: int,
+        on_progress: Callable[[int], None],
+        on_part: Callable[[str, int, int, str], None] | None = None
+    ) -> bool:
+        """Tek bir segmenti indirme fonksiyonu, bağlantı koparsa kalan kısmı yeniden ister"""
+        start, end = self._segment_range(index)
+        headers: dict[str, str] = dict(self._headers)
+
+        part_file: str = f"{self.part_path(index)}.part"
+        handler = open(part_file, "wb") if self.part_size else None
+        hasher = sha256()
+
+        offset: int = start
+
+        def write(view: memoryview) -> None:
+            nonlocal offset
+            if handler:
+                handler.write(view)
+                hasher.update(view)
+            else:
+                self._write(view, offset)
+                if self._hasher:
+                    self._hasher.update(offset, view)
+            offset += len(view)
+
+        def on_chunk(size: int) -> None:
+            with self._lock:
+                self.downloaded += size
+                downloaded: int = self.downloaded
+            on_progress(downloaded)
+
+        cancelled: Callable[[], bool] = lambda: bool(self._cancel_event and self._cancel_event.is_set())
+        attempts: int = self._retry.attempts if self._retry else 1
+        failures: int = 0
+
+        try:
+            while offset <= end and not cancelled():
+                resumed_from: int = offset
+                headers["Range"] = f"bytes={offset}-{end}"
+                try:
+                    with self._get(self.url, headers=headers, stream=True, timeout=(9, 27)) as response:
+                        if response.status_code != 206:
+                            _print(f"{self.url} segment {index} indirilemedi. Durum kodu: {response.status_code}{NEW_LINE}")
+                            break
+
+                        ChunkReader.from_env().copy(response, write, on_chunk, cancelled, end - offset + 1, self._throttle)
+                except TRANSIENT_ERRORS as e:
+                    _print(f"{self.url} segment {index} bağlantısı koptu: {str(e)}{NEW_LINE}")
+                except Exception as e:
+                    _print(f"{self.url} segment {index} hatası: {str(e)}{NEW_LINE}")
+                    break
+
+                if offset > end or cancelled():
+                    break
+
+                # Veri alınan bağlantılardan sonra sayaç sıfırlanır, yalnızca art arda boş denemeler sınıra sayılır
+                failures = 0 if offset > resumed_from else failures + 1
+                if not self._retry or failures >= attempts or \
+                        not self._retry.pause(self._retry.backoff(failures), cancelled):
+                    break
+        finally:
+            if handler:
+                handler.close()
+
+        with self._lock:
+            if offset <= end:
+                # Yarım kalan segmentin baytlarını ilerlemeden düş
+                self.downloaded -= offset - start
+                return False
+
+            if handler:
+                os.replace(part_file, self.part_path(index))
+                self.hashes[index] = hasher.hexdigest()
+                self._ready.add(index)
+
+            self._done.add(index)
+            self._save_state()
+
+        if handler and on_part:
+            self._notify_parts(on_part)
+
+        return True
+
+    def _notify_parts(self, on_part: Callable[[str, int, int, str], None], flush: bool = False) -> None:
+        """Biten parçaları numara sırasıyla bildirme fonksiyonu, `flush` verilirse inmeyen parçalar atlanır"""
+        with self._notify_lock:
+            while True:
+                with self._lock:
+                    # Önceki çalışmada gönderilip silinmiş parçalar atlanır
+                    while self._next_part < self.count and self._next_part not in self._ready and \
+                            (flush or self._next_part in self._done):
+                        self._next_part += 1
+                    if self._next_part not in self._ready:
+                        return
+
+                    index: int = self._next_part
+                    self._ready.discard(index)
+                    self._next_part += 1
+
+                on_part(self.part_path(index), index, self._segment_length(index), self.hashes[index])
+
+    def run(
+        self,
+        executor: ThreadPoolExecutor | None,
+        on_progress: Callable[[int], None],
+        on_part: Callable[[str, int, int, str], None] | None = None
+    ) -> bool:
+        """Eksik segmentleri indirip dosyayı tamamlama fonksiyonu
+
+        Segmentler verilen havuza gönderilir; havuzda henüz başlamamış olan
+        segmentler çağıran thread tarafından çalıştırılır. Böylece indirme
+        fonksiyonu aynı havuzdan çağrıldığında kilitlenme oluşmaz.
+        """
+        pending: list[int] = [i for i in range(self.count) if i not in self._done]
+        ok: bool = True
+
+        # Önceki çalışmada tamamlanıp henüz gönderilmemiş parçalar sıradaki yerlerinde yeniden bildirilir
+        if self.part_size and on_part:
+            with self._lock:
+                self._ready = {index for index in self._done if path.isfile(self.part_path(index))}
+            self._notify_parts(on_part)
+
+        try:
+            if executor is None:
+                for index in pending:
+                    ok = self._fetch(index, on_progress, on_part) and ok
+            else:
+                futures = [(i, executor.submit(self._fetch, i, on_progress, on_part)) for i in pending]
+                for index, future in futures:
+                    if future.cancel():
+                        ok = self._fetch(index, on_progress, on_part) and ok
+                    else:
+                        ok = future.result() and ok
+        finally:
+            if self._fd is not None:
+                os.close(self._fd)
+
+        # Eksik segment kaldıysa arkasında bekleyen parçalar da sırayla bildirilir
+        if self.part_size and on_part:
+            self._notify_parts(on_part, flush=True)
+
+        if not ok or len(self._done) != self.count:
+            return False
+
+        if self._hasher and not self._hasher.verify(self.total_size):
+            # Bozuk dosyadan devam edilmez, sonraki deneme baştan indirir
+            self.corrupt = True
+            os.remove(self.tmp_file)
+            os.remove(self.state_file)
+            return False
+
+        if not self.part_size:
+            move(self.tmp_file, self.filepath)
+        if path.exists(self.state_file):
+            os.remove(self.state_file)
+
+        return True
+
+class SplitWriter:
+    """Akış halinde gelen veriyi sabit boyutlu numaralı parçalara yazan sınıf
+
+    Range desteklemeyen sunucularda kullanılır. Her parça dolduğu anda
+    kapatılır, SHA-256 özeti yazılırken hesaplanır ve `on_part` ile bildirilir;
+    dosya hiçbir zaman tekrar okunmaz.
+    """
+
+    def __init__(
+        self,
+        filepath: str,
+        total_size: int,
+        part_size: int,
+        on_part: Callable[[str, int, int, str], None]
+    ) -> None:
+        self.filepath: str = filepath
+        self.total_size: int = total_size
+        self.part_size: int = part_size
+        self.size: int = 0
+        self.hashes: dict[int, str] = {}
+        self._on_part = on_part
+        self._index: int = 0
+        self._written: int = 0
+        self._handler = None
+        self._hasher = sha256()
+
+    def part_path(self, index: int) -> str:
+        """Parça dosyasının yolunu döndürme fonksiyonu"""
+        return f"{self.filepath}.{index + 1:03d}"
+
+    def write(self, data: bytes) -> None:
+        """Veriyi parçalara bölerek yazma fonksiyonu"""
+        view = memoryview(data)
+        while view:
+            if self._handler is None:
+                self._handler = open(f"{self.part_path(self._index)}.part", "wb")
+                self._hasher = sha256()
+                self._written = 0
+
+            chunk = view[:self.part_size - self._written]
+            self._handler.write(chunk)
+            self._hasher.update(chunk)
+            self._written += len(chunk)
+            self.size += len(chunk)
+            view = view[len(chunk):]
+
+            if self._written == self.part_size:
+                self._finish_part()
+
+    def _finish_part(self) -> None:
+        """Açık parçayı kapatıp bildirme fonksiyonu"""
+        self._handler.close()
+        self._handler = None
+        os.replace(f"{self.part_path(self._index)}.part", self.part_path(self._index))
+        self.hashes[self._index] = self._hasher.hexdigest()
+        self._on_part(self.part_path(self._index), self._index, self._written, self.hashes[self._index])
+        self._index += 1
+
+    @property
+    def complete(self) -> bool:
+        return self.size == self.total_size
+
+    def close(self) -> None:
+        """Son parçayı tamamlama, dosya yarım kaldıysa son parçayı silme fonksiyonu"""
+        if self._handler is None:
+            return
+
+        if self.complete:
+            self._finish_part()
+        else:
+            self._handler.close()
+            self._handler = None
+            os.remove(f"{self.part_path(self._index)}.part")
+
+    def __enter__(self) -> "SplitWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+def build_manifest(filename: str, total_size: int, hashes: dict[int, str]) -> str:
+    """Parçaların SHA-256 listesini ve birleştirme talimatını içeren mesajı oluşturma fonksiyonu"""
+    lines: list[str] = [f"📦 {filename} ({total_size} bayt) {len(hashes)} parçaya bölündü.", ""]
+    lines += [f"{hashes[index]}  {filename}.{index + 1:03d}" for index in sorted(hashes)]
+    lines += [
+        "",
+        "Doğrulama: sha256sum -c <bu mesajın satırları>",
+        f"Birleştirme (Linux/macOS): cat \"{filename}\".[0-9][0-9][0-9] > \"{filename}\"",
+        f"Birleştirme (Windows): copy /b \"{filename}.001\"+\"{filename}.002\"+... \"{filename}\""
+    ]
+    return "\n".join(lines)
+
+class AsyncFileWriter:
+    """Parçaları biriktirip diske olay döngüsünü bloklamadan yazan sınıf
+
+    Tampon dolduğunda yazma işlemi varsayılan executor'a devredilir; aynı anda
+    en fazla bir yazma beklediği için sıra korunur ve ağdan okuma sürerken
+    disk yazması arka planda tamamlanır.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, filepath: str, buffer_size: int = 1024 * 1024) -> None:
+        self._loop: asyncio.AbstractEventLoop = loop
+        self._handler = open(filepath, "ab")
+        self._buffer: bytearray = bytearray()
+        self._buffer_size: int = buffer_size
+        self._pending: asyncio.Future | None = None
+
+    async def write(self, data: bytes) -> None:
+        """Veriyi tampona ekleme, tampon dolduysa diske gönderme fonksiyonu"""
+        self._buffer += data
+        if len(self._buffer) >= self._buffer_size:
+            await self._flush()
+
+    async def _flush(self) -> None:
+        """Tampondaki veriyi arka planda diske yazma fonksiyonu"""
+        if self._pending:
+            await self._pending
+
+        data: bytes = bytes(self._buffer)
+        self._buffer.clear()
+        self._pending = self._loop.run_in_executor(None, self._handler.write, data)
+
+    async def close(self) -> None:
+        """Kalan veriyi yazıp dosyayı kapatma fonksiyonu"""
+        try:
+            if self._buffer:
+                await self._flush()
+            if self._pending:
+                await self._pending
+        finally:
+            self._handler.close()
+
+class AsyncEngine:
+    """Tüm indiricilerin paylaştığı asyncio tabanlı indirme motoru
+
+    Olay döngüsü tek bir arka plan thread'inde çalışır ve host başına bağlantı
+    sınırı olan ortak bir aiohttp oturumunu kullanır. Böylece yüzlerce aktarım
+    dosya başına bir thread açmadan aynı anda yürütülebilir.
+    """
+
+    _shared: "AsyncEngine | None" = None
+    _shared_lock: Lock = Lock()
+
+    def __init__(self, limit: int = 256, limit_per_host: int = 16) -> None:
+        import aiohttp
+
+        self._aiohttp = aiohttp
+        self._loop: asyncio.AbstractEventLoop = asyncio.new_event_loop()
+        Thread(target=self._loop.run_forever, name="async-engine", daemon=True).start()
+        self._session = self.submit(self._create_session(limit, limit_per_host)).result()
+
+    @classmethod
+    def shared(cls) -> "AsyncEngine | None":
+        """Süreç genelindeki motoru döndürme, aiohttp yoksa None döndürme fonksiyonu"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                try:
+                    cls._shared = cls(int(getenv("DL_ASYNCLIMIT", "256")), int(getenv("DL_HOSTLIMIT", "16")))
+                except ImportError:
+                    _print(f"aiohttp kurulu değil, thread havuzu kullanılacak.{NEW_LINE}")
+                    return None
+
+            return cls._shared
+
+    async def _create_session(self, limit: int, limit_per_host: int) -> Any:
+        """Bağlantı havuzlu ortak oturumu oluşturma fonksiyonu"""
+        connector = self._aiohttp.TCPConnector(limit=limit, limit_per_host=limit_per_host)
+        timeout = self._aiohttp.ClientTimeout(sock_connect=9, sock_read=27)
+        return self._aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+    def close(self) -> None:
+        """Oturumu kapatıp olay döngüsünü durdurma fonksiyonu"""
+        self.submit(self._session.close()).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    def submit(self, coro: Any) -> Future:
+        """Coroutine'i motorun döngüsünde çalıştırıp Future döndürme fonksiyonu"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    async def fetch(
+        self,
+        url: str,
+        headers: dict[str, str],
+        tmp_file: str,
+        on_chunk: Callable[[int], None],
+        cancel_event: Event | None = None,
+        chunk_size: int = 65536,
+        throttle: Callable[[int], Any] | None = None,
+        retry: RetryPolicy | None = None,
+        hasher: StreamHasher | None = None
+    ) -> tuple[int, int | None]:
+        """Dosyayı .part dosyasına akış halinde ekleme fonksiyonu
+
+        Mevcut .part dosyası varsa Range ile kaldığı yerden devam edilir.
+        `throttle` verilirse her parçadan sonra beklenir (hız sınırı için coroutine döndürmelidir).
+        `retry` verilirse geçici hatalar ve yarıda kopan akışlar geri çekilerek
+        son yazılan byte'tan yeniden denenir. `hasher` verilirse gelen parçalar
+        yazılırken özetlenir.
+        (durum kodu, beklenen toplam boyut) döner; başarısız istekte boyut None olur.
+        """
+        host: str = urlsplit(url).netloc
+        failures: int = 0
+
+        while True:
+            part_size: int = path.getsize(tmp_file) if path.isfile(tmp_file) else 0
+            result: tuple[int, int | None] | None = None
+            retry_after: float | None = None
+            error: BaseException | None = None
+
+            delay: float = retry.blocked(host) if retry else 0.0
+            if delay:
+                error = CircuitOpenError(f"{host} geçici olarak devre dışı")
+            else:
+                try:
+                    status, total_size, retry_after = await self._fetch_once(
+                        url, headers, tmp_file, part_size, on_chunk, cancel_event, chunk_size, throttle, hasher
+                    )
+                except (self._aiohttp.ClientError, asyncio.TimeoutError, ConnectionError) as e:
+                    error = e
+                    # Veri gönderdikten sonra kopan bağlantı host'un devre kesicisine hata sayılmaz
+                    if retry:
+                        retry.record(host, path.isfile(tmp_file) and path.getsize(tmp_file) > part_size)
+                else:
+                    result = (status, total_size)
+                    failed: bool = status in RetryPolicy.RETRY_STATUSES
+                    if retry:
+                        retry.record(host, not failed, retry_after)
+                    if not failed and (total_size is None or path.getsize(tmp_file) >= total_size):
+                        return result
+                    error = Exception(f"HTTP {status}" if failed else "akış yarıda kesildi")
+
+            received: int = (path.getsize(tmp_file) if path.isfile(tmp_file) else 0) - part_size
+            failures = 0 if received > 0 else failures + 1
+            if not retry or failures >= retry.attempts or (cancel_event and cancel_event.is_set()):
+                if result:
+                    return result
+                raise error
+
+            delay = delay or retry.backoff(failures, retry_after)
+            _print(f"{url} yeniden deneniyor, {delay:.1f} sn sonra: {str(error)}{NEW_LINE}")
+            deadline: float = perf_counter() + delay
+            while perf_counter() < deadline and not (cancel_event and cancel_event.is_set()):
+                await asyncio.sleep(min(deadline - perf_counter(), 0.25))
+
+    async def _fetch_once(
+        self,
+        url: str,
+        headers: dict[str, str],
+        tmp_file: str,
+        part_size: int,
+        on_chunk: Callable[[int], None],
+        cancel_event: Event | None,
+        chunk_size: int,
+        throttle: Callable[[int], Any] | None,
+        hasher: StreamHasher | None = None
+    ) -> tuple[int, int | None, float | None]:
+        """Tek bir isteği `part_size` ofsetinden akıtma fonksiyonu, (durum kodu, toplam boyut, Retry-After) döner"""
+        headers = dict(headers)
+        if part_size:
+            headers["Range"] = f"bytes={part_size}-"
+
+        async with self._session.get(url, headers=headers) as response:
+            if response.status != (206 if part_size else 200):
+                return response.status, None, RetryPolicy.retry_after(response.headers.get("Retry-After"))
+
+            total_size: int | None = part_size + response.content_length \
+                if response.content_length is not None else None
+
+            writer: AsyncFileWriter = AsyncFileWriter(self._loop, tmp_file)
+            offset: int = part_size
+            try:
+                async for chunk in response.content.iter_chunked(chunk_size):
+                    if cancel_event and cancel_event.is_set():
+                        break
+
+                    await writer.write(chunk)
+                    if hasher:
+                        hasher.update(offset, chunk)
+                    offset += len(chunk)
+                    on_chunk(len(chunk))
+                    if throttle:
+                        await throttle(len(chunk))
+            finally:
+                await writer.close()
+
+            return response.status, total_size, None
+
+def parse_size(value: str | None) -> int:
+    """"512M", "2G" gibi boyut ifadelerini byte'a çevirme fonksiyonu"""
+    if not value:
+        return 0
+
+    value = value.strip().upper().rstrip("B")
+    units: dict[str, int] = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+    if value and value[-1] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+
+    return int(float(value))
+
+def local_bot_api() -> bool:
+    """Kendi barındırdığımız Telegram Bot API sunucusunun kullanılıp kullanılmadığını döndürme fonksiyonu"""
+    return bool(getenv("TG_APIURL"))
+
+def max_upload_size() -> int:
+    """Bot API'nin kabul ettiği en büyük dosya boyutunu döndürme fonksiyonu"""
+    return parse_size(getenv("TG_MAXUPLOAD") or ("2000M" if local_bot_api() else "50M"))
+
+def send_document(bot, chat_id, file_path: str) -> Any:
+    """Dosyayı Telegram'a gönderme fonksiyonu
+
+    Yerel Bot API sunucusu (`--local`) kullanılıyorsa dosya baytları istekle
+    taşınmaz, sunucu dosyayı `file://` yolundan kendisi okur.
+    """
+    if local_bot_api():
+        return bot.send_document(chat_id, Path(file_path).absolute().as_uri())
+
+    with open(file_path, 'rb') as f:
+        return bot.send_document(chat_id, f)
+
+def send_media_group(bot, chat_id, file_paths: list[str]) -> list[Any]:
+    """Dosyaları tek istekle belge grubu (2-10 dosya) olarak gönderme fonksiyonu, dosya başına mesaj döndürür"""
+    from telegram import InputMediaDocument
+
+    if local_bot_api():
+        return bot.send_media_group(
+            chat_id, [InputMediaDocument(Path(file_path).absolute().as_uri()) for file_path in file_paths]
+        )
+
+    with ExitStack() as stack:
+        media: list[Any] = [
+            InputMediaDocument(stack.enter_context(open(file_path, 'rb')), filename=path.basename(file_path))
+            for file_path in file_paths
+        ]
+        return bot.send_media_group(chat_id, media)
+
+class TelegramRateLimiter:
+    """Bot API gönderimlerini Telegram'ın genel ve sohbet başına hız sınırlarına göre aralayan sınıf
+
+    Her gönderim genel ve sohbetin bir sonraki izinli zamanını bir aralık
+    ileri iter; izinli zamanı gelmemiş gönderim bekletilir. RetryAfter yanıtı
+    alınan sohbet `pause` ile Telegram'ın istediği süre boyunca durdurulur.
+    """
+
+    _shared: "TelegramRateLimiter | None" = None
+    _shared_lock: Lock = Lock()
+
+    def __init__(self, rate: float = 30.0, chat_rate: float = 1.0) -> None:
+        self._interval: float = 1 / rate if rate > 0 else 0.0
+        self._chat_interval: float = 1 / chat_rate if chat_rate > 0 else 0.0
+        self._next: float = 0.0
+        self._chat_next: dict[Any, float] = {}
+        self._lock: Lock = Lock()
+
+    @classmethod
+    def shared(cls) -> "TelegramRateLimiter":
+        """Süreç genelindeki sınırlayıcıyı döndürme fonksiyonu"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(float(getenv("TG_RATE", "30")), float(getenv("TG_CHATRATE", "1")))
+
+            return cls._shared
+
+    def acquire(self, chat_id: Any, cancelled: Callable[[], bool] | None = None) -> bool:
+        """Sohbete gönderim sırası gelene kadar bekleme fonksiyonu, iş iptal edilirse False döner"""
+        while True:
+            with self._lock:
+                now: float = perf_counter()
+                ready: float = max(self._next, self._chat_next.get(chat_id, 0.0))
+                if ready <= now:
+                    self._next = max(self._next, now) + self._interval
+                    self._chat_next[chat_id] = max(self._chat_next.get(chat_id, 0.0), now) + self._chat_interval
+                    return True
+
+            if cancelled and cancelled():
+                return False
+            sleep(min(ready - now, 0.5))
+
+    def pause(self, chat_id: Any, seconds: float) -> None:
+        """Sohbete `seconds` saniye boyunca gönderim yapılmamasını sağlama fonksiyonu"""
+        with self._lock:
+            self._chat_next[chat_id] = max(self._chat_next.get(chat_id, 0.0), perf_counter() + seconds)
+
+class RelayAborted(Exception):
+    """Diske yazmadan aktarımın yarıda kesildiğini bildiren hata"""
+
+class RingBuffer:
+    """Tek yazan ve tek okuyan thread arasında sabit boyutlu byte halkası
+
+    Yazan taraf halka doluyken, okuyan taraf boşken bekler; böylece aktarım
+    başına bellek `capacity` byte ile sınırlı kalır. `abort` iki tarafı da
+    `RelayAborted` ile uyandırır, `close` okuyana akışın bittiğini bildirir.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self._buffer: bytearray = bytearray(capacity)
+        self._capacity: int = capacity
+        self._start: int = 0
+        self._size: int = 0
+        self._closed: bool = False
+        self._aborted: str | None = None
+        self._condition: Condition = Condition()
+
+    def write(self, data: bytes | memoryview) -> None:
+        """Veriyi halkaya kopyalama, yer yoksa okuyanı bekleme fonksiyonu"""
+        offset: int = 0
+        while offset < len(data):
+            with self._condition:
+                while self._size == self._capacity and not self._aborted:
+                    self._condition.wait()
+                if self._aborted:
+                    raise RelayAborted(self._aborted)
+
+                count: int = min(len(data) - offset, self._capacity - self._size)
+                end: int = (self._start + self._size) % self._capacity
+                first: int = min(count, self._capacity - end)
+                self._buffer[end:end + first] = data[offset:offset + first]
+                self._buffer[:count - first] = data[offset + first:offset + count]
+                self._size += count
+                offset += count
+                self._condition.notify_all()
+
+    def read(self, limit: int) -> bytes:
+        """Halkadan en fazla `limit` byte okuma fonksiyonu, akış bittiyse boş döner"""
+        with self._condition:
+            while not self._size and not self._closed and not self._aborted:
+                self._condition.wait()
+            if self._aborted:
+                raise RelayAborted(self._aborted)
+
+            count: int = min(limit, self._size)
+            first: int = min(count, self._capacity - self._start)
+            data: bytes = bytes(self._buffer[self._start:self._start + first]) + bytes(self._buffer[:count - first])
+            self._start = (self._start + count) % self._capacity
+            self._size -= count
+            self._condition.notify_all()
+            return data
+
+    def close(self) -> None:
+        """Yazmanın bittiğini bildirme fonksiyonu"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def abort(self, reason: str) -> None:
+        """Aktarımı iki taraf için de kesme fonksiyonu"""
+        with self._condition:
+            if not self._aborted:
+                self._aborted = reason
+            self._condition.notify_all()
+
+class RelayUpload:
+    """Sağlayıcıdan okunan akışı diske yazmadan `sendDocument` isteğinin gövdesine aktaran sınıf
+
+    Çok parçalı gövde önceden bilinen dosya boyutuyla kurulur, böylece istek
+    Content-Length ile gönderilir. İndiren thread `write` ile halkaya yazar,
+    ayrı bir thread gövdeyi halkadan okuyarak Bot API'ye yükler. Son byte
+    gönderilmeden önce `finalize` çağrılır; False dönerse (örneğin özet
+    tutmuyorsa) istek yarıda kesilir ve Telegram'a eksik dosya ulaşmaz.
+    İstek python-telegram-bot yerine doğrudan `bot.base_url` adresine gider.
+    """
+
+    def __init__(
+        self,
+        bot,
+        chat_id,
+        filename: str,
+        size: int,
+        buffer_size: int = 8 * 1024 * 1024,
+        finalize: Callable[[], bool] | None = None
+    ) -> None:
+        self.bot = bot
+        self.chat_id = chat_id
+        self.size: int = size
+        self.message: Any = None
+        self._boundary: str = os.urandom(16).hex()
+        # Dosya adındaki tırnak ve satır sonları başlığı bozmasın diye HTML5 biçimiyle kaçırılır
+        quoted: str = filename.replace('"', "%22").replace("\r", "%0D").replace("\n", "%0A")
+        self._head: bytes = (
+            f'--{self._boundary}\r\nContent-Disposition: form-data; name="chat_id"\r\n\r\n{chat_id}\r\n'
+            f'--{self._boundary}\r\nContent-Disposition: form-data; name="document"; filename="{quoted}"\r\n'
+            f'Content-Type: application/octet-stream\r\n\r\n'
+        ).encode()
+        self._tail: bytes = f"\r\n--{self._boundary}--\r\n".encode()
+        self._ring: RingBuffer = RingBuffer(buffer_size)
+        self._finalize: Callable[[], bool] | None = finalize
+        self._error: BaseException | None = None
+        self._thread: Thread = Thread(target=self._post, name="relay", daemon=True)
+        self._thread.start()
+
+    def __len__(self) -> int:
+        return len(self._head) + self.size + len(self._tail)
+
+    def __iter__(self):
+        yield self._head
+
+        sent: int = 0
+        while sent < self.size:
+            chunk: bytes = self._ring.read(min(self.size - sent, 256 * 1024))
+            if not chunk:
+                raise RelayAborted(f"akış {sent}/{self.size} byte'ta bitti")
+            sent += len(chunk)
+            yield chunk
+
+        if self._finalize and not self._finalize():
+            raise RelayAborted("özet tutmuyor")
+        yield self._tail
+
+    def _post(self) -> None:
+        """Gövdeyi Bot API'ye gönderen thread fonksiyonu"""
+        try:
+            response: Any = post(
+                f"{self.bot.base_url}/sendDocument",
+                data=self,
+                headers={"Content-Type": f"multipart/form-data; boundary={self._boundary}"},
+                timeout=(9, float(getenv("TG_RELAYTIMEOUT", "120")))
+            )
+            data: dict[str, Any] = response.json()
+            if not data.get("ok"):
+                # Flood yanıtında sohbet bekletilir, dosya disk yoluyla yükleyici havuzundan yeniden gönderilir
+                retry_after: float | None = (data.get("parameters") or {}).get("retry_after")
+                if retry_after:
+                    TelegramRateLimiter.shared().pause(self.chat_id, float(retry_after))
+                raise RelayAborted(data.get("description") or f"durum kodu {response.status_code}")
+
+            from telegram import Message
+            self.message = Message.de_json(data["result"], self.bot)
+        except BaseException as e:
+            self._error = e
+            # Yükleme yarıda kaldıysa indiren thread halkada beklemesin
+            self._ring.abort(str(e))
+
+    def write(self, data: bytes | memoryview) -> None:
+        """İndirilen veriyi yükleme gövdesine aktarma fonksiyonu"""
+        self._ring.write(data)
+
+    def finish(self) -> Any:
+        """Akışı kapatıp yüklemenin bitmesini bekleme fonksiyonu, gönderilen mesajı döndürür"""
+        self._ring.close()
+        self._thread.join()
+        if self._error:
+            raise self._error
+        return self.message
+
+    def abort(self, reason: str) -> None:
+        """Yüklemeyi kesip thread'in bitmesini bekleme fonksiyonu"""
+        self._ring.abort(reason)
+        self._thread.join()
+
+class FileProgress:
+    """Tek bir dosyanın ilerleme sayacı
+
+    Sayaca yalnızca dosyayı indiren kod yazar, raporlayıcı thread yalnızca
+    okur; bu yüzden her parçada kilit alınmaz.
+    """
+
+    __slots__ = ("name", "total", "downloaded", "state", "elapsed", "_start_bytes", "_start_time")
+
+    def __init__(self, name: str, total: int) -> None:
+        self.name: str = name
+        self.total: int = total
+        self.downloaded: int = 0
+        self.state: str = "indiriliyor"
+        self.elapsed: float | None = None
+        self._start_bytes: int = 0
+        self._start_time: float = perf_counter()
+
+    def resume(self, offset: int) -> None:
+        """Diskte zaten bulunan byte'ları hız hesabına katmadan sayaca ekleme fonksiyonu"""
+        self.downloaded = self._start_bytes = offset
+        self._start_time = perf_counter()
+
+    def rate(self) -> float:
+        """Dosyanın başlangıçtan beri ortalama indirme hızını döndürme fonksiyonu"""
+        return (self.downloaded - self._start_bytes) / max(perf_counter() - self._start_time, 1e-6)
+
+    def stats(self) -> dict[str, Any]:
+        """Bu çalışmada aktarılan byte, süre ve ortalama hızı döndürme fonksiyonu"""
+        transferred: int = self.downloaded - self._start_bytes
+        seconds: float = self.elapsed if self.elapsed is not None else perf_counter() - self._start_time
+        return {"bytes": transferred, "seconds": round(seconds, 4), "speed": round(transferred / max(seconds, 1e-6))}
+
+    def describe(self) -> str:
+        """Dosyanın ilerleme satırını döndürme fonksiyonu"""
+        percent: float = self.downloaded / self.total * 100 if self.total else 0
+        return f"{self.name}: {_format_size(self.downloaded)} / {_format_size(self.total)} " \
+            f"{percent:.1f}% {_format_speed(self.rate())}"
+
+class ProgressGroup:
+    """Bir işin dosya sayaçlarını toplayan ve Telegram güncellemelerini seyrelten sınıf"""
+
+    def __init__(
+        self,
+        label: str,
+        finished: deque,
+        on_update: Callable[[str], None] | None = None,
+        update_interval: float = 5.0
+    ) -> None:
+        self.label: str = label
+        self.files: list[FileProgress] = []
+        self._finished: deque = finished
+        self._on_update = on_update
+        self._update_interval: float = update_interval
+        self._last_update: float = 0.0
+        self._last_text: str | None = None
+        self.closed: bool = False
+
+    def add(self, name: str, total: int) -> FileProgress:
+        """Yeni bir dosya sayacı oluşturma fonksiyonu"""
+        progress: FileProgress = FileProgress(name, total)
+        self.files.append(progress)
+        return progress
+
+    def finish(self, progress: FileProgress, ok: bool = True) -> None:
+        """Dosyayı tamamlandı veya başarısız olarak işaretleme fonksiyonu, ilk çağrı dışındakiler yok sayılır"""
+        if progress.state != "indiriliyor":
+            return
+
+        if ok and progress.total:
+            progress.downloaded = progress.total
+        progress.elapsed = perf_counter() - progress._start_time
+        progress.state = "tamamlandı" if ok else "başarısız"
+        if ok:
+            self._finished.append(f"{progress.name} indirildi: {_format_size(progress.downloaded)} Tamamlandı!")
+
+    def render(self, limit: int = 5) -> list[str]:
+        """İşin toplam satırını ve en fazla `limit` aktif dosyanın satırlarını döndürme fonksiyonu"""
+        files: list[FileProgress] = list(self.files)
+        active: list[FileProgress] = [progress for progress in files if progress.state == "indiriliyor"]
+        done: int = sum(progress.state == "tamamlandı" for progress in files)
+        downloaded: int = sum(progress.downloaded for progress in files)
+        total: int = sum(progress.total for progress in files)
+        rate: float = sum(progress.rate() for progress in active)
+
+        lines: list[str] = [
+            f"{self.label}: {done}/{len(files)} dosya, {_format_size(downloaded)} / {_format_size(total)} "
+            f"{_format_speed(rate)}"
+        ]
+        lines += [f"  {progress.describe()}" for progress in active[:limit]]
+        if len(active) > limit:
+            lines.append(f"  ... ve {len(active) - limit} dosya daha")
+
+        return lines
+
+    def maybe_update(self, now: float) -> None:
+        """Aralık dolduysa ve metin değiştiyse Telegram durum güncellemesini gönderme fonksiyonu"""
+        if not self._on_update or self.closed or now - self._last_update < self._update_interval:
+            return
+
+        text: str = "\n".join(self.render())
+        if text == self._last_text:
+            return
+
+        self._last_update = now
+        self._last_text = text
+        try:
+            self._on_update(text)
+        except Exception as e:
+            _print(f"İlerleme güncellemesi gönderilemedi: {str(e)}{NEW_LINE}")
+
+class ProgressTracker:
+    """Tüm işlerin ilerlemesini tek bir raporlayıcı thread'den yazdıran sınıf
+
+    İndiriciler yalnızca kendi dosya sayaçlarını artırır. Konsol görünümü ve
+    Telegram durum mesajları sabit aralıklarla sayaçların anlık görüntüsünden
+    üretilir; böylece parça başına kilit, biçimlendirme ve flush yapılmaz.
+    """
+
+    _shared: "ProgressTracker | None" = None
+    _shared_lock: Lock = Lock()
+
+    def __init__(self, interval: float = 0.5, output: TextIO = stdout) -> None:
+        self._interval: float = interval
+        self._output: TextIO = output
+        self._tty: bool = output.isatty()
+        self._groups: list[ProgressGroup] = []
+        self._finished: deque = deque()
+        self._lock: Lock = Lock()
+        self._lines: int = 0
+        self._last_plain: float = 0.0
+        Thread(target=self._run, name="progress", daemon=True).start()
+
+    @classmethod
+    def shared(cls) -> "ProgressTracker":
+        """Süreç genelindeki raporlayıcıyı döndürme fonksiyonu"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(float(getenv("DL_PROGRESSINTERVAL", "0.5")))
+
+            return cls._shared
+
+    def group(self, label: str, on_update: Callable[[str], None] | None = None) -> ProgressGroup:
+        """Bir iş için ilerleme grubu açma fonksiyonu, `on_update` seyreltilmiş durum metniyle çağrılır"""
+        group: ProgressGroup = ProgressGroup(
+            label, self._finished, on_update, float(getenv("TG_PROGRESSINTERVAL", "5"))
+        )
+        with self._lock:
+            self._groups.append(group)
+
+        return group
+
+    def remove(self, group: ProgressGroup) -> None:
+        """Biten işin grubunu görünümden kaldırma fonksiyonu"""
+        # İş bittikten sonra gelen eski bir güncelleme son durum mesajını ezmesin
+        group.closed = True
+        with self._lock:
+            if group in self._groups:
+                self._groups.remove(group)
+
+        self.render()
+
+    def _run(self) -> None:
+        """Görünümü sabit aralıklarla yenileyen raporlayıcı döngüsü"""
+        while True:
+            sleep(self._interval)
+            try:
+                self.render()
+            except Exception as e:
+                _print(f"İlerleme yazdırılamadı: {str(e)}{NEW_LINE}", True)
+
+    def render(self) -> None:
+        """Konsol görünümünü yeniden çizme ve zamanı gelen Telegram güncellemelerini gönderme fonksiyonu"""
+        with self._lock:
+            groups: list[ProgressGroup] = list(self._groups)
+            now: float = perf_counter()
+            lines: list[str] = [line for group in groups for line in group.render()]
+
+            output: list[str] = []
+            # Terminalde önceki blok silinip yerine yazılır, dosyaya yönlendirilmiş çıktıda seyrek yazılır
+            if self._tty and self._lines:
+                output.append(f"\x1b[{self._lines}F\x1b[J")
+            while self._finished:
+                output.append(f"{self._finished.popleft()}{NEW_LINE}")
+
+            if self._tty:
+                output += [f"{line}{NEW_LINE}" for line in lines]
+                self._lines = len(lines)
+            elif lines and now - self._last_plain >= 10:
+                output += [f"{line}{NEW_LINE}" for line in lines]
+                self._last_plain = now
+
+            if output:
+                self._output.write("".join(output))
+                self._output.flush()
+
+        for group in groups:
+            group.maybe_update(now)
+
+def state_path(name: str) -> str:
+    """Kalıcı durum dosyasının yolunu döndürme, durum dizinini gerekirse oluşturma fonksiyonu
+
+    Veritabanları çalışma dizinine değil tek bir durum dizinine yazılır:
+    BOT_STATEDIR verilmezse $XDG_STATE_HOME (varsayılan ~/.local/state)
+    altındaki uygulama dizini kullanılır.
+    """
+    state_home: str = getenv("XDG_STATE_HOME") or path.join(path.expanduser("~"), ".local", "state")
+    directory: str = getenv("BOT_STATEDIR") or path.join(state_home, "gofile-cloudmail-bot")
+    os.makedirs(directory, exist_ok=True)
+    return path.join(directory, name)
+
+class FileIdCache:
+    """Sağlayıcıdaki dosya kimliğini Telegram file_id'sine eşleyen kalıcı önbellek
+
+    Aynı dosya tekrar istendiğinde indirip yüklemek yerine Telegram'daki kopyası
+    file_id ile yeniden gönderilir. `ttl` saniyeden eski kayıtlar geçersiz
+    sayılır, kayıt sayısı `max_entries`'i aşarsa en uzun süredir kullanılmayan
+    kayıtlar silinir. İndirilirken doğrulanan dosyaların özeti de kayıtla
+    birlikte tutulur.
+    """
+
+    _shared: "FileIdCache | None" = None
+    _shared_lock: Lock = Lock()
+
+    def __init__(self, db_path: str, ttl: float = 30 * 86400, max_entries: int = 10000) -> None:
+        self._ttl: float = ttl
+        self._max_entries: int = max_entries
+        self._lock: Lock = Lock()
+        self._db: sqlite3.Connection = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "key TEXT PRIMARY KEY, file_ids TEXT NOT NULL, manifest TEXT, created REAL NOT NULL, used REAL NOT NULL, "
+            "hash TEXT)"
+        )
+        # Doğrulanmış özet sütunu olmadan oluşturulmuş eski önbellekler güncellenir
+        if "hash" not in {row[1] for row in self._db.execute("PRAGMA table_info(files)")}:
+            self._db.execute("ALTER TABLE files ADD COLUMN hash TEXT")
+        self._db.execute("CREATE INDEX IF NOT EXISTS files_used ON files (used)")
+
+    @classmethod
+    def shared(cls) -> "FileIdCache | None":
+        """Süreç genelindeki önbelleği döndürme, önbellek kapalıysa None döndürme fonksiyonu"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                db_path: str | None = getenv("DL_CACHEDB")
+                if db_path == "":
+                    return None
+
+                try:
+                    cls._shared = cls(
+                        db_path or state_path("filecache.db"),
+                        float(getenv("DL_CACHETTL", str(30 * 86400))),
+                        int(getenv("DL_CACHESIZE", "10000"))
+                    )
+                except (OSError, sqlite3.Error) as e:
+                    _print(f"Önbellek açılamadı, devre dışı: {str(e)}{NEW_LINE}")
+                    return None
+
+            return cls._shared
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Kayıtlı file_id listesini, parça özetini ve doğrulanmış özeti döndürme, kayıt yoksa veya süresi dolduysa None döndürme fonksiyonu"""
+        now: float = time()
+        with self._lock:
+            row: tuple | None = self._db.execute(
+                "SELECT file_ids, manifest, created, hash FROM files WHERE key = ?", (key,)
+            ).fetchone()
+            if not row:
+                return None
+
+            if self._ttl and now - row[2] > self._ttl:
+                self._db.execute("DELETE FROM files WHERE key = ?", (key,))
+                return None
+
+            self._db.execute("UPDATE files SET used = ? WHERE key = ?", (now, key))
+
+        return {"file_ids": json.loads(row[0]), "manifest": row[1], "hash": row[3]}
+
+    def put(self, key: str, file_ids: list[str], manifest: str | None = None, digest: str | None = None) -> None:
+        """Gönderilen dosyanın file_id'lerini ve doğrulanmış özetini kaydedip eski kayıtları temizleme fonksiyonu"""
+        now: float = time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO files (key, file_ids, manifest, created, used, hash) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, json.dumps(file_ids), manifest, now, now, digest)
+            )
+            if self._ttl:
+                self._db.execute("DELETE FROM files WHERE created < ?", (now - self._ttl,))
+            self._db.execute(
+                "DELETE FROM files WHERE key IN (SELECT key FROM files ORDER BY used DESC LIMIT -1 OFFSET ?)",
+                (self._max_entries,)
+            )
+
+    def delete(self, key: str) -> None:
+        """Geçersiz kalan kaydı silme fonksiyonu"""
+        with self._lock:
+            self._db.execute("DELETE FROM files WHERE key = ?", (key,))
+
+class CredentialCache:
+    """Sağlayıcı oturum bilgilerini (GoFile token, Cloud Mail.ru page_id ve indirme sunucusu) işler arasında paylaşan önbellek
+
+    Değerler süreleriyle birlikte SQLite'a yazılır, böylece bot yeniden
+    başladığında yeni hesap açmadan veya sayfayı yeniden taramadan çalışır.
+    Aynı değeri aynı anda isteyen thread'lerden yalnızca biri oluşturur, diğerleri
+    onun sonucunu kullanır. Sunucu değeri reddettiğinde (401/403) `invalidate`
+    yalnızca hâlâ aynı eski değer kayıtlıysa siler; böylece eşzamanlı hatalar
+    birden fazla yenilemeye yol açmaz.
+    """
+
+    _shared: "CredentialCache | None" = None
+    _shared_lock: Lock = Lock()
+
+    def __init__(self, db_path: str = ":memory:") -> None:
+        self._lock: Lock = Lock()
+        self._create_locks: dict[str, Lock] = {}
+        self._db: sqlite3.Connection = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS credentials (name TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)"
+        )
+
+    @classmethod
+    def shared(cls, persist: bool = False) -> "CredentialCache":
+        """Süreç genelindeki önbelleği döndürme fonksiyonu
+
+        DL_CREDENTIALDB verilmezse değerler yalnızca `persist` istendiğinde
+        (bot) durum dizinine yazılır; kütüphane ve komut satırı kullanımında
+        token'lar açıkça istenmedikçe bellekte kalır. Dosya ilk çağrıda seçilir.
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                db_path: str | None = getenv("DL_CREDENTIALDB")
+                try:
+                    if db_path is None and persist:
+                        db_path = state_path("credentials.db")
+                    cls._shared = cls(db_path or ":memory:")
+                except (OSError, sqlite3.Error) as e:
+                    _print(f"Oturum önbelleği açılamadı, yalnızca bellekte tutulacak: {str(e)}{NEW_LINE}")
+                    cls._shared = cls()
+
+            return cls._shared
+
+    def get(self, name: str) -> str | None:
+        """Süresi dolmamış değeri döndürme, yoksa None döndürme fonksiyonu"""
+        with self._lock:
+            row: tuple | None = self._db.execute(
+                "SELECT value FROM credentials WHERE name = ? AND expires > ?", (name, time())
+            ).fetchone()
+
+        return row[0] if row else None
+
+    def put(self, name: str, value: str, ttl: float) -> None:
+        """Değeri `ttl` saniye geçerli olacak şekilde kaydetme fonksiyonu"""
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO credentials (name, value, expires) VALUES (?, ?, ?)", (name, value, time() + ttl)
+            )
+
+    def invalidate(self, name: str, stale: str | None = None) -> None:
+        """Değeri silme fonksiyonu, `stale` verilirse yalnızca kayıtlı değer hâlâ oysa siler"""
+        with self._lock:
+            if stale is None:
+                self._db.execute("DELETE FROM credentials WHERE name = ?", (name,))
+            else:
+                self._db.execute("DELETE FROM credentials WHERE name = ? AND value = ?", (name, stale))
+
+    def fetch(self, name: str, ttl: float, create: Callable[[], str | None]) -> str | None:
+        """Geçerli değeri döndürme, yoksa `create` ile bir kez oluşturup kaydetme fonksiyonu"""
+        with self._lock:
+            create_lock: Lock = self._create_locks.setdefault(name, Lock())
+
+        with create_lock:
+            value: str | None = self.get(name)
+            if value is None:
+                value = create()
+                if value:
+                    self.put(name, value, ttl)
+
+            return value
+
+def resend_cached(
+    bot,
+    chat_id,
+    entry: dict[str, Any],
+    call: Callable[[Callable[[], Any]], Any] = lambda send: send()
+) -> None:
+    """Önbellekteki dosyayı indirmeden ve yüklemeden file_id ile yeniden gönderme fonksiyonu
+
+    Her istek `call` ile yapılır; yükleme hattının `call` fonksiyonu verilirse gönderimler
+    aynı hız sınırına uyar ve RetryAfter yanıtlarında beklenip yeniden denenir.
+    """
+    for file_id in entry["file_ids"]:
+        call(lambda: bot.send_document(chat_id, file_id))
+
+    if entry["manifest"]:
+        call(lambda: bot.send_message(chat_id, entry["manifest"]))
+
+class JobJournal:
+    """İşleri, dosya listelerini ve gönderim durumlarını diskte tutan iş günlüğü
+
+    Bot yeniden başladığında yarım kalan işler aynı numaralarla tekrar
+    kuyruğa alınır. Gönderilmiş dosyalar atlanır; yarım kalan dosyalar diskteki
+    `.part` ve `.segments` dosyalarından Range ile kaldığı yerden devam eder.
+    """
+
+    _shared: "JobJournal | None" = None
+    _shared_lock: Lock = Lock()
+
+    def __init__(self, db_path: str) -> None:
+        self._lock: Lock = Lock()
+        self._db: sqlite3.Connection = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id INTEGER PRIMARY KEY, chat_id, url TEXT NOT NULL, password TEXT, service TEXT NOT NULL, "
+            "state TEXT NOT NULL, created REAL NOT NULL, finished REAL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "job_id INTEGER NOT NULL, key TEXT NOT NULL, path TEXT NOT NULL, size INTEGER NOT NULL, "
+            "state TEXT NOT NULL, offset INTEGER NOT NULL DEFAULT 0, PRIMARY KEY (job_id, key))"
+        )
+
+    @classmethod
+    def shared(cls) -> "JobJournal | None":
+        """Süreç genelindeki iş günlüğünü döndürme, günlük kapalıysa None döndürme fonksiyonu"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                db_path: str | None = getenv("BOT_JOURNAL")
+                if db_path == "":
+                    return None
+
+                try:
+                    cls._shared = cls(db_path or state_path("jobs.db"))
+                except (OSError, sqlite3.Error) as e:
+                    _print(f"İş günlüğü açılamadı, devre dışı: {str(e)}{NEW_LINE}")
+                    return None
+
+            return cls._shared
+
+    def next_id(self) -> int:
+        """Kullanılmamış ilk iş numarasını döndürme fonksiyonu"""
+        with self._lock:
+            return self._db.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM jobs").fetchone()[0]
+
+    def add_job(self, job_id: int, chat_id: Any, url: str, password: str | None, service: str) -> None:
+        """Yeni işi günlüğe ekleme fonksiyonu"""
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO jobs (id, chat_id, url, password, service, state, created) "
+                "VALUES (?, ?, ?, ?, ?, 'kuyrukta', ?)",
+                (job_id, chat_id, url, password, service, time())
+            )
+
+    def finish_job(self, job_id: int, state: str) -> None:
+        """Biten işin son durumunu yazıp dosya kayıtlarını silme fonksiyonu"""
+        with self._lock:
+            self._db.execute("UPDATE jobs SET state = ?, finished = ? WHERE id = ?", (state, time(), job_id))
+            self._db.execute("DELETE FROM files WHERE job_id = ?", (job_id,))
+
+    def unfinished(self) -> list[tuple[int, Any, str, str | None, str]]:
+        """Bitmeden kesilen işleri (numara, sohbet, url, parola, servis) olarak döndürme fonksiyonu"""
+        with self._lock:
+            return self._db.execute(
+                "SELECT id, chat_id, url, password, service FROM jobs WHERE finished IS NULL ORDER BY id"
+            ).fetchall()
+
+    def add_file(self, job_id: int, key: str, filepath: str, size: int) -> None:
+        """İşte bulunan dosyayı günlüğe ekleme, kayıt varsa dokunmama fonksiyonu"""
+        with self._lock:
+            self._db.execute(
+                "INSERT OR IGNORE INTO files (job_id, key, path, size, state) VALUES (?, ?, ?, ?, 'bekliyor')",
+                (job_id, key, filepath, size)
+            )
+
+    def update_file(self, job_id: int, key: str, state: str, offset: int) -> None:
+        """Dosyanın durumunu ve diskteki byte sayısını güncelleme fonksiyonu"""
+        with self._lock:
+            self._db.execute(
+                "UPDATE files SET state = ?, offset = ? WHERE job_id = ? AND key = ?", (state, offset, job_id, key)
+            )
+
+    def first_path(self, job_id: int) -> str | None:
+        """İşin günlüğe yazılmış ilk dosyasının yolunu döndürme fonksiyonu"""
+        with self._lock:
+            row: tuple | None = self._db.execute(
+                "SELECT path FROM files WHERE job_id = ? LIMIT 1", (job_id,)
+            ).fetchone()
+
+        return row[0] if row else None
+
+    def file_state(self, job_id: int, key: str) -> str | None:
+        """Dosyanın bu işteki durumunu döndürme fonksiyonu"""
+        with self._lock:
+            row: tuple | None = self._db.execute(
+                "SELECT state FROM files WHERE job_id = ? AND key = ?", (job_id, key)
+            ).fetchone()
+
+        return row[0] if row else None
+
+def resume_offset(filepath: str) -> int:
+    """Dosyanın diskte tamamlanmış byte sayısını `.part` ve `.segments` dosyalarından hesaplama fonksiyonu"""
+    if path.isfile(filepath):
+        return path.getsize(filepath)
+
+    state_file: str = f"{filepath}.segments"
+    if path.isfile(state_file):
+        # Parçalı indirmenin .part dosyası baştan tam boyutta ayrılır; okunamayan durumla boyutuna güvenilmez
+        try:
+            with open(state_file, "r") as f:
+                state: dict[str, Any] = json.load(f)
+            return sum(min(state["segment_size"], state["size"] - index * state["segment_size"]) for index in state["done"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return 0
+
+    tmp_file: str = f"{filepath}.part"
+    return path.getsize(tmp_file) if path.isfile(tmp_file) else 0
+
+def discard_segmented_part(filepath: str) -> None:
+    """Tek bağlantıyla sürdürülemeyecek parçalı indirme `.part` ve `.segments` dosyalarını silme fonksiyonu"""
+    state_file: str = f"{filepath}.segments"
+    tmp_file: str = f"{filepath}.part"
+    if not (path.isfile(state_file) and path.isfile(tmp_file)):
+        return
+
+    _print(f"{tmp_file} parçalı indirmeden kalmış, dosya baştan indirilecek.{NEW_LINE}")
+    for leftover in (tmp_file, state_file):
+        try:
+            os.remove(leftover)
+        except OSError:
+            pass
+
+def promote_complete_part(filepath: str, size: int, hasher: StreamHasher | None = None) -> bool:
+    """Tamamı indirilmiş ama adı değiştirilmeden kalmış `.part` dosyasını tamamlama fonksiyonu
+
+    `hasher` verilirse dosya önce özetlenir, özeti tutmayan `.part` silinir.
+    """
+    tmp_file: str = f"{filepath}.part"
+    # Parçalı indirme .part dosyasını büyütmeden önce .segments yazar; durum dosyası varken boyut bir şey ifade etmez
+    if size and not path.isfile(f"{filepath}.segments") and path.isfile(tmp_file) and path.getsize(tmp_file) == size:
+        if hasher and not hasher.verify(size):
+            _print(f"{tmp_file} özeti tutmuyor, yeniden indirilecek.{NEW_LINE}")
+            os.remove(tmp_file)
+            return False
+
+        move(tmp_file, filepath)
+        return True
+
+    return False
+
+class DiskAdmission:
+    """İndirme dizinlerinde dosya başına yer ayıran kabul denetimi
+
+    Servisler dosya boyutlarını taramada bildirdiği için her dosya yazılmaya
+    başlamadan önce diskte eksik kalan kısmı kadar yer ayrılır. Birimin
+    `shutil.disk_usage` ile okunan boş alanından diğer dosyalara ayrılmış
+    byte'lar ve `margin` payı düşülür; yer yetmiyorsa dosya, başka indirmeler
+    bitip gönderilen dosyalar silinene kadar bekletilir. Aynı dosya
+    sistemindeki dizinler tek bütçeyi paylaşır. Yazılmakta olan kısım dosya
+    bitene kadar hem boş alandan hem ayrılan yerden düşüldüğü için hesap
+    ihtiyatlıdır. `volumes` verilirse işler en az aktif işi olan (eşitlikte
+    en çok boş yeri kalan) birime yerleştirilir.
+    """
+
+    _shared: "DiskAdmission | None" = None
+    _shared_lock: Lock = Lock()
+
+    def __init__(
+        self,
+        volumes: list[str] | None = None,
+        margin: int = 0,
+        timeout: float = 600.0,
+        poll: float = 1.0
+    ) -> None:
+        self.volumes: list[str] = [path.abspath(volume) for volume in volumes or []]
+        for volume in self.volumes:
+            os.makedirs(volume, exist_ok=True)
+        self._margin: int = margin
+        self._timeout: float = timeout
+        self._poll: float = poll
+        self._condition: Condition = Condition()
+        # Dosya sistemi (st_dev) → ayrılmış ama henüz indirilmemiş byte
+        self._reserved: dict[int, int] = {}
+        # Dizin → dosya sistemi; dizin sonradan silinse de ayrılan yer doğru birime geri verilir
+        self._devices: dict[str, int] = {}
+        # İş → [birim, işin birimi kullanan indirici sayısı]
+        self._placement: dict[Any, list] = {}
+        Metrics.shared().register("dl_disk_reserved_bytes", lambda: sum(self._reserved.values()))
+
+    @classmethod
+    def shared(cls) -> "DiskAdmission":
+        """Süreç genelindeki kabul denetimini döndürme fonksiyonu"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                volumes: str = getenv("DL_DOWNLOADDIRS", "")
+                cls._shared = cls(
+                    [volume for volume in volumes.split(os.pathsep) if volume],
+                    margin=parse_size(getenv("DL_DISKMARGIN", "256M")),
+                    timeout=float(getenv("DL_DISKWAIT", "600"))
+                )
+
+            return cls._shared
+
+    def available(self, directory: str) -> int:
+        """Dizinin bulunduğu birimde ayrılmamış boş alanı döndürme fonksiyonu"""
+        with self._condition:
+            return self._available(directory, self._device(directory))
+
+    def _device(self, directory: str) -> int:
+        if directory not in self._devices:
+            self._devices[directory] = os.stat(directory).st_dev
+        return self._devices[directory]
+
+    def _available(self, directory: str, device: int) -> int:
+        return shutil.disk_usage(directory).free - self._reserved.get(device, 0) - self._margin
+
+    def place(self, job: Any, default: str | None, hint: str | None = None) -> str | None:
+        """İş için indirme dizinini seçme fonksiyonu, birim tanımlı değilse `default` döner
+
+        Aynı işin indiricileri aynı birimi kullanır. `hint` önceki çalışmadan kalan bir dosya yoluysa
+        iş o birimde kalır, böylece yarım dosyalar kaldığı yerden devam eder.
+        """
+        if not self.volumes:
+            return default
+
+        with self._condition:
+            if job in self._placement:
+                self._placement[job][1] += 1
+                return self._placement[job][0]
+
+            volume: str | None = next(
+                (volume for volume in self.volumes if hint and hint.startswith(volume + os.sep)), None
+            )
+            if volume is None:
+                active: dict[str, int] = {volume: 0 for volume in self.volumes}
+                for placed, _ in self._placement.values():
+                    active[placed] += 1
+                volume = min(
+                    self.volumes,
+                    key=lambda volume: (active[volume], -self._available(volume, self._device(volume)))
+                )
+
+            self._placement[job] = [volume, 1]
+            return volume
+
+    def leave(self, job: Any) -> None:
+        """İndiricinin işi bitince birim yerleşimini bırakma fonksiyonu"""
+        with self._condition:
+            placement: list | None = self._placement.get(job)
+            if placement:
+                placement[1] -= 1
+                if not placement[1]:
+                    del self._placement[job]
+
+    def reserve(
+        self,
+        directory: str,
+        size: int,
+        cancelled: Callable[[], bool] | None = None,
+        on_wait: Callable[[int], None] | None = None
+    ) -> bool:
+        """Dizinin birimi için `size` byte ayırma, yer açılana kadar bekleme fonksiyonu
+
+        Yer ayrılamazsa (iş iptal edildi veya birimde başka ayırma yokken `timeout` boyunca yer açılmadı)
+        False döner. `on_wait` beklemeye başlarken bir kez o anki ayrılmamış boş alanla çağrılır.
+        """
+        if size <= 0:
+            return True
+
+        deadline: float | None = None
+        with self._condition:
+            device: int = self._device(directory)
+            while size > (available := self._available(directory, device)):
+                if cancelled and cancelled():
+                    return False
+
+                if on_wait:
+                    on_wait(available)
+                    on_wait = None
+
+                # Diğer dosyalar indirilirken süre işlemez, onlar bitince yer açılabilir
+                if self._reserved.get(device):
+                    deadline = None
+                elif deadline is None:
+                    deadline = perf_counter() + self._timeout
+                elif perf_counter() >= deadline:
+                    return False
+
+                self._condition.wait(self._poll)
+
+            self._reserved[device] = self._reserved.get(device, 0) + size
+            return True
+
+    def release(self, directory: str, size: int) -> None:
+        """Ayrılan yeri geri verme fonksiyonu"""
+        if size <= 0:
+            return
+
+        with self._condition:
+            self._reserved[self._device(directory)] -= size
+            self._condition.notify_all()
+
+class UploadPipeline:
+    """İndirilen dosyaları kuyruktan alıp paralel gönderen üretici/tüketici hattı
+
+    İndiriciler her dosyayı biter bitmez kuyruğa koyar, `workers` yükleyici
+    thread'i dosyaları `TelegramRateLimiter` sınırları içinde aynı anda
+    gönderip siler. Sıra beklenirken kuyrukta biriken `group_size` byte'tan
+    küçük dosyalar `send_group` ile onarlı gruplar halinde tek istekte
+    gönderilir. Aynı `sequence` anahtarıyla eklenen öğeler (bölünen dosyanın
+    parçaları ve özet mesajı) ise tek tek ve eklendikleri sırayla gönderilir;
+    paralellik yalnızca bağımsız dosyalar arasındadır. RetryAfter yanıtında sohbet istenen süre kadar durdurulup,
+    ağ hatalarında geri çekilerek yeniden denenir; yine de gönderilemeyen
+    dosyalar silinmez, `failed` listesine yazılır. Diskteki (indirilen ve
+    gönderilmeyi bekleyen) dosyaların toplamı `high_water` baytı aşacaksa yeni
+    indirmeler `reserve` içinde yer açılana kadar bekletilir. Kuyruğa girmeyen
+    gönderimler (önbellekteki file_id'lerin yeniden gönderimi) `call` ile aynı
+    hız sınırından ve yeniden denemelerden geçer.
+    """
+
+    # Bot API bir medya grubunda en fazla 10 dosya kabul eder
+    GROUP_LIMIT: int = 10
+
+    def __init__(
+        self,
+        send: Callable[[str], Any],
+        workers: int = 1,
+        high_water: int = 0,
+        on_error: Callable[[str, Exception], None] | None = None,
+        cancel_event: Event | None = None,
+        send_text: Callable[[str], None] | None = None,
+        send_group: Callable[[list[str]], list[Any]] | None = None,
+        chat_id: Any = None,
+        group_size: int = 0,
+        retries: int = 5
+    ) -> None:
+        self._send = send
+        self._send_text = send_text
+        self._send_group = send_group if group_size > 0 else None
+        self._on_error = on_error
+        self._cancel_event: Event | None = cancel_event
+        self._chat_id: Any = chat_id
+        self._group_size: int = group_size
+        # Grubun toplam boyutu da tek dosya sınırını aşmasın
+        self._group_bytes: int = max_upload_size()
+        self._retries: int = retries
+        self._high_water: int = high_water
+        self._on_disk: int = 0
+        self._condition: Condition = Condition()
+        self._items: Condition = Condition()
+        self._pending: deque = deque()
+        # Öğesi şu anda gönderilen sıra anahtarları
+        self._sending: set[str] = set()
+        self._closed: bool = False
+        self.failed: list[str] = []
+        self._limiter: TelegramRateLimiter = TelegramRateLimiter.shared()
+        self._retry: RetryPolicy = RetryPolicy.shared()
+        self._metrics: Metrics = Metrics.shared()
+        self._threads: list[Thread] = [
+            Thread(target=self._worker, name=f"uploader-{i}", daemon=True) for i in range(max(workers, 1))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _cancelled(self) -> bool:
+        """İşin iptal edilip edilmediğini kontrol etme fonksiyonu"""
+        return bool(self._cancel_event and self._cancel_event.is_set())
+
+    def reserve(self, size: int) -> None:
+        """Dosya için disk bütçesinden yer ayırma, sınır aşılıyorsa bekleme fonksiyonu"""
+        with self._condition:
+            # Kuyruk boşken büyük bir dosya tek başına sınırı aşsa da beklemeden başlar
+            while self._high_water and self._on_disk and self._on_disk + size > self._high_water:
+                if self._cancelled():
+                    break
+                self._condition.wait(1)
+
+            self._on_disk += size
+
+    def release(self, size: int) -> None:
+        """Ayrılan disk bütçesini geri verme fonksiyonu"""
+        with self._condition:
+            self._on_disk -= size
+            self._condition.notify_all()
+
+    def _enqueue(self, item: tuple[str, int, bool, Callable[[Any], None] | None, str | None]) -> None:
+        self._metrics.add("tg_upload_queue", 1)
+        with self._items:
+            self._pending.append(item)
+            self._items.notify()
+
+    def put(
+        self,
+        filepath: str,
+        size: int = 0,
+        on_sent: Callable[[Any], None] | None = None,
+        sequence: str | None = None
+    ) -> None:
+        """Tamamlanan dosyayı gönderim kuyruğuna ekleme fonksiyonu, `on_sent` gönderim sonucuyla çağrılır"""
+        self._enqueue((filepath, size, False, on_sent, sequence))
+
+    def put_text(self, text: str, sequence: str | None = None) -> None:
+        """Dosyaların arkasından gönderilecek bir metin mesajını kuyruğa ekleme fonksiyonu"""
+        self._enqueue((text, 0, True, None, sequence))
+
+    def _groupable(self, item: tuple[str, int, bool, Any, str | None]) -> int:
+        """Gruba girebilecek dosyanın boyutunu, giremiyorsa 0 döndürme fonksiyonu"""
+        if item[2] or item[4]:
+            return 0
+        try:
+            size: int = path.getsize(item[0])
+        except OSError:
+            return 0
+        return size if 0 < size <= self._group_size else 0
+
+    def _next_index(self) -> int | None:
+        """Gönderilebilecek ilk öğenin kuyruktaki yerini döndürme fonksiyonu, sırası başka yükleyicideyse atlanır"""
+        for index, item in enumerate(self._pending):
+            if item[4] is None or item[4] not in self._sending:
+                return index
+
+        return None
+
+    def _take(self) -> list[tuple[str, int, bool, Callable[[Any], None] | None, str | None]]:
+        """Gönderilebilecek ilk öğeyi kuyruktan alma fonksiyonu, öğe yoksa boş liste döner"""
+        with self._items:
+            index: int | None = self._next_index()
+            if index is None:
+                return []
+
+            batch: list[tuple[str, int, bool, Callable[[Any], None] | None, str | None]] = [self._pending[index]]
+            del self._pending[index]
+            if batch[0][4]:
+                self._sending.add(batch[0][4])
+
+        self._metrics.add("tg_upload_queue", -1)
+        return batch
+
+    def _fill(self, batch: list[tuple[str, int, bool, Callable[[Any], None] | None, str | None]]) -> None:
+        """Küçük bir dosyanın yanına kuyrukta sırası gelmiş küçük dosyaları gruplama fonksiyonu"""
+        total: int = self._groupable(batch[0]) if self._send_group else 0
+        if not total:
+            return
+
+        with self._items:
+            index: int | None = self._next_index()
+            while index is not None and index < len(self._pending) and len(batch) < self.GROUP_LIMIT:
+                size: int = self._groupable(self._pending[index])
+                if not size or total + size > self._group_bytes:
+                    break
+                batch.append(self._pending[index])
+                del self._pending[index]
+                total += size
+
+        self._metrics.add("tg_upload_queue", 1 - len(batch))
+
+    def _worker(self) -> None:
+        """Sırası gelince kuyruktan dosya veya dosya grubu alıp gönderen yükleyici döngüsü"""
+        while True:
+            with self._items:
+                while self._next_index() is None:
+                    if self._closed and not self._pending:
+                        return
+                    self._items.wait()
+
+            # Sıra yalnızca gönderilecek bir öğe alındıktan sonra beklenir, boşa sıra harcanmaz
+            batch: list[tuple[str, int, bool, Callable[[Any], None] | None, str | None]] = self._take()
+            if not batch:
+                continue
+
+            try:
+                # Sıra beklenirken kuyrukta biriken küçük dosyalar aynı gruba girer; iptalde _process gönderim yapmaz
+                self._limiter.acquire(self._chat_id, self._cancelled)
+                self._fill(batch)
+                self._process(batch)
+            except Exception as e:
+                _print(f"Gönderim sonrası işlem başarısız: {str(e)}{NEW_LINE}")
+            finally:
+                for item in batch:
+                    self.release(item[1])
+                if batch[0][4]:
+                    with self._items:
+                        self._sending.discard(batch[0][4])
+                        self._items.notify_all()
+
+    def _process(self, batch: list[tuple[str, int, bool, Callable[[Any], None] | None, str | None]]) -> None:
+        """Metni, tek dosyayı veya dosya grubunu gönderme fonksiyonu, grup gönderilemezse dosyaları tek tek dener"""
+        payload, _, is_text, _, _ = batch[0]
+        if self._cancelled():
+            return
+
+        if is_text:
+            try:
+                if self._send_text:
+                    self._with_retries(lambda: self._send_text(payload))
+            except Exception as e:
+                if self._on_error:
+                    self._on_error(payload, e)
+            return
+
+        if len(batch) > 1:
+            paths: list[str] = [item[0] for item in batch]
+            try:
+                with self._metrics.stage(
+                    "upload", "telegram", files=len(paths), size=sum(path.getsize(file_path) for file_path in paths)
+                ):
+                    messages: list[Any] = self._with_retries(lambda: self._send_group(paths))
+            except Exception as e:
+                _print(f"{len(paths)} dosyalık grup gönderilemedi, dosyalar tek tek gönderilecek: {str(e)}{NEW_LINE}")
+            else:
+                for item, message in zip(batch, messages):
+                    self._sent(item, message)
+                return
+
+        for index, item in enumerate(batch):
+            # Gruptan tek tek gönderime düşen her dosya kendi sırasını bekler
+            if len(batch) > 1 and not self._limiter.acquire(self._chat_id, self._cancelled):
+                return
+            try:
+                with self._metrics.stage(
+                    "upload", "telegram", file=path.basename(item[0]), size=path.getsize(item[0])
+                ):
+                    message: Any = self._with_retries(lambda: self._send(item[0]))
+            except Exception as e:
+                with self._items:
+                    self.failed.append(item[0])
+                if self._on_error:
+                    self._on_error(item[0], e)
+            else:
+                self._sent(item, message)
+
+    def call(self, send: Callable[[], Any]) -> Any:
+        """Kuyruğa girmeyen bir gönderimi sohbetin sırasını bekleyip yeniden denemelerle yapma fonksiyonu"""
+        if not self._limiter.acquire(self._chat_id, self._cancelled):
+            raise Exception("Gönderim iptal edildi")
+
+        return self._with_retries(send)
+
+    def _with_retries(self, send: Callable[[], Any]) -> Any:
+        """Gönderimi RetryAfter ve geçici ağ hatalarında yeniden deneme fonksiyonu, son hatayı fırlatır"""
+        attempt: int = 0
+        while True:
+            try:
+                return send()
+            except Exception as e:
+                from telegram.error import BadRequest, NetworkError, TimedOut
+
+                retry_after: float | None = getattr(e, "retry_after", None)
+                # BadRequest de NetworkError'dan türediği için geçici hata sayılmaz
+                transient: bool = retry_after is not None or isinstance(e, TRANSIENT_ERRORS) or \
+                    isinstance(e, (NetworkError, TimedOut)) and not isinstance(e, BadRequest)
+                if not transient or attempt >= self._retries or self._cancelled():
+                    raise
+
+                attempt += 1
+                if retry_after is not None:
+                    _print(f"Telegram {retry_after} sn beklenmesini istedi, gönderim erteleniyor.{NEW_LINE}")
+                    self._metrics.inc("tg_retry_after_total")
+                    self._limiter.pause(self._chat_id, float(retry_after))
+                else:
+                    delay: float = self._retry.backoff(attempt)
+                    _print(f"Telegram gönderimi yeniden deneniyor ({attempt}/{self._retries}), "
+                           f"{delay:.1f} sn sonra: {str(e)}{NEW_LINE}")
+                    if not self._retry.pause(delay, self._cancelled):
+                        raise
+                if not self._limiter.acquire(self._chat_id, self._cancelled):
+                    raise
+
+    def _sent(self, item: tuple[str, int, bool, Callable[[Any], None] | None, str | None], message: Any) -> None:
+        """Gönderilen dosyayı sayıp silme ve `on_sent` ile bildirme fonksiyonu"""
+        filepath, _, _, on_sent, _ = item
+        self._metrics.inc("tg_upload_bytes_total", path.getsize(filepath))
+        os.remove(filepath)
+        if on_sent:
+            on_sent(message)
+
+    def close(self) -> None:
+        """Kuyruktaki tüm dosyalar gönderilene kadar bekleyip yükleyicileri durdurma fonksiyonu"""
+        with self._items:
+            self._closed = True
+            self._items.notify_all()
+
+        for thread in self._threads:
+            thread.join()
+
+class Provider(ABC):
+    """İndirme servisleri için ortak arayüz ve indirme motoru
+
+    Servisler bu sınıftan türetilir ve yalnızca servise özgü dört adımı uygular:
+    `resolve` linki çözüp oturumu hazırlar ve tarama kökünü döndürür, `crawl`
+    klasör ağacını tararken bulduğu her dosyanın bilgisini (`path`, `name`,
+    `link`, `size`, `hash`, `key`) `_found` ile iletir, `download_headers`
+    dosya isteğinin başlıklarını verir, `refresh` ise sunucu isteği 401/403
+    ile reddettiğinde kimliği veya indirme sunucusunu yeniler. Parçalı ve
+    kaldığı yerden devam eden indirme, doğrulama, ilerleme, iş günlüğü ve
+    Telegram gönderimi tüm servislerde ortaktır. Dört adım soyut metottur,
+    birini uygulamayan servis iş başlamadan nesne oluşturulurken hata verir.
+    Servisler `register_provider` ile host adlarına kaydedilir.
+    """
+
+    # Metriklerde ve iş günlüğünde kullanılan servis adı
+    name: str = ""
+    # Kullanıcıya gösterilen servis adı
+    title: str = ""
+    # Ortam değişkeni ön eki (<ön ek>_DOWNLOADDIR, <ön ek>_CRAWLWORKERS)
+    env: str = ""
+    # Servisin bildirdiği özetin `StreamHasher` algoritması
+    hash_algorithm: str = "md5"
+
+    # Aynı anda diske yazmadan yapılan aktarımlar; tepe bellek yuva sayısı x halka boyutuyla sınırlıdır
+    _relay_slots: "BoundedSemaphore | None" = None
+    _relay_lock: Lock = Lock()
+
+    def __init__(
+        self,
+        url: str,
+        password: str | None = None,
+        max_workers: int = 5,
+        bot=None,
+        chat_id=None,
+        segments: int = 4,
+        cancel_event: Event | None = None,
+        engine: str | None = None,
+        journal: JobJournal | None = None,
+        job_id: int | None = None,
+        on_progress: Callable[[str], None] | None = None,
+        batch: "BatchDownloader | None" = None,
+        download_dir: str | None = None
+    ) -> None:
+        root_dir: str | None = download_dir or getenv(f"{self.env}_DOWNLOADDIR")
+
+        # Kurulum ağ isteği yapmaz, indirme `run` ile başlar
+        self.url: str = url
+        self._link_password: str | None = password
+        self._on_progress: Callable[[str], None] | None = on_progress
+        self._download_dir: str | None = download_dir
+        self._error: str | None = None
+        self.elapsed: float = 0.0
+
+        self._lock: Lock = Lock()
+        self._max_workers: int = max_workers
+        self._segments: int = segments
+        self._executor: ThreadPoolExecutor | None = None
+        self._cancel_event: Event | None = cancel_event
+        self._crawl_workers: int = int(getenv(f"{self.env}_CRAWLWORKERS", "8"))
+        self._engine: AsyncEngine | None = AsyncEngine.shared() \
+            if (engine or getenv("DL_ENGINE", "thread")) == "async" else None
+        self._local: local = local()
+        # İş günlüğü verilirse dosya durumları yazılır, gönderilmiş dosyalar yeniden başlatmada atlanır
+        self._journal: JobJournal | None = journal if job_id is not None else None
+        self._job_id: int | None = job_id
+        self._content_dir: str | None = None
+        self._files_info: list[dict[str, Any]] = []
+        # Toplu işte dosyalar linkler arası ortak kuyruktan indirilir, ilerleme ve gönderim de paylaşılır
+        self._batch: BatchDownloader | None = batch
+        self._progress: ProgressGroup | None = batch.progress if batch else None
+        # Tüm indirmeler iş numarasına göre ortak bant genişliği sınırlayıcısından geçer
+        self._limiter: BandwidthLimiter = BandwidthLimiter.shared()
+        # API ve indirme istekleri geçici hatalarda geri çekilerek yeniden denenir
+        self._retry: RetryPolicy = RetryPolicy.shared()
+        # Aşama süreleri, byte ve hata sayıları `/metrics` ve JSON loglarına yansır
+        self._metrics: Metrics = Metrics.shared()
+        self._count_bytes: Callable[[float], None] = self._metrics.counter("dl_bytes_total", provider=self.name)
+        # Dosyalar yazılırken servisin bildirdiği özetle doğrulanır, tutmayanlar yeniden indirilir
+        self._verify: bool = getenv("DL_VERIFY", "1") != "0"
+        self._verify_retries: int = int(getenv("DL_VERIFYRETRIES", "2"))
+        # Kimlik bilgileri (token, page_id) işler arasında paylaşılır ve diske yazılır
+        self._credentials: CredentialCache = CredentialCache.shared()
+        # Dosyalar yazılmadan önce diskte yer ayrılır, yer yoksa açılana kadar beklenir
+        self._disk: DiskAdmission = DiskAdmission.shared()
+        # TG_RELAY=1 ile Telegram sınırının altındaki dosyalar diske yazılmadan doğrudan yüklenir
+        self._relay: bool = getenv("TG_RELAY", "0") == "1" and not local_bot_api()
+        self._relay_buffer: int = parse_size(getenv("TG_RELAYBUFFER")) or 8 * 1024 * 1024
+
+        # Telegram bot ve chat id
+        self.bot = bot
+        self.chat_id = chat_id
+
+        # Çalışma dizini tüm sürece ait olduğu için chdir yerine mutlak yollar kullanılır
+        # `download_dir` açıkça verildiyse yoksa oluşturulur, ortam değişkenindeki dizin yalnızca varsa kullanılır
+        if download_dir:
+            os.makedirs(download_dir, exist_ok=True)
+        self._root_dir: str = path.abspath(root_dir if root_dir and path.exists(root_dir) else getcwd())
+
+        # Telegram sınırını aşan dosyalar bu boyutta numaralı parçalara bölünür
+        self._max_upload: int = max_upload_size()
+        self._part_size: int = min(parse_size(getenv("TG_PARTSIZE")) or self._max_upload, self._max_upload)
+
+        self._uploads: UploadPipeline | None = batch.uploads if batch else None
+        self._cache: FileIdCache | None = None
+
+    def run(self) -> dict[str, Any]:
+        """Linki tarayıp dosyaları indirme (bot verildiyse gönderme) ve sonucu `result` biçiminde döndürme fonksiyonu
+
+        Link yerine link listesi dosyası verilirse dosyadaki linkler tek bir toplu iş olarak indirilir
+        ve `BatchDownloader.run` sonucu döner. Hatalar yakalanmaz, çağırana iletilir.
+        """
+        if not self._batch and path.isfile(self.url):
+            return self._run_batch_file(self.url, self._link_password)
+
+        # İlerleme tek raporlayıcı thread'den konsola ve `on_progress` ile Telegram'a yansıtılır
+        if not self._batch:
+            self._progress = ProgressTracker.shared().group(self.url, self._on_progress)
+
+        # Her dosya indirilir indirilmez Telegram'a gönderilir
+        if self.bot and self.chat_id and not self._batch:
+            self._uploads = UploadPipeline(
+                self._send_file,
+                workers=int(getenv("TG_UPLOADWORKERS", "4")),
+                high_water=parse_size(getenv("DL_HIGHWATER")),
+                on_error=lambda file_path, e: self.bot.send_message(self.chat_id, f"Dosya gönderme hatası: {e}"),
+                cancel_event=self._cancel_event,
+                send_text=lambda text: self.bot.send_message(self.chat_id, text),
+                send_group=lambda file_paths: send_media_group(self.bot, self.chat_id, file_paths),
+                chat_id=self.chat_id,
+                group_size=parse_size(getenv("TG_GROUPSIZE", "10M")),
+                retries=int(getenv("TG_UPLOADRETRIES", "5"))
+            )
+
+        # Daha önce gönderilen dosyalar indirilmeden file_id ile yeniden gönderilir
+        self._cache = FileIdCache.shared() if self._uploads else None
+
+        # Birden fazla indirme birimi varsa iş en az yüklü birime yerleşir, toplu işte bunu BatchDownloader yapar
+        placed: bool = not self._download_dir and not self._batch
+        if placed:
+            hint: str | None = self._journal.first_path(self._job_id) if self._journal else None
+            self._root_dir = self._disk.place(self._placement_key(), self._root_dir, hint)
+
+        start: float = perf_counter()
+        try:
+            self._download(self.url, self._link_password)
+        except BaseException:
+            if self._uploads and not self._batch:
+                self._uploads.close()
+            raise
+        finally:
+            if placed:
+                self._disk.leave(self._placement_key())
+            if not self._batch:
+                ProgressTracker.shared().remove(self._progress)
+
+        # Kalan gönderimleri bekle ve içerik dizinini temizle, toplu işte bunu tüm dosyalar bitince BatchDownloader yapar
+        if not self._batch:
+            self._send_files_to_telegram()
+
+        self.elapsed = perf_counter() - start
+        return self.result()
+
+    def _placement_key(self) -> Any:
+        """Disk birimi yerleşiminde işi temsil eden anahtarı döndürme fonksiyonu"""
+        return self._job_id if self._job_id is not None else id(self)
+
+    def result(self) -> dict[str, Any]:
+        """Linkin ve dosyalarının boyut, süre ve hızlarını içeren sonucunu döndürme fonksiyonu
+
+        Dosya durumları: "ok" (indirildi), "failed" (indirilemedi), "skipped" (daha önce gönderildiği için
+        indirilmedi). `bytes` ve `speed` yalnızca bu çalışmada aktarılan veriyi sayar.
+        """
+        files: list[dict[str, Any]] = []
+        for file_info in self.files():
+            progress: FileProgress | None = file_info.get("progress")
+            state: str = "skipped" if progress is None else "ok" if progress.state == "tamamlandı" else "failed"
+            stats: dict[str, Any] = progress.stats() if progress else {"bytes": 0, "seconds": 0.0, "speed": 0}
+            files.append({
+                "name": file_info["name"],
+                "path": path.join(file_info["path"], file_info["name"]),
+                "size": file_info["size"],
+                "state": state,
+                "hash": file_info.get("verified"),
+                **stats
+            })
+
+        transferred: int = sum(file["bytes"] for file in files)
+        error: str | None = self._error or ("iptal edildi" if self._cancelled() else None)
+        # Toplu işte linkin dosyaları tarama bittikten sonra da indirildiği için işin süresi esas alınır
+        elapsed: float = self._batch.elapsed if self._batch else self.elapsed
+        return {
+            "url": self.url,
+            "service": self.name,
+            "ok": error is None and all(file["state"] != "failed" for file in files),
+            "error": error,
+            "files": files,
+            "bytes": transferred,
+            "seconds": round(elapsed, 4),
+            "speed": round(transferred / max(elapsed, 1e-6))
+        }
+
+    @abstractmethod
+    def resolve(self, url: str, password: str | None) -> Any:
+        """Linki çözüp oturumu hazırlama fonksiyonu, tarama kökünü veya link geçersizse None döndürür"""
+
+    @abstractmethod
+    def crawl(self, root: Any, on_file: Callable[[dict[str, Any]], None]) -> None:
+        """Tarama kökünden başlayıp bulunan dosyaları `_found` ile iletme fonksiyonu"""
+
+    @abstractmethod
+    def download_headers(self, file_info: dict[str, Any]) -> dict[str, str]:
+        """Dosya indirme isteği başlıklarını oluşturma fonksiyonu"""
+
+    @abstractmethod
+    def refresh(self, file_info: dict[str, Any], headers: dict[str, str]) -> bool:
+        """Reddedilen isteğin kimliğini veya indirme sunucusunu yenileme fonksiyonu, yenilenemezse False döner"""
+
+    def _cancelled(self) -> bool:
+        """İşin iptal edilip edilmediğini kontrol etme fonksiyonu"""
+        return bool(self._cancel_event and self._cancel_event.is_set())
+
+    def _throttle(self, size: int) -> None:
+        """Okunan byte'ları sayıp işin hız sınırına göre bekleme fonksiyonu"""
+        self._count_bytes(size)
+        self._limiter.throttle(self._job_id, size, self._cancelled)
+
+    async def _throttle_async(self, size: int) -> None:
+        """Okunan byte'ları sayıp işin hız sınırına göre olay döngüsünü bloklamadan bekleme fonksiyonu"""
+        self._count_bytes(size)
+        await self._limiter.throttle_async(self._job_id, size)
+
+    def _get(self, url: str, **kwargs) -> Any:
+        """Thread'e özel oturumla keep-alive bağlantıyı yeniden kullanan, geçici hatalarda yeniden deneyen GET fonksiyonu"""
+        session: Session | None = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = Session()
+
+        return self._retry.call(url, lambda: session.get(url, **kwargs), self._cancelled)
+
+    def _create_dir(self, dirpath: str) -> None:
+        """Dizin oluşturma fonksiyonu"""
+        try:
+            mkdir(dirpath)
+        except FileExistsError:
+            pass
+
+    def _found(self, file_info: dict[str, Any], on_file: Callable[[dict[str, Any]], None]) -> None:
+        """Taramada bulunan dosyayı listeye ekleyip indirme havuzuna iletme fonksiyonu"""
+        self._files_info.append(file_info)
+        on_file(file_info)
+
+    def _run_batch_file(self, filepath: str, password: str | None = None) -> dict[str, Any]:
+        """Link listesi dosyasındaki linkleri tek bir toplu iş olarak indirme fonksiyonu"""
+        with open(filepath, "r") as f:
+            links: list[tuple[str, str | None]] = read_links(f.read(), password)
+
+        # Dosyadaki linkler sırayla değil, tek bir toplu iş olarak paralel indirilir
+        return BatchDownloader(
+            links,
+            max_workers=int(getenv("DL_BATCHWORKERS", "8")),
+            crawl_workers=int(getenv("DL_BATCHCRAWLS", "4")),
+            bot=self.bot,
+            chat_id=self.chat_id,
+            segments=self._segments,
+            cancel_event=self._cancel_event,
+            journal=self._journal,
+            job_id=self._job_id,
+            download_dir=self._download_dir
+        ).run()
+
+    def _download(self, url: str, password: str | None = None) -> None:
+        """Linki çözüp klasör ağacını tararken bulunan dosyaları paralel indirme fonksiyonu"""
+        root: Any = self.resolve(url, password)
+        if root is None:
+            self._error = "geçersiz link"
+            return
+
+        if self._batch:
+            # Toplu işte dosyalar ortak öncelik kuyruğuna verilir, tarama bitince indirmeler beklenmez
+            self._executor = self._batch.executor
+            self.crawl(root, lambda file_info: self._batch.submit(self, file_info))
+        else:
+            futures: list[Future] = []
+
+            with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+                self._executor = executor
+
+                def on_file(file_info: dict[str, Any]) -> None:
+                    # asyncio motorunda dosya başına thread açılmaz, coroutine doğrudan döngüye gönderilir
+                    if self._engine:
+                        futures.append(self._engine.submit(self._download_and_upload_async(file_info)))
+                    else:
+                        futures.append(executor.submit(self._download_and_upload, file_info))
+
+                self.crawl(root, on_file)
+                # Segmentler de aynı havuza gönderildiği için havuz kapanmadan önce tüm dosyalar beklenir
+                wait(futures)
+                self._executor = None
+
+        if not self._files_info:
+            _print(f"{url} için dosya bulunamadı, hiçbir şey yapılmadı.{NEW_LINE}")
+            self._error = "dosya bulunamadı"
+            self._remove_empty_dirs()
+
+    def _remove_empty_dirs(self) -> None:
+        """Taramada oluşturulup boş kalan içerik dizinlerini silme fonksiyonu, dosya içeren dizinlere dokunmaz"""
+        if not self._content_dir or not path.isdir(self._content_dir):
+            return
+
+        for dirpath, _, _ in os.walk(self._content_dir, topdown=False):
+            try:
+                rmdir(dirpath)
+            except OSError:
+                pass
+
+    def _send_file(self, file_path: str) -> Any:
+        """Tek bir dosyayı Telegram'a gönderme fonksiyonu"""
+        return send_document(self.bot, self.chat_id, file_path)
+
+    def _send_cached(self, file_info: dict[str, Any]) -> bool:
+        """Dosya önbellekteyse indirmeden Telegram'daki kopyasını gönderme fonksiyonu, gönderildiyse True döner"""
+        entry: dict[str, Any] | None = self._cache.get(file_info["key"]) if self._cache else None
+        if not entry:
+            return False
+
+        try:
+            # Önbellekten gönderimler de yükleyicilerle aynı hız sınırından geçer
+            resend_cached(self.bot, self.chat_id, entry, self._uploads.call)
+        except Exception as e:
+            if self._cancelled():
+                return False
+            _print(f"{file_info['name']} önbellekten gönderilemedi, yeniden indirilecek: {str(e)}{NEW_LINE}")
+            self._cache.delete(file_info["key"])
+            return False
+
+        _print(f"{file_info['name']} önbellekten gönderildi.{NEW_LINE}")
+        return True
+
+    def _already_sent(self, file_info: dict[str, Any]) -> bool:
+        """Dosya bu işte daha önce gönderildiyse atlama, önbellekteyse oradan gönderme fonksiyonu, gönderildiyse True döner"""
+        if self._journal:
+            if self._journal.file_state(self._job_id, file_info["key"]) == "gönderildi":
+                _print(f"{file_info['name']} daha önce gönderilmiş, atlanıyor.{NEW_LINE}")
+                return True
+
+            filepath: str = path.join(file_info["path"], file_info["name"])
+            self._journal.add_file(self._job_id, file_info["key"], filepath, file_info["size"])
+
+        if not self._send_cached(file_info):
+            return False
+
+        if self._journal:
+            self._journal.update_file(self._job_id, file_info["key"], "gönderildi", file_info["size"])
+        return True
+
+    def _on_sent(self, file_info: dict[str, Any], index: int, message: Any) -> None:
+        """Gönderilen dosyanın (veya parçanın) file_id'sini kaydetme fonksiyonu"""
+        document: Any = getattr(message, "document", None)
+        with self._lock:
+            file_ids: dict[int, str | None] = file_info.setdefault("file_ids", {})
+            file_ids[index] = document.file_id if document else None
+
+        self._finish_sent(file_info)
+
+    def _finish_sent(self, file_info: dict[str, Any]) -> None:
+        """Tüm parçalar gönderildiyse dosyayı iş günlüğüne ve önbelleğe yazma fonksiyonu"""
+        with self._lock:
+            file_ids: dict[int, str | None] = file_info.get("file_ids", {})
+            # Bölünen dosyalarda parça sayısı özet mesajı kuyruğa eklenince belli olur
+            if file_info.get("split") and "manifest" not in file_info:
+                return
+            if len(file_ids) != file_info.get("parts", 1) or file_info.get("sent"):
+                return
+
+            file_info["sent"] = True
+            ordered: list[str | None] = [file_ids[index] for index in sorted(file_ids)]
+
+        if self._journal:
+            self._journal.update_file(self._job_id, file_info["key"], "gönderildi", file_info["size"])
+        if self._cache and all(ordered):
+            self._cache.put(file_info["key"], ordered, file_info.get("manifest"), file_info.get("verified"))
+
+    def _record_progress(self, file_info: dict[str, Any]) -> None:
+        """İndirme denemesi bittiğinde dosyanın diskteki byte sayısını iş günlüğüne yazma fonksiyonu"""
+        if not self._journal or file_info.get("sent"):
+            return
+
+        offset: int = resume_offset(path.join(file_info["path"], file_info["name"]))
+        state: str = "indirildi" if file_info["size"] and offset >= file_info["size"] else "yarım"
+        self._journal.update_file(self._job_id, file_info["key"], state, offset)
+
+    def _queue_upload(self, file_info: dict[str, Any]) -> None:
+        """İndirmesi biten dosyayı gönderim kuyruğuna ekleme, başarısızsa ayrılan yeri geri verme fonksiyonu"""
+        if not self._uploads:
+            return
+
+        filepath: str = path.join(file_info["path"], file_info["name"])
+        if path.isfile(filepath):
+            self._uploads.put(filepath, file_info["reserved"], lambda message: self._on_sent(file_info, 0, message))
+        else:
+            self._uploads.release(file_info["reserved"])
+
+    def _split_size(self, total_size: int) -> int:
+        """Dosya Telegram sınırını aşıyorsa parça boyutunu, aşmıyorsa 0 döndürme fonksiyonu"""
+        return self._part_size if self._uploads and total_size > self._max_upload else 0
+
+    def _sequence(self, file_info: dict[str, Any]) -> str:
+        """Bölünen dosyanın parçalarını ve özet mesajını aynı gönderim sırasına bağlayan anahtarı döndürme fonksiyonu"""
+        return path.join(file_info["path"], file_info["name"])
+
+    def _queue_part(self, file_info: dict[str, Any], part_path: str, index: int, size: int, digest: str) -> None:
+        """Biten parçayı ayrılan disk bütçesinden payıyla gönderim kuyruğuna ekleme fonksiyonu"""
+        with self._lock:
+            reserved: int = min(size, file_info["reserved"])
+            file_info["reserved"] -= reserved
+            file_info["split"] = True
+
+        self._uploads.put(
+            part_path, reserved, lambda message: self._on_sent(file_info, index, message), self._sequence(file_info)
+        )
+
+    def _queue_manifest(self, file_info: dict[str, Any], total_size: int, hashes: dict[int, str]) -> None:
+        """Parçaların özet mesajını son parçanın arkasından kuyruğa ekleme fonksiyonu"""
+        manifest: str = build_manifest(file_info["name"], total_size, hashes)
+        with self._lock:
+            file_info["manifest"] = manifest
+            file_info["parts"] = len(hashes)
+
+        self._uploads.put_text(manifest, self._sequence(file_info))
+        self._finish_sent(file_info)
+
+    def _download_and_upload(self, file_info: dict[str, Any]) -> None:
+        """Disk bütçesinden yer ayırıp dosyayı indirme ve gönderim kuyruğuna ekleme fonksiyonu"""
+        if self._already_sent(file_info):
+            self._metrics.inc("dl_files_total", provider=self.name, result="cached")
+            return
+
+        file_info["progress"] = self._progress.add(file_info["name"], file_info["size"])
+        if self._relay_file(file_info):
+            self._count_file(file_info)
+            return
+
+        file_info["reserved"] = file_info["size"]
+        if self._uploads:
+            self._uploads.reserve(file_info["size"])
+
+        try:
+            if self._reserve_disk(file_info):
+                with self._metrics.stage(
+                    "download", self.name, job=self._job_id, file=file_info["name"], size=file_info["size"]
+                ):
+                    for attempt in range(self._verify_retries + 1):
+                        self._download_content(file_info)
+                        if not self._redownload(file_info, attempt):
+                            break
+        finally:
+            self._disk.release(file_info["path"], file_info.pop("disk", 0))
+            self._count_file(file_info)
+            self._progress.finish(file_info["progress"], False)
+            self._record_progress(file_info)
+            self._queue_upload(file_info)
+
+    async def _download_and_upload_async(self, file_info: dict[str, Any]) -> None:
+        """`_download_and_upload` fonksiyonunun asyncio motoru karşılığı"""
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        if await loop.run_in_executor(None, self._already_sent, file_info):
+            self._metrics.inc("dl_files_total", provider=self.name, result="cached")
+            return
+
+        file_info["progress"] = self._progress.add(file_info["name"], file_info["size"])
+        if await loop.run_in_executor(None, self._relay_file, file_info):
+            self._count_file(file_info)
+            return
+
+        file_info["reserved"] = file_info["size"]
+        if self._uploads:
+            await loop.run_in_executor(None, self._uploads.reserve, file_info["size"])
+
+        try:
+            if await loop.run_in_executor(None, self._reserve_disk, file_info):
+                with self._metrics.stage(
+                    "download", self.name, job=self._job_id, file=file_info["name"], size=file_info["size"]
+                ):
+                    for attempt in range(self._verify_retries + 1):
+                        # Parçalı indirilecek veya bölünecek büyük dosyalar thread yoluna devredilir
+                        if file_info["size"] >= 2 * SEGMENT_MIN_SIZE or self._split_size(file_info["size"]):
+                            await loop.run_in_executor(None, self._download_content, file_info)
+                        else:
+                            await self._download_content_async(file_info)
+                        if not self._redownload(file_info, attempt):
+                            break
+        finally:
+            self._disk.release(file_info["path"], file_info.pop("disk", 0))
+            self._count_file(file_info)
+            self._progress.finish(file_info["progress"], False)
+            self._record_progress(file_info)
+            self._queue_upload(file_info)
+
+    @classmethod
+    def _relay_slot(cls) -> BoundedSemaphore:
+        """Süreç genelindeki aktarım yuvalarını döndürme fonksiyonu"""
+        with cls._relay_lock:
+            if cls._relay_slots is None:
+                cls._relay_slots = BoundedSemaphore(max(int(getenv("TG_RELAYWORKERS", "2")), 1))
+
+            return cls._relay_slots
+
+    def _relay_file(self, file_info: dict[str, Any]) -> bool:
+        """Telegram sınırının altındaki dosyayı diske yazmadan gönderme fonksiyonu, gönderildiyse True döner
+
+        Boyut bilinmiyorsa veya sınırı aşıyorsa, diskte önceki çalışmadan kalan kopyası varsa ya da tüm
+        aktarım yuvaları doluysa denenmez. Aktarım yarıda kalırsa dosya baştan disk yoluyla indirilir.
+        """
+        size: int = file_info["size"]
+        filepath: str = path.join(file_info["path"], file_info["name"])
+        if not self._relay or not self._uploads or self._cancelled() or not 0 < size <= self._max_upload:
+            return False
+        if any(path.exists(f"{filepath}{suffix}") for suffix in ("", ".part", ".segments")):
+            return False
+
+        slots: BoundedSemaphore = self._relay_slot()
+        if not slots.acquire(blocking=False):
+            return False
+
+        try:
+            # Doğrudan aktarım da yükleyici havuzuyla aynı hız sınırına tabidir
+            if not TelegramRateLimiter.shared().acquire(self.chat_id, self._cancelled):
+                raise RelayAborted("iptal edildi")
+            with self._metrics.stage("relay", self.name, job=self._job_id, file=file_info["name"], size=size):
+                message: Any = self._relay_stream(file_info)
+        except Exception as e:
+            if not self._cancelled():
+                _print(f"{file_info['name']} doğrudan gönderilemedi, diske indirilecek: {str(e)}{NEW_LINE}")
+            file_info["progress"].resume(0)
+            return False
+        finally:
+            slots.release()
+
+        self._metrics.inc("tg_upload_bytes_total", size)
+        self._progress.finish(file_info["progress"])
+        self._on_sent(file_info, 0, message)
+        return True
+
+    def _relay_stream(self, file_info: dict[str, Any]) -> Any:
+        """Dosya akışını sağlayıcıdan okuyup `RelayUpload` ile Telegram'a aktarma fonksiyonu, gönderilen mesajı döndürür"""
+        size: int = file_info["size"]
+        progress: FileProgress = file_info["progress"]
+        headers: dict[str, str] = self.download_headers(file_info)
+        # Veri diske yazılmadığı için özet yalnızca sıralı gelen akıştan hesaplanır
+        hasher: StreamHasher | None = self._hasher(file_info, path.join(file_info["path"], f"{file_info['name']}.part"))
+        refreshed: bool = False
+
+        while True:
+            with self._get(file_info["link"], headers=headers, stream=True, timeout=(9, 27)) as response:
+                if response.status_code in (401, 403) and not refreshed and self.refresh(file_info, headers):
+                    refreshed = True
+                    headers = self.download_headers(file_info)
+                    continue
+                if response.status_code != 200:
+                    raise RelayAborted(f"durum kodu {response.status_code}")
+
+                def finalize() -> bool:
+                    # Özet tutmazsa istek son byte'tan önce kesilir, disk yolu dosyayı yeniden indirir
+                    if hasher and not hasher.verify(size):
+                        _print(f"{file_info['name']} özeti tutmuyor: {hasher.digest} != {hasher.expected}{NEW_LINE}")
+                        self._metrics.inc("dl_errors_total", stage="verify", provider=self.name)
+                        return False
+                    if hasher:
+                        file_info["verified"] = hasher.digest
+                    return True
+
+                upload: RelayUpload = RelayUpload(
+                    self.bot, self.chat_id, file_info["name"], size, self._relay_buffer, finalize
+                )
+                offset: int = 0
+
+                def write(view: memoryview) -> None:
+                    nonlocal offset
+                    if hasher:
+                        hasher.update(offset, view)
+                    offset += len(view)
+                    upload.write(view)
+
+                def on_chunk(received: int) -> None:
+                    progress.downloaded += received
+
+                try:
+                    ChunkReader.from_env().copy(
+                        response, write, on_chunk, self._cancelled, limit=size, throttle=self._throttle
+                    )
+                    if self._cancelled():
+                        raise RelayAborted("iptal edildi")
+                    return upload.finish()
+                except BaseException as e:
+                    upload.abort(str(e))
+                    raise
+
+    def _reserve_disk(self, file_info: dict[str, Any]) -> bool:
+        """Dosyanın diskte eksik kalan kısmı kadar yer ayırma fonksiyonu, yer ayrılamazsa False döner"""
+        filepath: str = path.join(file_info["path"], file_info["name"])
+        needed: int = max(file_info["size"] - resume_offset(filepath), 0)
+
+        def on_wait(available: int) -> None:
+            _print(
+                f"{file_info['name']} için disk alanı bekleniyor: {_format_size(needed)} gerekli, "
+                f"{_format_size(max(available, 0))} boş.{NEW_LINE}"
+            )
+
+        with self._metrics.stage("disk", self.name, job=self._job_id, file=file_info["name"], size=needed):
+            if not self._disk.reserve(file_info["path"], needed, self._cancelled, on_wait):
+                if not self._cancelled():
+                    _print(f"{file_info['name']} için diskte yer açılmadı, indirilmeyecek.{NEW_LINE}")
+                    self._metrics.inc("dl_errors_total", stage="disk", provider=self.name)
+                return False
+
+        file_info["disk"] = needed
+        return True
+
+    def _count_file(self, file_info: dict[str, Any]) -> None:
+        """Dosyanın indirme sonucunu metriklere yazma fonksiyonu"""
+        ok: bool = file_info["progress"].state == "tamamlandı"
+        self._metrics.inc("dl_files_total", provider=self.name, result="ok" if ok else "failed")
+
+    def _hasher(self, file_info: dict[str, Any], tmp_file: str) -> StreamHasher | None:
+        """Servis dosyanın özetini bildirdiyse `.part` dosyası için özetleyici döndürme fonksiyonu"""
+        if not self._verify or not file_info.get("hash"):
+            return None
+
+        return StreamHasher(tmp_file, self.hash_algorithm, file_info["hash"])
+
+    def _corrupt(self, file_info: dict[str, Any], hasher: StreamHasher) -> None:
+        """Özeti tutmayan dosyayı yeniden indirilmek üzere işaretleme fonksiyonu"""
+        _print(f"{file_info['name']} özeti tutmuyor: {hasher.digest} != {hasher.expected}{NEW_LINE}")
+        self._metrics.inc("dl_errors_total", stage="verify", provider=self.name)
+        file_info["corrupt"] = True
+
+    def _verify_file(self, file_info: dict[str, Any], hasher: StreamHasher | None, tmp_file: str, size: int) -> bool:
+        """İndirilen dosyanın özetini servisin bildirdiğiyle karşılaştırma fonksiyonu, tutmazsa `.part` dosyasını siler"""
+        if not hasher:
+            return True
+
+        if hasher.verify(size):
+            file_info["verified"] = hasher.digest
+            return True
+
+        self._corrupt(file_info, hasher)
+        os.remove(tmp_file)
+        return False
+
+    def _redownload(self, file_info: dict[str, Any], attempt: int) -> bool:
+        """Özeti tutmayan dosyanın yeniden indirilip indirilmeyeceğini döndürme fonksiyonu"""
+        if not file_info.pop("corrupt", False) or self._cancelled():
+            return False
+
+        if attempt >= self._verify_retries:
+            _print(f"{file_info['name']} {attempt + 1} denemede de bozuk indi, gönderilmeyecek.{NEW_LINE}")
+            return False
+
+        _print(f"{file_info['name']} yeniden indiriliyor ({attempt + 1}/{self._verify_retries}).{NEW_LINE}")
+        return True
+
+    def files(self) -> list[dict[str, Any]]:
+        """Taramada bulunan dosyaların bilgilerini döndürme fonksiyonu"""
+        return list(self._files_info)
+
+    def _send_files_to_telegram(self):
+        """Gönderim kuyruğunun bitmesini bekleyip içerik dizinini temizleme fonksiyonu"""
+        if not self._uploads:
+            return
+
+        self._uploads.close()
+
+        if not self._content_dir or self._cancelled():
+            return
+
+        # Gönderilemeyen dosyalar silinmez, yalnızca boş kalan dizinler temizlenir
+        unsent: list[str] = [
+            file_path for file_path in self._uploads.failed if file_path.startswith(self._content_dir + os.sep)
+        ]
+        if unsent:
+            _print(f"{len(unsent)} dosya gönderilemedi, {self._content_dir} dizininde bırakıldı.{NEW_LINE}")
+            self._remove_empty_dirs()
+            return
+
+        try:
+            if path.exists(self._content_dir):
+                shutil.rmtree(self._content_dir)
+        except Exception as e:
+            _print(f"İçerik dizini silinemedi: {str(e)}{NEW_LINE}")
+
+    def _download_content(self, file_info: dict[str, Any]) -> None:
+        """Dosya indirme fonksiyonu"""
+        if self._cancelled():
+            return
+
+        filepath: str = path.join(file_info["path"], file_info["name"])
+        tmp_file: str = f"{filepath}.part"
+        promote_complete_part(filepath, file_info["size"], self._hasher(file_info, tmp_file))
+        if path.isfile(filepath) and path.getsize(filepath) > 0:
+            _print(f"{filepath} zaten var, atlanıyor.{NEW_LINE}")
+            # Diskte bulunan dosya bu çalışmada aktarılmış sayılmaz
+            file_info["progress"].resume(path.getsize(filepath))
+            self._progress.finish(file_info["progress"])
+            return
+
+        headers: dict[str, str] = self.download_headers(file_info)
+
+        # Yarım kalmış tek parçalı indirmeler Range ile kaldığı yerden devam eder
+        if (self._segments > 1 or self._uploads) and \
+                (path.isfile(f"{filepath}.segments") or not path.isfile(tmp_file)):
+            if self._download_segmented(file_info, filepath, headers):
+                return
+        discard_segmented_part(filepath)
+
+        progress: FileProgress = file_info["progress"]
+        total_size: int | None = None
+        failures: int = 0
+        refreshed: bool = False
+        hasher: StreamHasher | None = self._hasher(file_info, tmp_file)
+
+        try:
+            # Bağlantı yarıda koparsa son yazılan byte'tan Range ile yeniden bağlanılır
+            while not self._cancelled():
+                part_size: int = path.getsize(tmp_file) if path.isfile(tmp_file) else 0
+                if part_size:
+                    headers["Range"] = f"bytes={part_size}-"
+                    # Önceki çalışmadan kalan kısım bir kez okunur, yeni gelen veri yazılırken özetlenir
+                    if hasher:
+                        hasher.written(0, part_size)
+
+                split_size: int = 0
+                streaming: bool = False
+                try:
+                    with self._get(file_info["link"], headers=headers, stream=True, timeout=(9, 27)) as response:
+                        status_code: int = response.status_code
+
+                        # Reddedilen token veya indirme sunucusu bir kez yenilenip istek tekrarlanır
+                        if status_code in (401, 403) and not refreshed and self.refresh(file_info, headers):
+                            refreshed = True
+                            headers = self.download_headers(file_info)
+                            continue
+
+                        if part_size and status_code == 200:
+                            # Sunucu Range isteğini yok saydı, dosya baştan indirilir
+                            part_size = 0
+                            hasher = self._hasher(file_info, tmp_file)
+                        elif status_code != (206 if part_size else 200):
+                            _print(f"{file_info['link']} adresinden dosya indirilemedi.{NEW_LINE}Durum kodu: {status_code}{NEW_LINE}")
+                            return
+
+                        # 206 yanıtında Content-Length yalnızca kalan kısmın boyutudur
+                        content_length: str | None = response.headers.get("Content-Length")
+                        if total_size is None:
+                            progress.resume(part_size)
+                        else:
+                            progress.downloaded = part_size
+                        total_size = part_size + int(content_length) if content_length else file_info["size"]
+                        if not total_size:
+                            _print(f"{file_info['link']} adresinden dosya boyutu alınamadı.{NEW_LINE}")
+                            return
+                        progress.total = total_size
+
+                        # Range desteklemeyen sunucularda büyük dosyalar yazılırken parçalara bölünür
+                        split_size = self._split_size(total_size) if not part_size else 0
+                        writer = SplitWriter(
+                            filepath, total_size, split_size, lambda *part: self._queue_part(file_info, *part)
+                        ) if split_size else open(tmp_file, "ab" if part_size else "wb")
+
+                        def on_chunk(size: int) -> None:
+                            progress.downloaded += size
+
+                        offset: int = part_size
+
+                        def write(view: memoryview) -> None:
+                            nonlocal offset
+                            handler.write(view)
+                            if hasher and not split_size:
+                                hasher.update(offset, view)
+                            offset += len(view)
+
+                        streaming = True
+                        with writer as handler:
+                            ChunkReader.from_env().copy(response, write, on_chunk, self._cancelled, throttle=self._throttle)
+
+                        if split_size and writer.complete:
+                            self._queue_manifest(file_info, writer.size, writer.hashes)
+                            self._progress.finish(progress)
+                except TRANSIENT_ERRORS as e:
+                    # Bağlantı kurulurken alınan hatalar `_get` içinde zaten yeniden denendi
+                    if not streaming:
+                        raise
+                    _print(f"{file_info['name']} bağlantısı koptu: {str(e)}{NEW_LINE}")
+
+                # Parçalara bölünerek yazılan akış diskte .part bırakmadığı için sürdürülemez
+                received: int = (path.getsize(tmp_file) if path.isfile(tmp_file) else 0) - part_size
+                if split_size or part_size + received >= total_size or self._cancelled():
+                    break
+
+                failures = 0 if received > 0 else failures + 1
+                if failures >= self._retry.attempts or \
+                        not self._retry.pause(self._retry.backoff(failures), self._cancelled):
+                    _print(f"{file_info['name']} indirmesi tamamlanamadı, tekrar denendiğinde kaldığı yerden devam edilecek.{NEW_LINE}")
+                    break
+        except Exception as e:
+            # .part dosyası silinmez, sonraki denemede Range ile kaldığı yerden devam edilir
+            _print(f"{file_info['name']} indirilemedi: {str(e)}{NEW_LINE}")
+        finally:
+            if total_size and path.isfile(tmp_file) and path.getsize(tmp_file) == total_size and \
+                    self._verify_file(file_info, hasher, tmp_file, total_size):
+                move(tmp_file, filepath)
+                self._progress.finish(progress)
+
+    def _download_segmented(self, file_info: dict[str, Any], filepath: str, headers: dict[str, str]) -> bool:
+        """Büyük dosyaları parçalı indirme fonksiyonu, dosya ele alındıysa True döner"""
+        url: str = file_info["link"]
+
+        # Servisin bildirdiği boyut küçükse yoklama isteğine gerek yok
+        if 0 < file_info["size"] < 2 * SEGMENT_MIN_SIZE and not self._split_size(file_info["size"]):
+            return False
+
+        try:
+            total_size, accepts_ranges = probe_size(url, headers, self._get)
+        except Exception as e:
+            _print(f"{url} boyut yoklama hatası: {str(e)}{NEW_LINE}")
+            # Yarım kalmış parçalı indirme tek bağlantıya düşürülmez, sonraki denemede kalan segmentlerden sürer
+            return path.isfile(f"{filepath}.segments")
+
+        if not total_size or not accepts_ranges:
+            return False
+
+        split_size: int = self._split_size(total_size)
+        if not split_size and (self._segments <= 1 or total_size < 2 * SEGMENT_MIN_SIZE):
+            return False
+
+        hasher: StreamHasher | None = self._hasher(file_info, f"{filepath}.part")
+        download: SegmentedDownload = SegmentedDownload(
+            url, filepath, total_size, headers, self._segments, self._get, self._cancel_event, split_size,
+            self._throttle, self._retry, hasher
+        )
+        progress: FileProgress = file_info["progress"]
+        progress.total = total_size
+        progress.resume(download.downloaded)
+
+        def on_progress(downloaded: int) -> None:
+            progress.downloaded = downloaded
+
+        on_part = (lambda *part: self._queue_part(file_info, *part)) if split_size else None
+
+        if download.run(self._executor, on_progress, on_part=on_part):
+            if split_size:
+                self._queue_manifest(file_info, total_size, download.hashes)
+            elif hasher:
+                file_info["verified"] = hasher.digest
+            self._progress.finish(progress)
+        elif download.corrupt:
+            self._corrupt(file_info, hasher)
+        elif not self._cancelled():
+            _print(f"{file_info['name']} parçalı indirme tamamlanamadı, tekrar denendiğinde kalan segmentlerden devam edilecek.{NEW_LINE}")
+
+        return True
+
+    async def _download_content_async(self, file_info: dict[str, Any]) -> None:
+        """Dosyayı asyncio motoruyla indirme fonksiyonu"""
+        if self._cancelled():
+            return
+
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        filepath: str = path.join(file_info["path"], file_info["name"])
+        tmp_file: str = f"{filepath}.part"
+        await loop.run_in_executor(
+            None, promote_complete_part, filepath, file_info["size"], self._hasher(file_info, tmp_file)
+        )
+        if path.isfile(filepath) and path.getsize(filepath) > 0:
+            _print(f"{filepath} zaten var, atlanıyor.{NEW_LINE}")
+            # Diskte bulunan dosya bu çalışmada aktarılmış sayılmaz
+            file_info["progress"].resume(path.getsize(filepath))
+            self._progress.finish(file_info["progress"])
+            return
+
+        await loop.run_in_executor(None, discard_segmented_part, filepath)
+        # Motor mevcut .part dosyasına Range ile kaldığı yerden ekler
+        progress: FileProgress = file_info["progress"]
+        progress.resume(path.getsize(tmp_file) if path.isfile(tmp_file) else 0)
+
+        # Önceki çalışmadan kalan kısım bir kez okunur, yeni gelen veri yazılırken özetlenir
+        hasher: StreamHasher | None = self._hasher(file_info, tmp_file)
+        if hasher and progress.downloaded:
+            await loop.run_in_executor(None, hasher.written, 0, progress.downloaded)
+
+        def on_chunk(size: int) -> None:
+            progress.downloaded += size
+
+        try:
+            for refreshed in (False, True):
+                headers: dict[str, str] = self.download_headers(file_info)
+                status_code, total_size = await self._engine.fetch(
+                    file_info["link"], headers, tmp_file, on_chunk, self._cancel_event,
+                    throttle=self._throttle_async, retry=self._retry, hasher=hasher
+                )
+                # Reddedilen token veya indirme sunucusu bir kez yenilenip istek tekrarlanır
+                if refreshed or status_code not in (401, 403) or \
+                        not await loop.run_in_executor(None, self.refresh, file_info, headers):
+                    break
+        except Exception as e:
+            # .part dosyası silinmez, sonraki denemede Range ile kaldığı yerden devam edilir
+            _print(f"{file_info['name']} indirilemedi: {str(e)}{NEW_LINE}")
+            return
+
+        if total_size is None:
+            _print(f"{file_info['link']} adresinden dosya indirilemedi.{NEW_LINE}Durum kodu: {status_code}{NEW_LINE}")
+            return
+
+        if path.isfile(tmp_file) and path.getsize(tmp_file) == total_size and \
+                await loop.run_in_executor(None, self._verify_file, file_info, hasher, tmp_file, total_size):
+            move(tmp_file, filepath)
+            progress.total = total_size
+            self._progress.finish(progress)
+
+class GoFileDownloader(Provider):
+    """GoFile linklerini misafir hesabı token'ıyla indiren servis"""
+
+    name: str = "gofile"
+    title: str = "GoFile"
+    env: str = "GF"
+    hash_algorithm: str = "md5"
 
-    def _create_dir(self, dirname: str) -> None:
-        """Dizin oluşturma fonksiyonu"""
-        current_dir: str = getcwd()
-        filepath: str = path.join(current_dir, dirname)
+    def __init__(self, url: str, password: str | None = None, **options: Any) -> None:
+        # GF_APIURL ile API yerel sahte sunucuya (fakeservers.py) yönlendirilebilir
+        self._api_url: str = getenv("GF_APIURL", "https://api.gofile.io").rstrip("/")
+        token: str | None = getenv("GF_TOKEN")
+        # Misafir token'ı işler arasında paylaşılır ve diske yazılır, her link için yeni hesap açılmaz
+        self._static_token: bool = bool(token)
+        self._token: str | None = token
+        self._password: str | None = None
+        super().__init__(url, password, **options)
 
+    def resolve(self, url: str, password: str | None) -> str | None:
+        """Linkteki içerik ID'sini çıkarıp token'ı hazırlama fonksiyonu"""
         try:
-            mkdir(path.join(filepath))
-        except FileExistsError:
-            pass
+            if not url.split("/")[-2] == "d":
+                _print(f"URL muhtemelen geçerli bir ID içermiyor: {url}.{NEW_LINE}")
+                return None
 
-    def _download_content(self, file_info: dict[str, str], chunk_size: int = 16384) -> None:
-        """Dosya indirme fonksiyonu"""
-        filepath: str = path.join(file_info["path"], file_info["filename"])
-        if path.exists(filepath):
-            if path.getsize(filepath) > 0:
-                _print(f"{filepath} zaten var, atlanıyor.{NEW_LINE}")
-                return
+            content_id: str = url.split("/")[-1]
+        except IndexError:
+            _print(f"{url} geçerli bir URL gibi görünmüyor.{NEW_LINE}")
+            return None
 
-        tmp_file: str =  f"{filepath}.part"
+        self._password = sha256(password.encode()).hexdigest() if password else password
+        if not self._token:
+            self._token = self._get_token()
+        return content_id
+
+    def download_headers(self, file_info: dict[str, Any]) -> dict[str, str]:
+        """Dosya indirme isteği başlıklarını oluşturma fonksiyonu"""
         url: str = file_info["link"]
         user_agent: str | None = getenv("GF_USERAGENT")
 
-        headers: dict[str, str] = {
+        return {
             "Cookie": f"accountToken={self._token}",
             "Accept-Encoding": "gzip, deflate, br",
             "User-Agent": user_agent if user_agent else "Mozilla/5.0",
@@ -144,230 +3661,190 @@ class GoFileDownloader:
             "Cache-Control": "no-cache"
         }
 
-        part_size: int = 0
-        if path.isfile(tmp_file):
-            part_size = int(path.getsize(tmp_file))
-            headers["Range"] = f"bytes={part_size}-"
-
-        has_size: str | None = None
-        status_code: int | None = None
+    def refresh(self, file_info: dict[str, Any], headers: dict[str, str]) -> bool:
+        """İsteği reddedilen token'ı yenileme fonksiyonu"""
+        return self._refresh_token(headers["Cookie"].removeprefix("accountToken="))
 
-        try:
-            with get(url, headers=headers, stream=True, timeout=(9, 27)) as response_handler:
-                status_code = response_handler.status_code
-
-                if ((response_handler.status_code in (403, 404, 405, 500)) or
-                    (part_size == 0 and response_handler.status_code != 200) or
-                    (part_size > 0 and response_handler.status_code != 206)):
-                    _print(
-                        f"{url} adresinden dosya indirilemedi."
-                        f"{NEW_LINE}"
-                        f"Durum kodu: {status_code}"
-                        f"{NEW_LINE}"
-                    )
-                    return
-
-                content_lenth: str | None = response_handler.headers.get("Content-Length")
-                has_size = content_lenth if part_size == 0 \
-                    else content_lenth.split("/")[-1] if content_lenth else None
-
-                if not has_size:
-                    _print(
-                        f"{url} adresinden dosya boyutu alınamadı."
-                        f"{NEW_LINE}"
-                        f"Durum kodu: {status_code}"
-                        f"{NEW_LINE}"
-                    )
-                    return
-
-                with open(tmp_file, "ab") as handler:
-                    total_size: float = float(has_size)
-
-                    start_time: float = perf_counter()
-                    for i, chunk in enumerate(response_handler.iter_content(chunk_size=chunk_size)):
-                        progress: float = (part_size + (i * len(chunk))) / total_size * 100
-
-                        handler.write(chunk)
+    def _get_token(self) -> str:
+        """Önbellekteki GoFile token'ını döndürme, yoksa yeni misafir hesabı açma fonksiyonu"""
+        with self._metrics.stage("auth", "gofile", job=self._job_id):
+            token: str | None = self._credentials.fetch(
+                "gofile:token", float(getenv("GF_TOKENTTL", "86400")), self._create_account
+            )
+        if not token:
+            raise Exception("GoFile misafir hesabı açılamadı")
 
-                        rate: float = (i * len(chunk)) / (perf_counter()-start_time)
-                        unit: str = "B/s"
-                        if rate < (1024):
-                            unit = "B/s"
-                        elif rate < (1024*1024):
-                            rate /= 1024
-                            unit = "KB/s"
-                        elif rate < (1024*1024*1024):
-                            rate /= (1024 * 1024)
-                            unit = "MB/s"
-                        elif rate < (1024*1024*1024*1024):
-                            rate /= (1024 * 1024 * 1024)
-                            unit = "GB/s"
+        return token
 
-                        with self._lock:
-                            _print(f"\r{' ' * len(self._message)}")
+    def _refresh_token(self, stale: str) -> bool:
+        """Sunucunun reddettiği token'ı önbellekten düşüp yenisini alma fonksiyonu, yenilenemezse False döner"""
+        if self._static_token:
+            return False
 
-                            self._message = f"\r{file_info['filename']} indiriliyor: {part_size + i * len(chunk)}" \
-                            f" / {has_size} {round(progress, 1)}% {round(rate, 1)}{unit}"
+        self._credentials.invalidate("gofile:token", stale)
+        with self._metrics.stage("auth", "gofile", job=self._job_id, refresh=True):
+            token: str | None = self._credentials.fetch(
+                "gofile:token", float(getenv("GF_TOKENTTL", "86400")), self._create_account
+            )
+        if not token or token == stale:
+            return False
 
-                            _print(self._message)
-        finally:
-            with self._lock:
-                if has_size and path.getsize(tmp_file) == int(has_size):
-                    _print(f"\r{' ' * len(self._message)}")
-                    _print(f"\r{file_info['filename']} indirildi: "
-                        f"{path.getsize(tmp_file)} / {has_size} Tamamlandı!"
-                        f"{NEW_LINE}"
-                    )
-                    move(tmp_file, filepath)
+        _print(f"GoFile token'ı yenilendi.{NEW_LINE}")
+        self._token = token
+        return True
 
-    def _threaded_downloads(self) -> None:
-        """Paralel indirme fonksiyonu"""
-        if not self._content_dir:
-            _print(f"İçerik dizini oluşturulamadı, hiçbir şey yapılmadı.{NEW_LINE}")
-            return
+    def _create_account(self) -> str | None:
+        """GoFile misafir hesabı açıp token alma fonksiyonu"""
+        user_agent: str | None = getenv("GF_USERAGENT")
+        headers: dict[str, str] = {
+            "User-Agent": user_agent if user_agent else "Mozilla/5.0",
+            "Accept-Encoding": "gzip, deflate, br",
+            "Accept": "*/*",
+            "Connection": "keep-alive",
+        }
 
-        chdir(self._content_dir)
+        url: str = f"{self._api_url}/accounts"
+        create_account_response: dict[Any, Any] = self._retry.call(
+            url, lambda: post(url, headers=headers, timeout=(9, 27)), self._cancelled
+        ).json()
 
-        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
-            for item in self._files_info.values():
-                executor.submit(self._download_content, item)
+        if create_account_response["status"] != "ok":
+            return None
 
-        chdir(self._root_dir)
+        return create_account_response["data"]["token"]
 
-    def _parse_links_recursively(
-        self,
-        content_id: str,
-        password: str | None = None
-    ) -> None:
-        """Linkleri recursive olarak ayrıştırma fonksiyonu"""
-        url: str = f"https://api.gofile.io/contents/{content_id}?wt=4fd6sg89d7s6&cache=true"
+    def _fetch_contents(self, content_id: str, password: str | None = None) -> dict[Any, Any] | None:
+        """Tek bir içeriğin bilgilerini API'den alma fonksiyonu"""
+        url: str = f"{self._api_url}/contents/{content_id}?wt=4fd6sg89d7s6&cache=true"
 
         if password:
             url = f"{url}&password={password}"
 
         user_agent: str | None = getenv("GF_USERAGENT")
 
+        token: str = self._token
         headers: dict[str, str] = {
             "User-Agent": user_agent if user_agent else "Mozilla/5.0",
             "Accept-Encoding": "gzip, deflate, br",
             "Accept": "*/*",
             "Connection": "keep-alive",
-            "Authorization": f"Bearer {self._token}",
+            "Authorization": f"Bearer {token}",
         }
 
-        response: dict[Any, Any] = get(url, headers=headers).json()
+        try:
+            response_handler: Any = self._get(url, headers=headers, timeout=(9, 27))
+            # Süresi dolan veya silinen misafir hesabının token'ı bir kez yenilenip istek tekrarlanır
+            if response_handler.status_code in (401, 403) and self._refresh_token(token):
+                headers["Authorization"] = f"Bearer {self._token}"
+                response_handler = self._get(url, headers=headers, timeout=(9, 27))
+
+            response: dict[Any, Any] = response_handler.json()
+        except Exception as e:
+            self._metrics.inc("dl_errors_total", stage="crawl", provider="gofile")
+            _print(f"{url} adresinden yanıt alınamadı: {str(e)}{NEW_LINE}")
+            return None
 
         if response["status"] != "ok":
+            self._metrics.inc("dl_errors_total", stage="crawl", provider="gofile")
             _print(f"{url} adresinden yanıt alınamadı.{NEW_LINE}")
-            return
+            return None
 
         data: dict[Any, Any] = response["data"]
 
         if "password" in data and "passwordStatus" in data and data["passwordStatus"] != "passwordOk":
             _print(f"Parola korumalı link. Lütfen parolayı girin.{NEW_LINE}")
-            return
-
-        if data["type"] == "folder":
-            if not self._content_dir and data["name"] != content_id:
-                self._content_dir = path.join(self._root_dir, content_id)
-                self._create_dir(self._content_dir)
-                chdir(self._content_dir)
-            elif not self._content_dir and data["name"] == content_id:
-                self._content_dir = path.join(self._root_dir, content_id)
-                self._create_dir(self._content_dir)
-
-            self._create_dir(data["name"])
-            chdir(data["name"])
-
-            for child_id in data["children"]:
-                child: dict[Any, Any] = data["children"][child_id]
+            return None
 
-                if child["type"] == "folder":
-                    self._parse_links_recursively(child["id"], password)
-                else:
-                    self._recursive_files_index += 1
+        return data
 
-                    self._files_info[str(self._recursive_files_index)] = {
-                        "path": getcwd(),
-                        "filename": child["name"],
-                        "link": child["link"]
-                    }
+    def _add_file(self, parent_dir: str, item: dict[Any, Any], on_file: Callable[[dict[str, Any]], None]) -> None:
+        """API'nin dosya kaydını ortak dosya bilgisine çevirip iletme fonksiyonu"""
+        size: int = int(item.get("size", 0))
+        self._found({
+            "path": parent_dir,
+            "name": item["name"],
+            "link": item["link"],
+            "size": size,
+            "hash": item.get("md5"),
+            # Aynı içerik farklı linklerden gelse de md5 ile tanınır
+            "key": f"gofile:md5:{item['md5']}:{size}" if item.get("md5") else f"gofile:id:{item.get('id', item['link'])}"
+        }, on_file)
 
-            chdir(path.pardir)
-        else:
-            self._recursive_files_index += 1
+    def crawl(self, content_id: str, on_file: Callable[[dict[str, Any]], None]) -> None:
+        """Klasör ağacını genişlik öncelikli ve paralel tarama fonksiyonu
 
-            self._files_info[str(self._recursive_files_index)] = {
-                "path": getcwd(),
-                "filename": data["name"],
-                "link": data["link"]
+        Kardeş klasörler sınırlı bir havuzda aynı anda istenir. Yanıtlar yalnızca
+        bu thread'de işlendiği için dizin ve dosya listesi kilitsiz güncellenir.
+        """
+        with self._metrics.stage("crawl", "gofile", job=self._job_id), \
+                ThreadPoolExecutor(max_workers=self._crawl_workers) as crawler:
+            pending: dict[Future, tuple[str, str]] = {
+                crawler.submit(self._fetch_contents, content_id, self._password): (content_id, self._root_dir)
             }
 
-    def _parse_url_or_file(self, url_or_file: str, _password: str | None = None) -> None:
-        """URL veya dosyayı ayrıştırma fonksiyonu"""
-        if not (path.exists(url_or_file) and path.isfile(url_or_file)):
-            self._download(url_or_file, _password)
-            return
-
-        with open(url_or_file, "r") as f:
-            lines: list[str] = f.readlines()
-
-        for line in lines:
-            line_splitted: list[str] = line.split(" ")
-            url: str = line_splitted[0].strip()
-            password: str | None = _password if _password else line_splitted[1].strip() \
-                if len(line_splitted) > 1 else _password
+            while pending and not self._cancelled():
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
 
-            self._download(url, password)
-
-    def _download(self, url: str, password: str | None = None) -> None:
-        """İndirme fonksiyonu"""
-        try:
-            if not url.split("/")[-2] == "d":
-                _print(f"URL muhtemelen geçerli bir ID içermiyor: {url}.{NEW_LINE}")
-                return
+                for future in done:
+                    folder_id, parent_dir = pending.pop(future)
+                    data: dict[Any, Any] | None = future.result()
 
-            content_id: str = url.split("/")[-1]
-        except IndexError:
-            _print(f"{url} geçerli bir URL gibi görünmüyor.{NEW_LINE}")
-            return
+                    if not data:
+                        continue
 
-        _password: str | None = sha256(password.encode()).hexdigest() if password else password
+                    if data["type"] != "folder":
+                        self._add_file(parent_dir, data, on_file)
+                        continue
 
-        self._parse_links_recursively(content_id, _password)
+                    if not self._content_dir:
+                        self._content_dir = path.join(self._root_dir, folder_id)
+                        self._create_dir(self._content_dir)
 
-        if not self._content_dir:
-            _print(f"{url} için içerik dizini oluşturulamadı, hiçbir şey yapılmadı.{NEW_LINE}")
-            return
+                        if data["name"] != folder_id:
+                            parent_dir = self._content_dir
 
-        if not listdir(self._content_dir) and not self._files_info:
-            _print(f"{url} için boş dizin, hiçbir şey yapılmadı.{NEW_LINE}")
-            rmdir(self._content_dir)
-            return
+                    folder_dir: str = path.join(parent_dir, data["name"])
+                    self._create_dir(folder_dir)
 
-        self._threaded_downloads()
+                    for child in data["children"].values():
+                        if child["type"] == "folder":
+                            pending[crawler.submit(self._fetch_contents, child["id"], self._password)] = (child["id"], folder_dir)
+                        else:
+                            self._add_file(folder_dir, child, on_file)
 
-        os.system("clear")
+            for future in pending:
+                future.cancel()
 
+class CloudMailDownloader(Provider):
+    """Cloud Mail.ru herkese açık linklerini page_id ve dispatcher'ın verdiği indirme sunucusuyla indiren servis"""
 
-class CloudMailDownloader:
-    def __init__(self, url: str, max_workers: int = 5, bot=None, chat_id=None) -> None:
-        self._lock = Lock()
-        self._max_workers = max_workers
-        self._message = " "
-        self._content_dir = None
-        self.bot = bot
-        self.chat_id = chat_id
-        self.session = Session()
-        self._root_dir = getenv("CM_DOWNLOADDIR") or getcwd()
+    name = "cloudmail"
+    title = "Cloud Mail.ru"
+    env = "CM"
+    hash_algorithm = "mailru"
 
-        # API endpoints
-        self.base_api_url = "https://cloud.mail.ru/api/v2"
+    def __init__(self, url: str, password: str | None = None, **options) -> None:
+        # API endpoints, CM_APIURL ile yerel sahte sunucuya (fakeservers.py) yönlendirilebilir
+        self.base_api_url = getenv("CM_APIURL", "https://cloud.mail.ru/api/v2").rstrip("/")
         self.page_id = None
         self.base_url = None
+        # page_id ve indirme sunucusu işler arasında paylaşılır ve diske yazılır
+        self._session_ttl = float(getenv("CM_SESSIONTTL", "3600"))
+        self._page_size = int(getenv("CM_PAGESIZE", "500"))
+        self._public_url = None
+        super().__init__(url, password, **options)
+
+    def download_headers(self, file_info: dict) -> dict:
+        """Dosya indirme isteği başlıklarını oluşturma fonksiyonu"""
+        return {
+            'User-Agent': 'Mozilla/5.0 (compatible; Firefox/3.6; Linux)',
+            'Accept': '*/*',
+            'Referer': 'https://cloud.mail.ru/',
+        }
 
-        self._parse_url(url)
-        self._send_files_to_telegram()
+    def refresh(self, file_info: dict, headers: dict) -> bool:
+        """İndirme sunucusu isteği reddettiğinde dosyanın adresini yenilenen sunucuya taşıma fonksiyonu"""
+        return self._refresh_link(file_info)
 
     def _get_page_id(self, url: str) -> str:
         """Sayfadan page_id'yi al"""
@@ -377,7 +3854,7 @@ class CloudMailDownloader:
                 'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8'
             }
 
-            response = self.session.get(url, headers=headers)
+            response = self._get(url, headers=headers)
             if response.status_code != 200:
                 raise Exception("Sayfa yüklenemedi")
 
@@ -397,7 +3874,7 @@ class CloudMailDownloader:
         """Dispatcher API'den base URL al"""
         try:
             url = f"{self.base_api_url}/dispatcher?x-page-id={page_id}"
-            response = self.session.get(url)
+            response = self._get(url)
             if response.status_code != 200:
                 raise Exception("Dispatcher API yanıt vermedi")
 
@@ -411,165 +3888,701 @@ class CloudMailDownloader:
             _print(f"Base URL alma hatası: {str(e)}{NEW_LINE}")
             return None
 
-    def _get_file_info(self, url: str) -> list:
-        """Cloud Mail.ru'dan dosya bilgilerini al"""
-        try:
-            # URL'den weblink ID'sini çıkar
-            import re
-            match = re.search(r'/public/([^/]+/[^/]+)', url)
-            if not match:
-                raise Exception("Geçersiz Cloud Mail.ru linki")
+    def resolve(self, url: str, password: str | None) -> str:
+        """Linkin weblink'ini çıkarıp page_id ve indirme sunucusunu hazırlama fonksiyonu"""
+        # URL'den weblink ID'sini çıkar
+        import re
+        # Alt klasör ve dosya linkleri de weblink'in devamı olarak kabul edilir
+        match = re.search(r'/public/([^/?#]+/[^?#]+?)/?(?:[?#]|$)', url)
+        if not match:
+            raise Exception("Geçersiz Cloud Mail.ru linki")
 
-            weblink = match.group(1)
+        self._public_url = url
+        self._load_session()
+        weblink = unquote(match.group(1))
 
+        # Her link kendi dizinine iner, klasör yapısı bunun altında korunur
+        self._content_dir = path.join(self._root_dir, weblink.replace("/", "_"))
+        self._create_dir(self._content_dir)
+        return weblink
+
+    def _load_session(self) -> None:
+        """page_id ve indirme sunucusunu önbellekten alma, yoksa sayfadan ve dispatcher'dan çekme fonksiyonu"""
+        with self._metrics.stage("auth", "cloudmail", job=self._job_id):
             # Önce page_id al
-            self.page_id = self._get_page_id(url)
+            self.page_id = self._credentials.fetch(
+                'cloudmail:page_id', self._session_ttl, lambda: self._get_page_id(self._public_url)
+            )
             if not self.page_id:
                 raise Exception("Page ID alınamadı")
 
             # Base URL al
-            self.base_url = self._get_base_url(self.page_id)
+            page_id = self.page_id
+            self.base_url = self._credentials.fetch('cloudmail:base_url', self._session_ttl, lambda: self._get_base_url(page_id))
             if not self.base_url:
                 raise Exception("Base URL alınamadı")
 
-            # Dosya bilgilerini al
-            folder_url = f"{self.base_api_url}/folder?weblink={weblink}&x-page-id={self.page_id}"
-            response = self.session.get(folder_url)
+    def _refresh_session(self, stale_page_id: str | None = None, stale_base_url: str | None = None) -> bool:
+        """Sunucunun reddettiği page_id'yi veya indirme sunucusunu yenileme fonksiyonu, değer değişmezse False döner"""
+        if stale_page_id:
+            self._credentials.invalidate('cloudmail:page_id', stale_page_id)
+        if stale_base_url:
+            self._credentials.invalidate('cloudmail:base_url', stale_base_url)
+
+        try:
+            self._load_session()
+        except Exception as e:
+            _print(f"Cloud Mail.ru oturumu yenilenemedi: {str(e)}{NEW_LINE}")
+            return False
+
+        if stale_page_id and self.page_id == stale_page_id or stale_base_url and self.base_url == stale_base_url:
+            return False
+
+        _print(f"Cloud Mail.ru oturumu yenilendi.{NEW_LINE}")
+        return True
 
+    def _download_link(self, file_info: dict) -> str:
+        """Dosyanın güncel indirme sunucusundaki adresini döndürme fonksiyonu"""
+        return f"{self.base_url}/{quote(file_info['weblink'])}"
+
+    def _refresh_link(self, file_info: dict) -> bool:
+        """İndirme sunucusu isteği reddettiğinde dosyanın adresini yenilenen sunucuya taşıma fonksiyonu"""
+        # Sunucu başka bir thread tarafından zaten yenilendiyse yalnızca adres güncellenir
+        if file_info['link'] == self._download_link(file_info) and \
+                not self._refresh_session(stale_base_url=self.base_url):
+            return False
+
+        file_info['link'] = self._download_link(file_info)
+        return True
+
+    def _fetch_folder(self, weblink: str, offset: int = 0) -> dict | None:
+        """Klasörün `offset`'ten başlayan bir sayfasını API'den alma fonksiyonu"""
+        try:
+            page_id = self.page_id
+            params = {'weblink': weblink, 'offset': offset, 'limit': self._page_size, 'x-page-id': page_id}
+            response = self._get(f"{self.base_api_url}/folder", params=params, timeout=(9, 27))
+            # Süresi dolan page_id bir kez yenilenip istek tekrarlanır
+            if response.status_code in (401, 403) and self._refresh_session(stale_page_id=page_id):
+                params['x-page-id'] = self.page_id
+                response = self._get(f"{self.base_api_url}/folder", params=params, timeout=(9, 27))
             if response.status_code != 200:
-                raise Exception("Dosya bilgileri alınamadı")
+                raise Exception(f"HTTP {response.status_code}")
 
             data = response.json()
-            if "body" not in data or "list" not in data["body"]:
+            if "body" not in data:
                 raise Exception("Dosya listesi bulunamadı")
 
-            files = []
-            for item in data["body"]["list"]:
-                if item["type"] == "file":
-                    download_url = f"{self.base_url}/{weblink}"
-                    if "name" in item:
-                        download_url = f"{self.base_url}/{weblink}/{item['name']}"
-
-                    files.append({
-                        'name': item['name'],
-                        'size': item['size'],
-                        'link': download_url
-                    })
-
-            return files
+            return data["body"]
 
         except Exception as e:
-            _print(f"Dosya bilgileri alma hatası: {str(e)}{NEW_LINE}")
+            self._metrics.inc("dl_errors_total", stage="crawl", provider="cloudmail")
+            _print(f"{weblink} klasör bilgileri alınamadı: {str(e)}{NEW_LINE}")
             return None
 
-    def _download_file(self, file_info: dict) -> None:
-        """Dosya indirme fonksiyonu"""
-        if not file_info:
-            return
+    def _add_file(self, parent_dir: str, weblink: str, item: dict, on_file: Callable[[dict], None]) -> None:
+        """Bulunan dosyayı listeye ekleyip indirme havuzuna iletme fonksiyonu"""
+        size = int(item.get('size', 0))
+        file_info = {
+            'name': item['name'],
+            'size': size,
+            'path': parent_dir,
+            'link': f"{self.base_url}/{quote(weblink)}",
+            'weblink': weblink,
+            'hash': item.get('hash'),
+            # Aynı içerik farklı linklerden gelse de hash ile tanınır
+            'key': f"cloudmail:hash:{item['hash']}:{size}" if item.get('hash') else f"cloudmail:{weblink}:{size}"
+        }
+        self._found(file_info, on_file)
 
-        filename = file_info['name']
-        download_url = file_info['link']
-        file_size = file_info['size']
+    def crawl(self, weblink: str, on_file: Callable[[dict], None]) -> None:
+        """Klasör ağacını genişlik öncelikli ve paralel tarama fonksiyonu
 
-        # İndirme dizinini oluştur
-        if not self._content_dir:
-            self._content_dir = path.join(self._root_dir, filename)
-            if not path.exists(self._content_dir):
-                mkdir(self._content_dir)
+        Alt klasörler ve binlerce öğeli klasörlerin kalan sayfaları sınırlı bir
+        havuzda aynı anda istenir. Yanıtlar yalnızca bu thread'de işlendiği için
+        dizinler ve dosya listesi kilitsiz güncellenir.
+        """
+        with self._metrics.stage("crawl", "cloudmail", job=self._job_id), \
+                ThreadPoolExecutor(max_workers=self._crawl_workers) as crawler:
+            # Sayfa 0 için dizin üst klasörü, sonraki sayfalar için klasörün kendi dizinidir
+            pending = {crawler.submit(self._fetch_folder, weblink): (weblink, self._content_dir, 0)}
 
-        filepath = path.join(self._content_dir, filename)
-        tmp_file = f"{filepath}.part"
+            while pending and not self._cancelled():
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
 
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (compatible; Firefox/3.6; Linux)',
-            'Accept': '*/*',
-            'Referer': 'https://cloud.mail.ru/',
-        }
+                for future in done:
+                    folder_weblink, folder_dir, offset = pending.pop(future)
+                    body = future.result()
 
-        try:
-            with self.session.get(download_url, headers=headers, stream=True) as response:
-                if response.status_code != 200:
-                    raise Exception(f"İndirme başlatılamadı: HTTP {response.status_code}")
-
-                total_size = int(response.headers.get('content-length', file_size))
-                with open(tmp_file, 'wb') as f:
-                    downloaded = 0
-                    start_time = perf_counter()
-
-                    for chunk in response.iter_content(chunk_size=8192):
-                        if chunk:
-                            f.write(chunk)
-                            downloaded += len(chunk)
-                            progress = (downloaded / total_size) * 100 if total_size else 0
-                            speed = downloaded / (perf_counter() - start_time)
-
-                            with self._lock:
-                                _print(f"\r{' ' * len(self._message)}")
-                                self._message = f"\r{filename} indiriliyor: {downloaded}/{total_size} " \
-                                                f"{round(progress, 1)}% {self._format_speed(speed)}"
-                                _print(self._message)
-
-            # İndirme tamamlandığında dosyayı yeniden adlandır
-            os.rename(tmp_file, filepath)
-            _print(f"\n{filename} başarıyla indirildi!{NEW_LINE}")
+                    if not body:
+                        continue
 
-        except Exception as e:
-            _print(f"Dosya indirme hatası: {str(e)}{NEW_LINE}")
-            if path.exists(tmp_file):
-                os.remove(tmp_file)
-
-    def _format_speed(self, bytes_per_second: float) -> str:
-        """İndirme hızını formatla"""
-        for unit in ['B/s', 'KB/s', 'MB/s', 'GB/s']:
-            if bytes_per_second < 1024:
-                return f"{bytes_per_second:.1f} {unit}"
-            bytes_per_second /= 1024
-        return f"{bytes_per_second:.1f} TB/s"
+                    # Tek dosya linki
+                    if body.get('type') == 'file' or 'list' not in body:
+                        self._add_file(folder_dir, folder_weblink, body, on_file)
+                        continue
 
-    def _send_files_to_telegram(self):
-        """İndirilen dosyaları Telegram'a gönderme fonksiyonu"""
-        if not self._content_dir or not self.bot or not self.chat_id:
-            return
+                    items = body['list']
+                    if offset == 0:
+                        folder_dir = path.join(folder_dir, body.get('name') or path.basename(folder_weblink))
+                        self._create_dir(folder_dir)
+
+                        count = body.get('count')
+                        if count:
+                            # Toplam öğe sayısı biliniyorsa kalan sayfalar birlikte istenir
+                            total = count.get('folders', 0) + count.get('files', 0)
+                            for page in range(self._page_size, total, self._page_size):
+                                pending[crawler.submit(self._fetch_folder, folder_weblink, page)] = \
+                                    (folder_weblink, folder_dir, page)
+
+                    # Toplam bilinmiyorsa sayfa dolu geldikçe sıradaki sayfa istenir
+                    if 'count' not in body and len(items) >= self._page_size:
+                        next_offset = offset + self._page_size
+                        pending[crawler.submit(self._fetch_folder, folder_weblink, next_offset)] = \
+                            (folder_weblink, folder_dir, next_offset)
+
+                    for item in items:
+                        item_weblink = item.get('weblink') or f"{folder_weblink}/{item['name']}"
+                        if item['type'] == 'folder':
+                            pending[crawler.submit(self._fetch_folder, item_weblink)] = (item_weblink, folder_dir, 0)
+                        elif item['type'] == 'file':
+                            self._add_file(folder_dir, item_weblink, item, on_file)
+
+            for future in pending:
+                future.cancel()
+
+# Yerleşik servisler; başka modüllerdeki servisler "modül:Sınıf" yoluyla kaydedilip ilk kullanımda içe aktarılır
+register_provider("gofile", ("gofile.io",), GoFileDownloader)
+register_provider("cloudmail", ("cloud.mail.ru",), CloudMailDownloader)
+
+def read_links(text: str, password: str | None = None) -> list[tuple[str, str | None]]:
+    """Her satırı "<link> [parola]" olan metni (link, parola) listesine çevirme fonksiyonu
 
+    Boş satırlar ve # ile başlayan satırlar atlanır; `password` verilirse satırdaki parolanın yerine geçer.
+    """
+    links: list[tuple[str, str | None]] = []
+    for line in text.splitlines():
+        parts: list[str] = line.split()
+        if not parts or parts[0].startswith("#"):
+            continue
+
+        links.append((parts[0], password if password else parts[1] if len(parts) > 1 else None))
+
+    return links
+
+class BatchDownloader:
+    """Karışık GoFile ve Cloud Mail.ru linklerini tek bir iş olarak indiren sınıf
+
+    Linkler `detect_service` ile kayıtlı servise yönlendirilir ve en fazla
+    `crawl_workers` tanesi aynı anda taranır. Taramada bulunan dosyalar linkin
+    bitmesi beklenmeden tek bir öncelik kuyruğunda birleşir; `max_workers`
+    indirme thread'i kuyruğu küçük dosyalardan başlayarak boşaltır. Böylece
+    linkler arasında bağlantılar boşta kalmaz. İlerleme, gönderim kuyruğu ve
+    parçalı indirme havuzu tüm linklerce paylaşılır. İş `run` ile başlar;
+    bitince link başına özet `summary` ile, yapılandırılmış sonuç `result`
+    ile alınır.
+    """
+
+    def __init__(
+        self,
+        links: list[tuple[str, str | None]],
+        max_workers: int = 8,
+        crawl_workers: int = 4,
+        bot=None,
+        chat_id=None,
+        segments: int = 4,
+        cancel_event: Event | None = None,
+        journal: JobJournal | None = None,
+        job_id: int | None = None,
+        on_progress: Callable[[str], None] | None = None,
+        download_dir: str | None = None
+    ) -> None:
+        self.bot = bot
+        self.chat_id = chat_id
+        self._links: list[tuple[str, str | None]] = links
+        self._max_workers: int = max_workers
+        self._crawl_workers: int = crawl_workers
+        self._on_progress: Callable[[str], None] | None = on_progress
+        self._download_dir: str | None = download_dir
+        self._segments: int = segments
+        self._cancel_event: Event | None = cancel_event
+        self._journal: JobJournal | None = journal
+        self._job_id: int | None = job_id
+        self._condition: Condition = Condition()
+        # (boyut, sıra, indirici, dosya bilgisi); aynı boyuttaki dosyalar bulunma sırasıyla indirilir
+        self._queue: list[tuple[int, int, Any, dict[str, Any]]] = []
+        self._sequence: int = 0
+        self._pending: int = 0
+        self._closed: bool = False
+        self.results: list[dict[str, Any]] = []
+        self.elapsed: float = 0.0
+        self.progress: ProgressGroup | None = None
+        self.uploads: UploadPipeline | None = None
+        self.executor: ThreadPoolExecutor | None = None
+
+    def run(self) -> dict[str, Any]:
+        """Linkleri tarayıp tüm dosyaları indirme (bot verildiyse gönderme) ve sonucu `result` biçiminde döndürme fonksiyonu"""
+        bot, chat_id = self.bot, self.chat_id
+        self.progress = ProgressTracker.shared().group(f"{len(self._links)} link", self._on_progress)
+        self.uploads = UploadPipeline(
+            lambda file_path: send_document(bot, chat_id, file_path),
+            workers=int(getenv("TG_UPLOADWORKERS", "4")),
+            high_water=parse_size(getenv("DL_HIGHWATER")),
+            on_error=lambda file_path, e: bot.send_message(chat_id, f"Dosya gönderme hatası: {e}"),
+            cancel_event=self._cancel_event,
+            send_text=lambda text: bot.send_message(chat_id, text),
+            send_group=lambda file_paths: send_media_group(bot, chat_id, file_paths),
+            chat_id=chat_id,
+            group_size=parse_size(getenv("TG_GROUPSIZE", "10M")),
+            retries=int(getenv("TG_UPLOADRETRIES", "5"))
+        ) if bot and chat_id else None
+        # Büyük dosyaların segmentleri indirme thread'lerinden ayrı, ortak bir havuzda çalışır
+        self.executor = ThreadPoolExecutor(max_workers=self._max_workers)
+
+        # Birden fazla indirme birimi varsa tüm linkler işin yerleştiği birime iner
+        disk: DiskAdmission = DiskAdmission.shared()
+        placement: Any = self._job_id if self._job_id is not None else id(self)
+        placed: bool = not self._download_dir and bool(disk.volumes)
+        if placed:
+            hint: str | None = self._journal.first_path(self._job_id) if self._journal and self._job_id else None
+            self._download_dir = disk.place(placement, None, hint)
+
+        workers: list[Thread] = [
+            Thread(target=self._worker, name=f"batch-{i}", daemon=True) for i in range(max(self._max_workers, 1))
+        ]
+        for worker in workers:
+            worker.start()
+
+        start: float = perf_counter()
         try:
-            for root, dirs, files in os.walk(self._content_dir):
-                for file in files:
-                    file_path = path.join(root, file)
-                    try:
-                        with open(file_path, 'rb') as f:
-                            self.bot.send_document(self.chat_id, f)
-                        os.remove(file_path)
-                    except Exception as e:
-                        _print(f"Dosya gönderme hatası: {str(e)}{NEW_LINE}")
+            with ThreadPoolExecutor(max_workers=max(self._crawl_workers, 1)) as crawler:
+                self.results = list(crawler.map(self._run_link, self._links))
 
-            if path.exists(self._content_dir):
-                shutil.rmtree(self._content_dir)
+            with self._condition:
+                while self._pending:
+                    self._condition.wait()
+        finally:
+            with self._condition:
+                self._closed = True
+                self._condition.notify_all()
+            for worker in workers:
+                worker.join()
+            self.executor.shutdown(wait=True)
 
-        except Exception as e:
-            _print(f"Telegram'a gönderme hatası: {str(e)}{NEW_LINE}")
+            # Gönderimler bitince her linkin içerik dizini kendi indiricisi tarafından temizlenir
+            if self.uploads:
+                self.uploads.close()
+            for result in self.results:
+                if result["downloader"]:
+                    result["downloader"]._send_files_to_telegram()
+
+            if placed:
+                disk.leave(placement)
+            ProgressTracker.shared().remove(self.progress)
+
+        self.elapsed = perf_counter() - start
+        report: str = self.summary()
+        _print(f"{report}{NEW_LINE}")
+        if bot and chat_id and not self._cancelled():
+            try:
+                bot.send_message(chat_id, self.summary(limit=30))
+            except Exception as e:
+                _print(f"Özet gönderilemedi: {str(e)}{NEW_LINE}")
+
+        return self.result()
+
+    def result(self) -> dict[str, Any]:
+        """Linklerin `Provider.result` sonuçlarını ve iş toplamlarını döndürme fonksiyonu"""
+        links: list[dict[str, Any]] = []
+        for result in self.results:
+            if result["downloader"]:
+                links.append(result["downloader"].result())
+            else:
+                links.append({
+                    "url": result["url"], "service": result["service"], "ok": False, "error": result["error"],
+                    "files": [], "bytes": 0, "seconds": 0.0, "speed": 0
+                })
+
+        transferred: int = sum(link["bytes"] for link in links)
+        return {
+            "ok": bool(links) and all(link["ok"] for link in links) and not self._cancelled(),
+            "links": links,
+            "bytes": transferred,
+            "seconds": round(self.elapsed, 4),
+            "speed": round(transferred / max(self.elapsed, 1e-6))
+        }
+
+    def _cancelled(self) -> bool:
+        """İşin iptal edilip edilmediğini kontrol etme fonksiyonu"""
+        return bool(self._cancel_event and self._cancel_event.is_set())
+
+    def submit(self, downloader: Any, file_info: dict[str, Any]) -> None:
+        """Taramada bulunan dosyayı ortak öncelik kuyruğuna ekleme fonksiyonu"""
+        with self._condition:
+            heappush(self._queue, (file_info["size"], self._sequence, downloader, file_info))
+            Metrics.shared().add("dl_batch_queue", 1)
+            self._sequence += 1
+            self._pending += 1
+            self._condition.notify()
+
+    def _worker(self) -> None:
+        """Kuyruktan en küçük dosyayı alıp kendi indiricisiyle indiren döngü"""
+        while True:
+            with self._condition:
+                while not self._queue and not self._closed:
+                    self._condition.wait()
+                if not self._queue:
+                    return
+                _, _, downloader, file_info = heappop(self._queue)
+                Metrics.shared().add("dl_batch_queue", -1)
+
+            try:
+                if not self._cancelled():
+                    downloader._download_and_upload(file_info)
+            except Exception as e:
+                _print(f"Dosya indirme hatası: {str(e)}{NEW_LINE}")
+            finally:
+                with self._condition:
+                    self._pending -= 1
+                    self._condition.notify_all()
 
-    def _parse_url(self, url: str) -> None:
-        """URL'yi ayrıştır ve indirme işlemini başlat"""
+    def _run_link(self, link: tuple[str, str | None]) -> dict[str, Any]:
+        """Tek bir linki ilgili indiriciyle tarayıp dosyalarını kuyruğa ekleme fonksiyonu"""
+        url, password = link
+        result: dict[str, Any] = {"url": url, "service": detect_service(url), "downloader": None, "error": None}
+        if self._cancelled():
+            result["error"] = "iptal edildi"
+            return result
+
+        options: dict[str, Any] = {
+            "bot": self.bot,
+            "chat_id": self.chat_id,
+            "segments": self._segments,
+            "cancel_event": self._cancel_event,
+            "journal": self._journal,
+            "job_id": self._job_id,
+            "batch": self,
+            "download_dir": self._download_dir
+        }
         try:
-            files = self._get_file_info(url)
-            if files:
-                for file in files:
-                    self._download_file(file)
+            provider: Any = get_provider(result["service"])
+            if provider:
+                downloader: Provider = provider(url, password, **options)
+                downloader.run()
+                result["downloader"] = downloader
             else:
-                _print(f"Dosya bilgileri alınamadı: {url}{NEW_LINE}")
-        except Exception as e:
-            _print(f"URL ayrıştırma hatası: {str(e)}{NEW_LINE}")
+                result["error"] = "desteklenmeyen servis"
+        except (Exception, SystemExit) as e:
+            result["error"] = str(e)
+            _print(f"{url} taranamadı: {str(e)}{NEW_LINE}")
+
+        return result
+
+    def summary(self, limit: int | None = None) -> str:
+        """İşin toplam ve link başına özetini döndürme fonksiyonu, `limit` verilirse o kadar link satırı yazılır"""
+        lines: list[str] = []
+        totals: dict[str, int] = {"files": 0, "ok": 0, "failed": 0, "skipped": 0, "bytes": 0}
+
+        for result in self.results:
+            if not result["downloader"]:
+                lines.append(f"❌ [{result['service']}] {result['url']}: {result['error']}")
+                continue
+
+            stats: dict[str, int] = {"files": 0, "ok": 0, "failed": 0, "skipped": 0, "bytes": 0}
+            for file_info in result["downloader"].files():
+                progress: FileProgress | None = file_info.get("progress")
+                stats["files"] += 1
+                if progress is None:
+                    # Daha önce gönderildiği için indirilmeden atlanan dosya
+                    stats["skipped"] += 1
+                elif progress.state == "tamamlandı":
+                    stats["ok"] += 1
+                    stats["bytes"] += progress.total
+                else:
+                    stats["failed"] += 1
+
+            for name, value in stats.items():
+                totals[name] += value
+
+            icon: str = "✅" if stats["files"] and not stats["failed"] else "⚠️" if stats["ok"] else "❌"
+            line: str = f"{icon} [{result['service']}] {result['url']}: {stats['ok']}/{stats['files']} dosya, " \
+                f"{_format_size(stats['bytes'])}"
+            if stats["failed"]:
+                line = f"{line}, {stats['failed']} hata"
+            if stats["skipped"]:
+                line = f"{line}, {stats['skipped']} atlandı"
+            lines.append(line)
+
+        header: str = (
+            f"Toplu iş özeti: {len(self.results)} link, {totals['files']} dosya "
+            f"({totals['ok']} indirildi, {totals['failed']} hata, {totals['skipped']} atlandı), "
+            f"{_format_size(totals['bytes'])}, {int(self.elapsed)} sn, "
+            f"ortalama {_format_speed(totals['bytes'] / max(self.elapsed, 1e-6))}"
+        )
+        if limit is not None and len(lines) > limit:
+            lines = lines[:limit] + [f"... ve {len(lines) - limit} link daha"]
+
+        return "\n".join([header] + lines)
+
+def download(
+    url: str,
+    dest: str | None = None,
+    password: str | None = None,
+    workers: int = 5,
+    segments: int = 4,
+    engine: str | None = None,
+    cancel_event: Event | None = None
+) -> dict[str, Any]:
+    """Tek bir linki Telegram'a bağlı olmadan `dest` dizinine indirip `Provider.result` sonucunu döndürme fonksiyonu
+
+    Hatalar fırlatılmaz, sonucun `error` alanına yazılır; böylece toplu işçiler her linkin sonucunu aynı biçimde alır.
+    Link yerine link listesi dosyası verilirse `download_batch` sonucu döner.
+    """
+    if path.isfile(url):
+        with open(url, "r") as f:
+            return download_batch(
+                read_links(f.read(), password), dest, workers, segments=segments, cancel_event=cancel_event
+            )
+
+    service: str = detect_service(url)
+    provider: Any = get_provider(service)
+    if not provider:
+        return {"url": url, "service": service, "ok": False, "error": "desteklenmeyen servis",
+                "files": [], "bytes": 0, "seconds": 0.0, "speed": 0}
+
+    downloader: Provider | None = None
+    try:
+        downloader = provider(
+            url, password, max_workers=workers, segments=segments, engine=engine,
+            cancel_event=cancel_event, download_dir=dest
+        )
+        return downloader.run()
+    except Exception as e:
+        _print(f"{url} indirilemedi: {str(e)}{NEW_LINE}", True)
+        result: dict[str, Any] = downloader.result() if downloader else \
+            {"url": url, "service": service, "files": [], "bytes": 0, "seconds": 0.0, "speed": 0}
+        result.update(ok=False, error=str(e))
+        return result
+
+def download_batch(
+    links: list[tuple[str, str | None]],
+    dest: str | None = None,
+    workers: int = 8,
+    crawl_workers: int = 4,
+    segments: int = 4,
+    cancel_event: Event | None = None
+) -> dict[str, Any]:
+    """Linkleri Telegram'a bağlı olmadan tek bir toplu iş olarak `dest` dizinine indirip `BatchDownloader.result` sonucunu döndürme fonksiyonu"""
+    return BatchDownloader(
+        links,
+        max_workers=workers,
+        crawl_workers=crawl_workers,
+        segments=segments,
+        cancel_event=cancel_event,
+        download_dir=dest
+    ).run()
+
+class DownloadJob:
+    """Kuyruktaki tek bir indirme işini temsil eden sınıf"""
+
+    def __init__(self, job_id: int, chat_id: Any, url: str, password: str | None, service: str) -> None:
+        self.id: int = job_id
+        self.chat_id = chat_id
+        self.url: str = url
+        self.password: str | None = password
+        self.service: str = service
+        self.state: str = "kuyrukta"
+        self.error: str | None = None
+        self.created: float = time()
+        self.started: float | None = None
+        self.finished: float | None = None
+        self.cancel_event: Event = Event()
+        self.status_message = None
+
+    def describe(self) -> str:
+        """İşin kısa durum satırını döndürme fonksiyonu"""
+        elapsed: float = (self.finished or time()) - (self.started or self.created)
+        # Toplu işlerde tüm mesaj yerine ilk link ve link sayısı yazılır
+        lines: list[str] = self.url.splitlines()
+        target: str = f"{lines[0]} (+{len(lines) - 1} link)" if len(lines) > 1 else self.url
+        line: str = f"#{self.id} [{self.service}] {self.state} ({int(elapsed)} sn) {target}"
+        if self.error:
+            line = f"{line} - {self.error}"
+        return line
+
+class JobScheduler:
+    """İndirme işlerini kuyruğa alıp sınırlı bir havuzda çalıştıran sınıf
+
+    Toplamda en fazla `max_jobs`, her sohbet için en fazla `max_jobs_per_chat`
+    iş aynı anda çalışır; sınırı aşan işler sırası gelene kadar kuyrukta bekler.
+    `journal` verilirse işler günlüğe yazılır ve `resume` ile yeniden başlatmada
+    kaldığı yerden devam ettirilir.
+    """
+
+    def __init__(
+        self,
+        run_job: Callable[[DownloadJob], None],
+        max_jobs: int = 4,
+        max_jobs_per_chat: int = 2,
+        journal: JobJournal | None = None
+    ) -> None:
+        self._run_job = run_job
+        self._max_jobs: int = max_jobs
+        self._max_jobs_per_chat: int = max_jobs_per_chat
+        self._journal: JobJournal | None = journal
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=max_jobs)
+        self._lock: Lock = Lock()
+        self._pending: deque[DownloadJob] = deque()
+        self._running: dict[Any, int] = {}
+        self._jobs: dict[int, DownloadJob] = {}
+        self._next_id: int = journal.next_id() if journal else 1
+        self._stopping: bool = False
+        self._metrics: Metrics = Metrics.shared()
+        self._metrics.register("bot_jobs_pending", lambda: len(self._pending))
+        self._metrics.register("bot_jobs_running", lambda: sum(self._running.values()))
+
+    def submit(self, chat_id: Any, url: str, password: str | None, service: str) -> DownloadJob:
+        """Yeni bir iş oluşturup kuyruğa ekleme fonksiyonu"""
+        with self._lock:
+            job: DownloadJob = DownloadJob(self._next_id, chat_id, url, password, service)
+            self._next_id += 1
+            self._jobs[job.id] = job
+            self._pending.append(job)
+            self._prune()
+
+        if self._journal:
+            self._journal.add_job(job.id, chat_id, url, password, service)
+
+        self._dispatch()
+        return job
+
+    def resume(self) -> list[DownloadJob]:
+        """İş günlüğünde yarım kalan işleri aynı numaralarla yeniden kuyruğa alma fonksiyonu"""
+        if not self._journal:
+            return []
+
+        jobs: list[DownloadJob] = []
+        with self._lock:
+            for job_id, chat_id, url, password, service in self._journal.unfinished():
+                job: DownloadJob = DownloadJob(job_id, chat_id, url, password, service)
+                self._jobs[job_id] = job
+                self._pending.append(job)
+                jobs.append(job)
+
+        self._dispatch()
+        return jobs
+
+    def _prune(self, keep: int = 100) -> None:
+        """Biten eski işleri geçmişten silme fonksiyonu"""
+        finished: list[int] = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(len(finished) - keep, 0)]:
+            del self._jobs[job_id]
+
+    def _dispatch(self) -> None:
+        """Sınırlar izin verdiği ölçüde bekleyen işleri başlatma fonksiyonu"""
+        with self._lock:
+            for job in list(self._pending):
+                if sum(self._running.values()) >= self._max_jobs:
+                    break
+                if self._running.get(job.chat_id, 0) >= self._max_jobs_per_chat:
+                    continue
+
+                self._pending.remove(job)
+                self._running[job.chat_id] = self._running.get(job.chat_id, 0) + 1
+                job.state = "çalışıyor"
+                job.started = time()
+                self._executor.submit(self._run, job)
+
+    def _run(self, job: DownloadJob) -> None:
+        """İşi çalıştırıp bitince sıradaki işlere yer açma fonksiyonu"""
+        try:
+            with self._metrics.stage("job", job.service, job=job.id):
+                self._run_job(job)
+            job.state = "iptal edildi" if job.cancel_event.is_set() else "tamamlandı"
+        except (Exception, SystemExit) as e:
+            job.state = "hata"
+            job.error = str(e)
+        finally:
+            job.finished = time()
+            self._metrics.inc("bot_jobs_total", service=job.service, state=job.state)
+            self._metrics.event("job", job=job.id, service=job.service, state=job.state, error=job.error)
+            # Kapanış sırasında kesilen işler günlükte açık kalır, sonraki başlatmada devam eder
+            if self._journal and not (self._stopping and job.cancel_event.is_set()):
+                self._journal.finish_job(job.id, job.state)
+
+            with self._lock:
+                self._running[job.chat_id] -= 1
+                if not self._running[job.chat_id]:
+                    del self._running[job.chat_id]
+
+            self._dispatch()
+
+    def cancel(self, job_id: int, chat_id: Any = None) -> bool:
+        """Kuyruktaki veya çalışan bir işi iptal etme fonksiyonu"""
+        with self._lock:
+            job: DownloadJob | None = self._jobs.get(job_id)
+            if not job or job.finished or (chat_id is not None and job.chat_id != chat_id):
+                return False
+
+            job.cancel_event.set()
+            if job in self._pending:
+                self._pending.remove(job)
+                job.state = "iptal edildi"
+                job.finished = time()
+                if self._journal:
+                    self._journal.finish_job(job.id, job.state)
+
+        return True
+
+    def jobs(self, chat_id: Any = None) -> list[DownloadJob]:
+        """Bir sohbetin (veya tüm sohbetlerin) işlerini listeleme fonksiyonu"""
+        with self._lock:
+            return [job for job in self._jobs.values() if chat_id is None or job.chat_id == chat_id]
 
-        os.system("clear")
+    def shutdown(self) -> None:
+        """Tüm işleri durdurup havuzu kapatma fonksiyonu, yarım kalan işler günlükte açık kalır"""
+        with self._lock:
+            self._stopping = True
+            for job in self._jobs.values():
+                job.cancel_event.set()
+            self._pending.clear()
+
+        self._executor.shutdown(wait=True)
 
 class MultiServiceBot:
     def __init__(self, token, target_chat_id):
-        self.updater = Updater(token=token, use_context=True)
+        # telegram.ext yalnızca bot çalıştırılırken yüklenir, indiricileri kullanan araçların açılışını yavaşlatmaz
+        from telegram.ext import Updater, CommandHandler, MessageHandler, Filters
+
+        # TG_APIURL verilirse bot kendi barındırdığımız Bot API sunucusuna bağlanır
+        api_url = getenv("TG_APIURL")
+        file_url = getenv("TG_FILEURL") or \
+            (f"{api_url[:-len('/bot')]}/file/bot" if api_url and api_url.endswith("/bot") else None)
+        self.updater = Updater(token=token, use_context=True, base_url=api_url, base_file_url=file_url)
         self.dispatcher = self.updater.dispatcher
         self.target_chat_id = target_chat_id
 
+        # Bot yeniden başladığında yeni hesap açmasın diye servis oturumları durum dizinine yazılır
+        CredentialCache.shared(persist=True)
+
+        # İndirmeler dispatcher thread'ini bloklamasın diye iş kuyruğunda çalışır
+        self.journal = JobJournal.shared()
+        self.limiter = BandwidthLimiter.shared()
+        self.scheduler = JobScheduler(
+            self._run_job,
+            max_jobs=int(getenv("BOT_MAXJOBS", "4")),
+            max_jobs_per_chat=int(getenv("BOT_CHATJOBS", "2")),
+            journal=self.journal
+        )
+
+        # BOT_METRICSPORT verilirse Prometheus metrikleri `/metrics` adresinden sunulur
+        metrics_port = int(getenv("BOT_METRICSPORT", "0"))
+        self.metrics_server = serve_metrics(metrics_port, getenv("BOT_METRICSHOST", "127.0.0.1")) if metrics_port else None
+
         # Komutları ekle
         self.dispatcher.add_handler(CommandHandler('start', self.start_command))
+        self.dispatcher.add_handler(CommandHandler('status', self.status_command))
+        self.dispatcher.add_handler(CommandHandler('cancel', self.cancel_command))
+        self.dispatcher.add_handler(CommandHandler('limit', self.limit_command))
         self.dispatcher.add_handler(MessageHandler(Filters.text & ~Filters.command, self.process_url))
 
     def start_command(self, update, context):
@@ -581,58 +4594,260 @@ class MultiServiceBot:
             "Kullanım:\n"
             "1. Desteklenen servislerden bir link gönderin\n"
             "2. GoFile şifreli linkler için: <link> <şifre>\n"
+            "   Her satıra bir link yazarak birden fazla linki tek iş olarak indirebilirsiniz\n"
+            "3. İşleri görmek için /status, iptal için /cancel <iş numarası>\n"
+            "4. Hız sınırı için /limit <hız>, /limit <iş numarası> <hız> veya /limit varsayılan <hız>\n"
             "Bot dosyayı otomatik olarak indirecek ve size gönderecektir."
         )
         update.message.reply_text(welcome_message)
 
+    def status_command(self, update, context):
+        jobs = self.scheduler.jobs(update.message.chat_id)
+        if not jobs:
+            update.message.reply_text("Aktif veya geçmiş iş yok.")
+            return
+
+        update.message.reply_text("\n".join(job.describe() for job in jobs[-20:]))
+
+    def cancel_command(self, update, context):
+        if not context.args or not context.args[0].lstrip("#").isdigit():
+            update.message.reply_text("Kullanım: /cancel <iş numarası>")
+            return
+
+        job_id = int(context.args[0].lstrip("#"))
+        if self.scheduler.cancel(job_id, update.message.chat_id):
+            self.limiter.release(job_id)
+            update.message.reply_text(f"#{job_id} numaralı iş iptal ediliyor... 🛑")
+        else:
+            update.message.reply_text(f"#{job_id} numaralı aktif bir iş bulunamadı.")
+
+    def limit_command(self, update, context):
+        """Genel, varsayılan ve işe özel hız sınırlarını gösterme veya değiştirme fonksiyonu"""
+        args = context.args or []
+        if not args:
+            describe = lambda rate: _format_speed(rate) if rate else "sınırsız"
+            lines = [
+                f"Genel sınır: {describe(self.limiter.global_rate)}",
+                f"İş başına varsayılan sınır: {describe(self.limiter.job_rate)}"
+            ]
+            for job_id, rate in sorted(self.limiter.rates().items(), key=lambda item: str(item[0])):
+                lines.append(f"#{job_id} güncel pay: {describe(rate)} (sınır: {describe(self.limiter.job_limit(job_id))})")
+            update.message.reply_text("\n".join(lines))
+            return
+
+        try:
+            rate = 0 if args[-1].lower() in ("0", "off", "kapalı") else parse_size(args[-1])
+        except ValueError:
+            rate = None
+
+        if rate is None or len(args) > 2:
+            update.message.reply_text(
+                "Kullanım: /limit <hız> | /limit <iş numarası> <hız> | /limit varsayılan <hız>\n"
+                "Örnek: /limit 10M, /limit 12 2M, /limit off"
+            )
+            return
+
+        if len(args) == 1:
+            self.limiter.set_global(rate)
+            target = "Genel sınır"
+        elif args[0].lower() in ("varsayılan", "default"):
+            self.limiter.set_job_default(rate)
+            target = "İş başına varsayılan sınır"
+        else:
+            job_id = int(args[0].lstrip("#")) if args[0].lstrip("#").isdigit() else None
+            jobs = {job.id: job for job in self.scheduler.jobs(update.message.chat_id) if not job.finished}
+            if job_id not in jobs:
+                update.message.reply_text(f"{args[0]} numaralı aktif bir iş bulunamadı.")
+                return
+
+            self.limiter.set_job(job_id, rate)
+            target = f"#{job_id} sınırı"
+
+        update.message.reply_text(f"{target}: {_format_speed(rate) if rate else 'sınırsız'} ⏱")
+
     def process_url(self, update, context):
+        # Birden fazla satırda link içeren mesaj tek bir toplu iş olarak kuyruğa alınır
+        links = read_links(update.message.text)
+        if len(links) > 1:
+            self.process_batch(update, links)
+            return
+
         message_parts = update.message.text.strip().split()
         url = message_parts[0]
         password = message_parts[1] if len(message_parts) > 1 else None
 
         try:
-            status_message = update.message.reply_text("Link analiz ediliyor... 🔍")
-            
             service = detect_service(url)
-            
-            if service == "gofile":
-                downloader = GoFileDownloader(
-                    url=url,
-                    password=password,
-                    bot=update.message.bot,
-                    chat_id=self.target_chat_id
-                )
-                status_message.edit_text("GoFile dosyası indiriliyor... 📥")
-                
-            elif service == "cloudmail":
-                downloader = CloudMailDownloader(
-                    url=url,
-                    bot=update.message.bot,
-                    chat_id=self.target_chat_id
-                )
-                status_message.edit_text("Cloud Mail.ru dosyası indiriliyor... 📥")
-                
-            else:
-                status_message.edit_text("❌ Desteklenmeyen servis! Sadece GoFile ve Cloud Mail.ru linkleri desteklenmektedir.")
+
+            if service == "unknown":
+                update.message.reply_text("❌ Desteklenmeyen servis! Sadece GoFile ve Cloud Mail.ru linkleri desteklenmektedir.")
                 return
 
-            status_message.edit_text("✅ İndirme tamamlandı!")
-            
+            job = self.scheduler.submit(update.message.chat_id, url, password, service)
+            job.status_message = update.message.reply_text(
+                f"#{job.id} numaralı iş kuyruğa alındı... 🔍\nİptal etmek için: /cancel {job.id}"
+            )
+
         except Exception as e:
             error_message = f"Hata oluştu: {str(e)}"
             update.message.reply_text(error_message)
 
+    def process_batch(self, update, links):
+        """Çok satırlı mesajdaki linkleri tek bir toplu iş olarak kuyruğa alma fonksiyonu"""
+        unsupported = [url for url, _ in links if detect_service(url) == "unknown"]
+        if len(unsupported) == len(links):
+            update.message.reply_text("❌ Desteklenmeyen servis! Sadece GoFile ve Cloud Mail.ru linkleri desteklenmektedir.")
+            return
+
+        try:
+            # Linkler ve parolaları iş günlüğünde mesaj metni olarak saklanır, devam ederken yeniden ayrıştırılır
+            job = self.scheduler.submit(update.message.chat_id, update.message.text.strip(), None, "batch")
+            text = f"#{job.id} numaralı toplu iş ({len(links)} link) kuyruğa alındı... 🔍\nİptal etmek için: /cancel {job.id}"
+            if unsupported:
+                text = f"{text}\n⚠️ {len(unsupported)} desteklenmeyen link atlanacak."
+            job.status_message = update.message.reply_text(text)
+
+        except Exception as e:
+            update.message.reply_text(f"Hata oluştu: {str(e)}")
+
+    def resume_jobs(self):
+        """Önceki çalışmada yarım kalan işleri kaldığı yerden devam ettirme fonksiyonu"""
+        for job in self.scheduler.resume():
+            _print(f"#{job.id} yarım kalan iş devam ettiriliyor: {job.url}{NEW_LINE}")
+            try:
+                job.status_message = self.updater.bot.send_message(
+                    job.chat_id, f"#{job.id} numaralı iş kaldığı yerden devam ediyor... 🔄"
+                )
+            except Exception as e:
+                _print(f"Durum mesajı gönderilemedi: {str(e)}{NEW_LINE}")
+
+    def _edit_status(self, job, text):
+        """İşin durum mesajını güncelleme fonksiyonu"""
+        if not job.status_message:
+            return
+
+        try:
+            job.status_message.edit_text(text)
+        except Exception as e:
+            _print(f"Durum mesajı güncellenemedi: {str(e)}{NEW_LINE}")
+
+    def _run_job(self, job):
+        """Kuyruktan alınan işi ilgili indiriciyle çalıştırma fonksiyonu"""
+        try:
+            if job.service == "batch":
+                self._edit_status(job, f"#{job.id} Toplu iş indiriliyor... 📥")
+                batch = BatchDownloader(
+                    read_links(job.url),
+                    max_workers=int(getenv("DL_BATCHWORKERS", "8")),
+                    crawl_workers=int(getenv("DL_BATCHCRAWLS", "4")),
+                    bot=self.updater.bot,
+                    chat_id=self.target_chat_id,
+                    cancel_event=job.cancel_event,
+                    journal=self.journal,
+                    job_id=job.id,
+                    on_progress=lambda text: self._edit_status(job, f"#{job.id} 📥\n{text}")
+                )
+                batch.run()
+                report = batch.summary(limit=10)
+
+            else:
+                provider = get_provider(job.service)
+                if not provider:
+                    raise Exception(f"Desteklenmeyen servis: {job.service}")
+
+                self._edit_status(job, f"#{job.id} {provider.title} dosyası indiriliyor... 📥")
+                provider(
+                    url=job.url,
+                    password=job.password,
+                    bot=self.updater.bot,
+                    chat_id=self.target_chat_id,
+                    cancel_event=job.cancel_event,
+                    journal=self.journal,
+                    job_id=job.id,
+                    on_progress=lambda text: self._edit_status(job, f"#{job.id} 📥\n{text}")
+                ).run()
+        except (Exception, SystemExit) as e:
+            self._edit_status(job, f"#{job.id} ❌ Hata oluştu: {str(e)}")
+            raise
+        finally:
+            self.limiter.release(job.id)
+
+        if job.cancel_event.is_set():
+            self._edit_status(job, f"#{job.id} 🛑 İndirme iptal edildi.")
+        elif job.service == "batch":
+            self._edit_status(job, f"#{job.id} ✅ İndirme tamamlandı!\n{report}")
+        else:
+            self._edit_status(job, f"#{job.id} ✅ İndirme tamamlandı!")
+
     def start_bot(self):
         print("Bot başlatıldı... Durdurmak için Ctrl+C")
+        self.resume_jobs()
         self.updater.start_polling()
         self.updater.idle()
+        self.scheduler.shutdown()
+
+def _describe_result(result: dict[str, Any]) -> list[str]:
+    """`download` veya `download_batch` sonucunu link başına birer satıra çevirme fonksiyonu"""
+    lines: list[str] = []
+    for link in result.get("links", [result]):
+        done: int = sum(file["state"] != "failed" for file in link["files"])
+        line: str = f"{'✅' if link['ok'] else '❌'} [{link['service']}] {link['url']}: {done}/{len(link['files'])} dosya, " \
+            f"{_format_size(link['bytes'])}, {link['seconds']:.1f} sn, {_format_speed(link['speed'])}"
+        lines.append(f"{line} ({link['error']})" if link["error"] else line)
+
+    return lines
+
+def download_command(args: argparse.Namespace) -> int:
+    """Linkleri Telegram olmadan indirip özeti yazdırma fonksiyonu, hepsi indirildiyse 0 döndürür"""
+    if len(args.links) == 1:
+        result: dict[str, Any] = download(
+            args.links[0], args.dest, args.password, args.workers, args.segments, args.engine
+        )
+    else:
+        links: list[tuple[str, str | None]] = []
+        for link in args.links:
+            if path.isfile(link):
+                with open(link, "r") as f:
+                    links += read_links(f.read(), args.password)
+            else:
+                links.append((link, args.password))
+        result = download_batch(links, args.dest, args.workers, args.crawl_workers, args.segments)
+
+    _print(f"{NEW_LINE.join(_describe_result(result))}{NEW_LINE}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+
+    return 0 if result["ok"] else 1
 
 def main():
+    parser = argparse.ArgumentParser(description="GoFile ve Cloud Mail.ru indirici ve Telegram botu")
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("bot", help="Telegram botunu başlat (varsayılan)")
+
+    # Bot token'ı gerektirmeyen, cron ve toplu işçiler için komut satırı indirmesi
+    downloader = commands.add_parser("download", help="linkleri Telegram olmadan indir")
+    downloader.add_argument("links", nargs="+", help="linkler veya her satırı \"<link> [parola]\" olan dosyalar")
+    downloader.add_argument("-d", "--dest", help="indirme dizini (varsayılan: GF_/CM_DOWNLOADDIR veya çalışma dizini)")
+    downloader.add_argument("-p", "--password", help="tüm linkler için parola")
+    downloader.add_argument("-w", "--workers", type=int, default=int(getenv("DL_BATCHWORKERS", "8")),
+                            help="aynı anda indirilen dosya sayısı")
+    downloader.add_argument("-s", "--segments", type=int, default=4, help="büyük dosyalarda bağlantı sayısı")
+    downloader.add_argument("--crawl-workers", type=int, default=int(getenv("DL_BATCHCRAWLS", "4")),
+                            help="aynı anda taranan link sayısı")
+    downloader.add_argument("--engine", choices=["thread", "async"], help="indirme motoru (varsayılan: DL_ENGINE)")
+    downloader.add_argument("--json", help="dosya başına boyut, süre ve hız içeren sonucun yazılacağı JSON dosyası")
+
+    args = parser.parse_args()
+    if args.command == "download":
+        exit(download_command(args))
+
     try:
         bot = MultiServiceBot(TELEGRAM_BOT_TOKEN, TARGET_CHAT_ID)
         bot.start_bot()
     except Exception as e:
-        print(f"Bot başlatılamadı: {e}")
+        # Servis yöneticileri başlatılamayan botu sıfırdan farklı çıkış koduyla görsün
+        die(f"Bot başlatılamadı: {e}")
 
 if __name__ == "__main__":
     main()
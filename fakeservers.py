@@ -0,0 +1,654 @@
+"""Çevrimdışı deneme ve benchmark için yerel sahte sunucular"""
+import json
+import os
+import re
+from email.parser import BytesParser
+from email.policy import default
+from hashlib import md5, sha1, sha256
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing import Process, Queue
+from random import Random
+from threading import Lock, Thread
+from time import perf_counter, sleep, time
+from urllib.parse import parse_qs, quote, unquote, urlparse
+from uuid import uuid4
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Yüzlerce eşzamanlı bağlantı açılırken SYN kuyruğu taşmasın
+    request_queue_size = 1024
+
+
+def make_content(name: str, size: int) -> bytes:
+    """İsimden türetilen, tekrar üretilebilir dosya içeriği oluşturma fonksiyonu"""
+    seed: bytes = (name.encode() * 64)[:64] or b"\0"
+    return (seed * (size // len(seed) + 1))[:size]
+
+
+def make_tree(files: int, size: int, folders: int = 1, depth: int = 1) -> dict[str, int]:
+    """`folders` klasöre ve `depth` derinliğe dağıtılmış {yol: boyut} ağacı oluşturma fonksiyonu"""
+    tree: dict[str, int] = {}
+    for i in range(files):
+        folder: int = i % max(folders, 1)
+        parts: list[str] = [f"d{folder}"] + [f"d{folder}_{level}" for level in range(1, depth)] if folders > 1 else []
+        tree["/".join(parts + [f"f{i}.bin"])] = size
+
+    return tree
+
+
+def mailru_hash(content: bytes) -> str:
+    """Cloud Mail.ru'nun dosya listesinde verdiği hash'i hesaplama fonksiyonu"""
+    if len(content) <= 20:
+        return content.ljust(20, b"\0").hex().upper()
+
+    return sha1(b"mrCloud" + content + str(len(content)).encode()).hexdigest().upper()
+
+
+class FileServer:
+    """Range destekli yerel dosya sunucusu
+
+    `add(name, size)` ile eklenen her dosya `/files/<name>` adresinden sunulur.
+    Gerçek ağ koşullarını taklit etmek için her yanıt `latency` saniye
+    geciktirilir, dosya akışları bağlantı başına `bandwidth` byte/sn ile
+    sınırlanır; istekler `fail_rate` olasılıkla 503 ile reddedilir ve dosya
+    akışları `drop_rate` olasılıkla yarıda kesilir.
+    """
+
+    ROOT: str = "/files"
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        bandwidth: int = 0,
+        fail_rate: float = 0.0,
+        drop_rate: float = 0.0,
+        seed: int | None = None
+    ) -> None:
+        self.files: dict[str, bytes] = {}
+        self.latency: float = latency
+        self.bandwidth: int = bandwidth
+        self.fail_rate: float = fail_rate
+        self.drop_rate: float = drop_rate
+        self.requests: int = 0
+        self.failures: int = 0
+        self._random: Random = Random(seed)
+        self._state_lock: Lock = Lock()
+        self._server: ThreadingHTTPServer = _Server((host, port), self._handler_class())
+        self._thread: Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def add(self, name: str, size: int) -> str:
+        """Sunucuya dosya ekleyip indirme adresini döndürme fonksiyonu"""
+        self.files[name] = make_content(name, size)
+        return f"{self.base_url}/files/{name}"
+
+    def start(self) -> "FileServer":
+        """Sunucuyu arka plan thread'inde başlatma fonksiyonu"""
+        self._thread = Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Sunucuyu durdurma fonksiyonu"""
+        self._server.shutdown()
+        self._server.server_close()
+
+    @classmethod
+    def spawn(cls, files: dict[str, int], **options) -> tuple[str, Process]:
+        """Sunucuyu ayrı bir süreçte başlatma fonksiyonu
+
+        Benchmark sırasında sunucu thread'lerinin ölçülen süreçle GIL için
+        yarışmaması gerekir. `options` sunucu sınıfına iletilir. (temel adres,
+        süreç) döner; sağlayıcı sunucularında kök link `ROOT` ile eklenir.
+        """
+        queue: Queue = Queue()
+        process: Process = Process(target=cls._serve, args=(files, queue, options), daemon=True)
+        process.start()
+        return queue.get(), process
+
+    @classmethod
+    def _serve(cls, files: dict[str, int], queue: Queue, options: dict | None = None) -> None:
+        server: FileServer = cls(**(options or {}))
+        for name, size in files.items():
+            server.add(name, size)
+
+        queue.put(server.base_url)
+        server._server.serve_forever()
+
+    def _chance(self, rate: float) -> bool:
+        """Verilen olasılıkla True döndürme fonksiyonu"""
+        if rate <= 0:
+            return False
+
+        with self._state_lock:
+            return self._random.random() < rate
+
+    def inject(self, handler: BaseHTTPRequestHandler) -> bool:
+        """Gecikmeyi uygulayıp isteğin hata ile reddedilip reddedilmediğini döndürme fonksiyonu"""
+        with self._state_lock:
+            self.requests += 1
+        if self.latency:
+            sleep(self.latency)
+
+        if not self._chance(self.fail_rate):
+            return False
+
+        with self._state_lock:
+            self.failures += 1
+        handler.send_response(503)
+        handler.send_header("Retry-After", "0")
+        handler.send_header("Content-Length", "0")
+        handler.end_headers()
+        return True
+
+    def do_GET(self, handler: BaseHTTPRequestHandler) -> None:
+        """GET isteğini karşılama fonksiyonu, sağlayıcı sunucuları kendi API yollarını ekler"""
+        match = re.match(r"^/files/([^?]+)", handler.path)
+        content: bytes | None = self.files.get(unquote(match.group(1))) if match else None
+        if content is None:
+            handler.send_error(404)
+            return
+
+        self.send_content(handler, content)
+
+    def do_POST(self, handler: BaseHTTPRequestHandler) -> None:
+        """POST isteğini karşılama fonksiyonu"""
+        handler.send_error(404)
+
+    def send_json(self, handler: BaseHTTPRequestHandler, status: int, payload: dict) -> None:
+        """JSON yanıtı gönderme fonksiyonu"""
+        body: bytes = json.dumps(payload).encode()
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def _handler_class(self) -> type:
+        server: FileServer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                if not server.inject(self):
+                    server.do_GET(self)
+
+            def do_POST(self) -> None:
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if not server.inject(self):
+                    server.do_POST(self)
+
+        return Handler
+
+    def send_content(self, handler: BaseHTTPRequestHandler, content: bytes) -> None:
+        """İçeriği Range başlığına göre 200 veya 206 ile gönderme fonksiyonu"""
+        start, end = 0, len(content) - 1
+        match = re.match(r"bytes=(\d+)-(\d*)", handler.headers.get("Range", ""))
+
+        if match:
+            start = int(match.group(1))
+            end = min(int(match.group(2)), end) if match.group(2) else end
+            if start > end:
+                handler.send_response(416)
+                handler.send_header("Content-Range", f"bytes */{len(content)}")
+                handler.send_header("Content-Length", "0")
+                handler.end_headers()
+                return
+
+            handler.send_response(206)
+            handler.send_header("Content-Range", f"bytes {start}-{end}/{len(content)}")
+        else:
+            handler.send_response(200)
+
+        handler.send_header("Accept-Ranges", "bytes")
+        handler.send_header("Content-Length", str(end - start + 1))
+        handler.end_headers()
+
+        view: memoryview = memoryview(content)[start:end + 1]
+        # Kesilecek akışta yanıtın yarısı gönderilip bağlantı kapatılır
+        limit: int = len(view) // 2 if self._chance(self.drop_rate) else len(view)
+        block: int = min(256 * 1024, max(self.bandwidth // 20, 4096)) if self.bandwidth else 256 * 1024
+        started: float = perf_counter()
+
+        for offset in range(0, limit, block):
+            handler.wfile.write(view[offset:min(offset + block, limit)])
+            if self.bandwidth:
+                delay: float = (offset + block) / self.bandwidth - (perf_counter() - started)
+                if delay > 0:
+                    sleep(delay)
+
+        if limit < len(view):
+            with self._state_lock:
+                self.failures += 1
+            handler.close_connection = True
+
+
+class FakeGoFileServer(FileServer):
+    """GoFile API'sini taklit eden sunucu
+
+    `POST /accounts` misafir token'ı verir, `GET /contents/<id>` klasör ve
+    dosya bilgilerini md5 özetleriyle döndürür. `add` ile eklenen yollar
+    kök klasörün (`/d/root`) altında klasör ağacına yerleştirilir. Bot
+    `GF_APIURL=<temel adres>` ile bu sunucuya yönlendirilir; `password`
+    verilirse kök klasör parola korumalıdır. `expire_tokens` verilmiş token'ları
+    geçersiz kılar; `accounts` açılan misafir hesabı sayısını tutar.
+    """
+
+    ROOT: str = "/d/root"
+
+    def __init__(self, *args, password: str | None = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.password: str | None = sha256(password.encode()).hexdigest() if password else None
+        self.tokens: set[str] = set()
+        self.accounts: int = 0
+        self.contents: dict[str, dict] = {"root": {"id": "root", "type": "folder", "name": "root", "children": {}}}
+        self._folders: dict[str, str] = {"": "root"}
+        self._lock: Lock = Lock()
+
+    def _folder(self, folder_path: str) -> dict:
+        """Yoldaki klasörü gerekirse üst klasörleriyle birlikte oluşturma fonksiyonu"""
+        if folder_path not in self._folders:
+            parent: dict = self._folder(folder_path.rpartition("/")[0])
+            folder_id: str = f"folder{len(self._folders)}"
+            folder: dict = {"id": folder_id, "type": "folder", "name": folder_path.rpartition("/")[2], "children": {}}
+            self.contents[folder_id] = folder
+            self._folders[folder_path] = folder_id
+            parent["children"][folder_id] = {key: folder[key] for key in ("id", "type", "name")}
+
+        return self.contents[self._folders[folder_path]]
+
+    def add(self, name: str, size: int) -> str:
+        link: str = super().add(name, size)
+        file_id: str = f"file{len(self.contents)}"
+        self.contents[file_id] = {
+            "id": file_id,
+            "type": "file",
+            "name": name.rpartition("/")[2],
+            "size": size,
+            "link": link,
+            "md5": md5(self.files[name]).hexdigest()
+        }
+        self._folder(name.rpartition("/")[0])["children"][file_id] = self.contents[file_id]
+        return link
+
+    def expire_tokens(self) -> None:
+        """Verilmiş tüm token'ların süresini doldurma fonksiyonu, sonraki API istekleri 401 alır"""
+        with self._lock:
+            self.tokens.clear()
+
+    def do_POST(self, handler: BaseHTTPRequestHandler) -> None:
+        if not handler.path.startswith("/accounts"):
+            handler.send_error(404)
+            return
+
+        # Gerçek servisteki gibi her token tektir, başka bir sunucunun verdiği token burada geçersizdir
+        with self._lock:
+            self.accounts += 1
+            token: str = f"token{self.accounts}-{uuid4().hex[:8]}"
+            self.tokens.add(token)
+
+        self.send_json(handler, 200, {"status": "ok", "data": {"token": token}})
+
+    def do_GET(self, handler: BaseHTTPRequestHandler) -> None:
+        url = urlparse(handler.path)
+        match = re.match(r"^/contents/([^/]+)$", url.path)
+        if not match:
+            super().do_GET(handler)
+            return
+
+        if handler.headers.get("Authorization", "").removeprefix("Bearer ") not in self.tokens:
+            self.send_json(handler, 401, {"status": "error-notAuthenticated", "data": {}})
+            return
+
+        content: dict | None = self.contents.get(match.group(1))
+        if content is None:
+            self.send_json(handler, 404, {"status": "error-notFound", "data": {}})
+            return
+
+        if self.password and match.group(1) == "root":
+            status: str = "passwordOk" if parse_qs(url.query).get("password") == [self.password] else "passwordWrong"
+            content = {**content, "password": True, "passwordStatus": status}
+
+        self.send_json(handler, 200, {"status": "ok", "data": content})
+
+
+class FakeCloudMailServer(FileServer):
+    """Cloud Mail.ru herkese açık link sayfası ve API'sini taklit eden sunucu
+
+    `/public/W/root` sayfası page_id'yi, `/api/v2/dispatcher` indirme
+    sunucusunu, `/api/v2/folder` ise klasörleri sayfa sayfa ve hash'leriyle
+    döndürür. Dosyalar `/weblink/<weblink>` adresinden sunulur. Bot
+    `CM_APIURL=<temel adres>/api/v2` ile bu sunucuya yönlendirilir.
+    `page_id` değiştirilirse eski değerle gelen API istekleri 403 alır;
+    `pages` link sayfasının kaç kez istendiğini tutar.
+    """
+
+    ROOT: str = "/public/W/root"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.page_id: str = "fakepage1"
+        self.pages: int = 0
+        self.folders: dict[str, list[dict]] = {"W/root": []}
+        self.items: dict[str, dict] = {}
+
+    def _folder(self, weblink: str) -> list[dict]:
+        """Weblink'teki klasörü gerekirse üst klasörleriyle birlikte oluşturma fonksiyonu"""
+        if weblink not in self.folders:
+            self.folders[weblink] = []
+            self._folder(weblink.rpartition("/")[0]).append(
+                {"type": "folder", "name": weblink.rpartition("/")[2], "weblink": weblink}
+            )
+
+        return self.folders[weblink]
+
+    def add(self, name: str, size: int) -> str:
+        super().add(name, size)
+        weblink: str = f"W/root/{name}"
+        self.items[weblink] = {
+            "type": "file",
+            "name": name.rpartition("/")[2],
+            "weblink": weblink,
+            "size": size,
+            "hash": mailru_hash(self.files[name])
+        }
+        self._folder(weblink.rpartition("/")[0]).append(self.items[weblink])
+        return f"{self.base_url}/weblink/{quote(weblink)}"
+
+    def do_GET(self, handler: BaseHTTPRequestHandler) -> None:
+        url = urlparse(handler.path)
+        query: dict[str, list[str]] = parse_qs(url.query)
+
+        if url.path.startswith("/public/"):
+            with self._state_lock:
+                self.pages += 1
+            body: bytes = f"<script>window.cloudSettings = {{pageId: '{self.page_id}'}};</script>".encode()
+            handler.send_response(200)
+            handler.send_header("Content-Type", "text/html")
+            handler.send_header("Content-Length", str(len(body)))
+            handler.end_headers()
+            handler.wfile.write(body)
+        elif url.path == "/api/v2/dispatcher":
+            self.send_json(handler, 200, {"body": {"weblink_get": [{"url": f"{self.base_url}/weblink"}]}})
+        elif url.path == "/api/v2/folder":
+            if query.get("x-page-id") != [self.page_id]:
+                self.send_json(handler, 403, {"status": 403})
+                return
+
+            weblink: str = query.get("weblink", [""])[0].strip("/")
+            if weblink in self.items:
+                self.send_json(handler, 200, {"body": self.items[weblink]})
+                return
+            if weblink not in self.folders:
+                self.send_json(handler, 404, {"status": 404})
+                return
+
+            items: list[dict] = self.folders[weblink]
+            offset: int = int(query.get("offset", ["0"])[0])
+            limit: int = int(query.get("limit", ["500"])[0])
+            self.send_json(handler, 200, {"body": {
+                "type": "folder",
+                "name": weblink.rpartition("/")[2],
+                "weblink": weblink,
+                "count": {
+                    "folders": sum(item["type"] == "folder" for item in items),
+                    "files": sum(item["type"] == "file" for item in items)
+                },
+                "list": items[offset:offset + limit]
+            }})
+        elif url.path.startswith("/weblink/W/root/"):
+            content: bytes | None = self.files.get(unquote(url.path[len("/weblink/W/root/"):]))
+            if content is None:
+                handler.send_error(404)
+                return
+
+            self.send_content(handler, content)
+        else:
+            super().do_GET(handler)
+
+
+class FakeBotAPIServer:
+    """Yerel Telegram Bot API sunucusunu taklit eden basit sunucu
+
+    `TG_APIURL=http://127.0.0.1:<port>/bot` ile bot bu sunucuya yönlendirilir.
+    `sendDocument` ve `sendMediaGroup` hem çok parçalı yüklemeyi hem de yerel
+    sunucunun `file://` yol referansını kabul eder; gelen tüm çağrılar yanıtın
+    durum koduyla birlikte `calls` listesinde tutulur. `flood_rate` oranındaki
+    gönderimler 429 ve `retry_after` saniyelik RetryAfter yanıtıyla reddedilir.
+    Daha önce verilen `file_id` ile gönderilen belgeler de kabul edilir.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        flood_rate: float = 0.0,
+        retry_after: int = 1,
+        seed: int | None = None
+    ) -> None:
+        self.calls: list[dict] = []
+        self.floods: int = 0
+        self._flood_rate: float = flood_rate
+        self._retry_after: int = retry_after
+        self._random: Random = Random(seed)
+        self._lock: Lock = Lock()
+        self._message_id: int = 0
+        self._documents: dict[str, dict] = {}
+        self._server: ThreadingHTTPServer = _Server((host, port), self._handler_class())
+        self._thread: Thread | None = None
+
+    @property
+    def api_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/bot"
+
+    def start(self) -> "FakeBotAPIServer":
+        """Sunucuyu arka plan thread'inde başlatma fonksiyonu"""
+        self._thread = Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Sunucuyu durdurma fonksiyonu"""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _message(self, params: dict) -> dict:
+        """Yeni numaralı bir mesaj gövdesi oluşturma fonksiyonu"""
+        with self._lock:
+            self._message_id += 1
+            message_id: int = self._message_id
+
+        chat: dict = {"id": int(params.get("chat_id", 0) or 0), "type": "private"}
+        return {"message_id": message_id, "date": int(time()), "chat": chat}
+
+    def _document(self, document, files: dict[str, tuple[str, bytes]], message_id: int) -> dict | None:
+        """Yüklenen, `file://` ile veya `file_id` ile verilen belgenin bilgisini, geçersizse None döndürme fonksiyonu"""
+        if isinstance(document, str) and document in self._documents:
+            return dict(self._documents[document])
+        if isinstance(document, str) and document.startswith("attach://"):
+            document = files.get(document.removeprefix("attach://"))
+        elif document is None:
+            document = files.get("document")
+
+        if isinstance(document, tuple):
+            name, content = document
+            size: int = len(content)
+        elif isinstance(document, str) and document.startswith("file://"):
+            local_path: str = unquote(urlparse(document).path)
+            if not os.path.isfile(local_path):
+                return None
+            name, size = os.path.basename(local_path), os.path.getsize(local_path)
+        else:
+            return None
+
+        info: dict = {
+            "file_id": f"fake-{message_id}",
+            "file_unique_id": f"fake-unique-{message_id}",
+            "file_name": name,
+            "file_size": size
+        }
+        with self._lock:
+            self._documents[info["file_id"]] = info
+        return dict(info)
+
+    def handle(self, method: str, params: dict, files: dict[str, tuple[str, bytes]]) -> tuple[int, dict]:
+        """Bot API çağrısını işleyip `calls` listesine durum koduyla kaydetme, (HTTP durum kodu, yanıt) döndürme fonksiyonu"""
+        call: dict = {"method": method, "params": params, "files": files, "time": perf_counter()}
+        with self._lock:
+            call["flood"] = method in ("sendDocument", "sendMediaGroup") and self._flood_rate > 0 and \
+                self._random.random() < self._flood_rate
+            self.floods += call["flood"]
+            self.calls.append(call)
+
+        if call["flood"]:
+            status, response = 429, {
+                "ok": False,
+                "error_code": 429,
+                "description": f"Too Many Requests: retry after {self._retry_after}",
+                "parameters": {"retry_after": self._retry_after}
+            }
+        else:
+            status, response = self._respond(method, params, files)
+
+        call["status"] = status
+        return status, response
+
+    def _respond(self, method: str, params: dict, files: dict[str, tuple[str, bytes]]) -> tuple[int, dict]:
+        """Bot API yöntemini çalıştırıp (HTTP durum kodu, yanıt) döndürme fonksiyonu"""
+        message: dict = self._message(params)
+
+        if method == "getMe":
+            return 200, {"ok": True, "result": {"id": 1, "is_bot": True, "first_name": "fake", "username": "fake_bot"}}
+        if method == "getUpdates":
+            return 200, {"ok": True, "result": []}
+        if method in ("deleteWebhook", "setWebhook"):
+            return 200, {"ok": True, "result": True}
+        if method in ("sendMessage", "editMessageText"):
+            message["text"] = params.get("text", "")
+            return 200, {"ok": True, "result": message}
+        if method == "sendDocument":
+            document: dict | None = self._document(params.get("document"), files, message["message_id"])
+            if not document:
+                return 400, {"ok": False, "error_code": 400, "description": "Bad Request: invalid file"}
+
+            message["document"] = document
+            return 200, {"ok": True, "result": message}
+        if method == "sendMediaGroup":
+            media: list = json.loads(params.get("media") or "[]")
+            if not 2 <= len(media) <= 10:
+                return 400, {"ok": False, "error_code": 400, "description": "Bad Request: wrong number of media"}
+
+            messages: list[dict] = []
+            for item in media:
+                if item is not media[0]:
+                    message = self._message(params)
+                document = self._document(item.get("media"), files, message["message_id"])
+                if not document:
+                    return 400, {"ok": False, "error_code": 400, "description": "Bad Request: invalid file"}
+                message["document"] = document
+                messages.append(message)
+            return 200, {"ok": True, "result": messages}
+
+        return 404, {"ok": False, "error_code": 404, "description": "Not Found"}
+
+    def _handler_class(self) -> type:
+        server: FakeBotAPIServer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                self.do_POST()
+
+            def do_POST(self) -> None:
+                method: str = self.path.rstrip("/").split("/")[-1].split("?")[0]
+                length: int = int(self.headers.get("Content-Length", 0))
+                body: bytes = self.rfile.read(length)
+                # Yarıda kesilen istekler gerçek sunucudaki gibi işlenmez
+                if len(body) < length:
+                    self.close_connection = True
+                    return
+                content_type: str = self.headers.get("Content-Type", "")
+
+                params: dict = {}
+                files: dict[str, tuple[str, bytes]] = {}
+                if content_type.startswith("multipart/form-data"):
+                    message = BytesParser(policy=default).parsebytes(
+                        f"Content-Type: {content_type}\r\n\r\n".encode() + body
+                    )
+                    for part in message.iter_parts():
+                        name: str | None = part.get_param("name", header="content-disposition")
+                        if part.get_filename():
+                            files[name] = (part.get_filename(), part.get_payload(decode=True))
+                        else:
+                            params[name] = part.get_content().strip()
+                elif body:
+                    params = json.loads(body)
+
+                status, response = server.handle(method, params, files)
+                payload: bytes = json.dumps(response).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        return Handler
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("server", choices=["botapi", "gofile", "cloudmail"])
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--files", type=int, default=20, help="sağlayıcı sunucusundaki dosya sayısı")
+    parser.add_argument("--size", type=int, default=1024 * 1024, help="dosya boyutu (byte)")
+    parser.add_argument("--folders", type=int, default=4, help="dosyaların dağıtılacağı klasör sayısı")
+    parser.add_argument("--depth", type=int, default=1, help="klasör derinliği")
+    parser.add_argument("--latency", type=float, default=0.0, help="yanıt başına gecikme (sn)")
+    parser.add_argument("--bandwidth", type=int, default=0, help="bağlantı başına hız (byte/sn), 0 = sınırsız")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="503 ile reddedilen istek oranı")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="yarıda kesilen dosya akışı oranı")
+    parser.add_argument("--password", help="GoFile kök klasörünün parolası")
+    parser.add_argument("--flood-rate", type=float, default=0.0, help="botapi: RetryAfter ile reddedilen gönderim oranı")
+    args: argparse.Namespace = parser.parse_args()
+
+    if args.server == "botapi":
+        stub: FakeBotAPIServer = FakeBotAPIServer(port=args.port, flood_rate=args.flood_rate)
+        print(f"TG_APIURL={stub.api_url}")
+        stub._server.serve_forever()
+
+    options: dict = {
+        "port": args.port,
+        "latency": args.latency,
+        "bandwidth": args.bandwidth,
+        "fail_rate": args.fail_rate,
+        "drop_rate": args.drop_rate
+    }
+    provider: FileServer = FakeGoFileServer(password=args.password, **options) if args.server == "gofile" \
+        else FakeCloudMailServer(**options)
+    for name, size in make_tree(args.files, args.size, args.folders, args.depth).items():
+        provider.add(name, size)
+
+    if args.server == "gofile":
+        print(f"GF_APIURL={provider.base_url}")
+    else:
+        print(f"CM_APIURL={provider.base_url}/api/v2")
+    print(f"Link: {provider.base_url}{provider.ROOT}")
+    provider._server.serve_forever()
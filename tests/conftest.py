@@ -0,0 +1,74 @@
+"""Testlerin ortak ayarları ve sahte sunucu fixture'ları"""
+import os
+import sys
+from hashlib import md5
+
+import pytest
+
+# Paylaşılan nesneler ayarlarını ilk kullanımda ortamdan okur, bu yüzden bot içe aktarılmadan önce ayarlanır
+os.environ.update(
+    DL_CREDENTIALDB="",
+    DL_CACHEDB="",
+    BOT_JOURNAL="",
+    DL_DISKMARGIN="0",
+    DL_RETRYDELAY="0.01",
+    DL_RETRYMAXDELAY="0.05",
+    # Hata enjekte edilen sunucularda devre kesici testleri saniyelerce bekletmesin
+    DL_BREAKERFAILURES="1000",
+    TG_RATE="0",
+    TG_CHATRATE="0"
+)
+os.environ.pop("GF_TOKEN", None)
+os.environ.pop("DL_DOWNLOADDIRS", None)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fakeservers import FakeCloudMailServer, FakeGoFileServer, make_content, make_tree, mailru_hash  # noqa: E402
+
+
+@pytest.fixture
+def tree() -> dict[str, int]:
+    """Klasörlere dağıtılmış küçük dosyalar ve parçalı indirilecek büyük bir dosya"""
+    files: dict[str, int] = make_tree(24, 40 * 1024, folders=4, depth=2)
+    files["top.bin"] = 3 * 1024 * 1024
+    return files
+
+
+@pytest.fixture
+def gofile(tree, monkeypatch):
+    """Ağacı sunan, ara sıra 503 dönen sahte GoFile sunucusu"""
+    server: FakeGoFileServer = FakeGoFileServer(latency=0.002, fail_rate=0.02, seed=1).start()
+    for name, size in tree.items():
+        server.add(name, size)
+    monkeypatch.setenv("GF_APIURL", server.base_url)
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def cloudmail(tree, monkeypatch):
+    """Ağacı sayfa sayfa listeleyen, ara sıra 503 dönen sahte Cloud Mail.ru sunucusu"""
+    server: FakeCloudMailServer = FakeCloudMailServer(latency=0.002, fail_rate=0.02, seed=2).start()
+    for name, size in tree.items():
+        server.add(name, size)
+    monkeypatch.setenv("CM_APIURL", f"{server.base_url}/api/v2")
+    monkeypatch.setenv("CM_PAGESIZE", "3")
+    yield server
+    server.stop()
+
+
+def assert_downloaded(result: dict, root: str, tree: dict[str, int]) -> None:
+    """İndirme sonucunun ve dizindeki dosyaların ağaçla birebir aynı olduğunu doğrulama fonksiyonu"""
+    assert result["ok"], result["error"]
+    assert len(result["files"]) == len(tree)
+
+    for file in result["files"]:
+        assert file["state"] == "ok", file
+        name: str = next(key for key in tree if file["path"].endswith(f"/{key}"))
+        content: bytes = make_content(name, tree[name])
+        with open(file["path"], "rb") as f:
+            assert f.read() == content, name
+        assert file["hash"].lower() in (md5(content).hexdigest(), mailru_hash(content).lower()), name
+
+    # Yarım dosya, segment durumu veya başka bir işin dosyası kalmamalı
+    on_disk: list[str] = [os.path.join(dirpath, name) for dirpath, _, names in os.walk(root) for name in names]
+    assert sorted(on_disk) == sorted(file["path"] for file in result["files"])
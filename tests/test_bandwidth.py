@@ -0,0 +1,72 @@
+"""Sahte dosya sunucusuyla bant genişliği sınırlayıcısının adil paylaşım ve iş sınırı testleri"""
+from threading import Event, Thread
+from time import sleep
+
+from requests import get
+
+import bot
+from fakeservers import FileServer
+
+RATE: int = 1024 * 1024
+
+
+def measure(limiter: bot.BandwidthLimiter, jobs: dict[str, int], warmup: float = 0.5, duration: float = 2.0) -> dict[str, float]:
+    """Her işi verilen sayıda thread'le sınırlayıcıdan geçirerek indirip işlerin ölçülen hızını döndürme fonksiyonu"""
+    server: FileServer = FileServer().start()
+    url: str = server.add("stream.bin", 4 * 1024 * 1024)
+    stop: Event = Event()
+    received: dict[tuple[str, int], int] = {(job_id, worker): 0 for job_id, count in jobs.items() for worker in range(count)}
+
+    def stream(slot: tuple[str, int]) -> None:
+        # Küçük okumalar sınırlayıcının beklemelerini testin ölçüm aralığına göre ince tutar
+        reader: bot.ChunkReader = bot.ChunkReader(16 * 1024, 32 * 1024, 64 * 1024)
+
+        def on_chunk(size: int) -> None:
+            received[slot] += size
+
+        while not stop.is_set():
+            with get(url, stream=True, timeout=10) as response:
+                reader.copy(
+                    response, lambda view: None, on_chunk, stop.is_set,
+                    throttle=lambda size: limiter.throttle(slot[0], size, stop.is_set)
+                )
+
+    threads: list[Thread] = [Thread(target=stream, args=(slot,), daemon=True) for slot in received]
+    try:
+        for thread in threads:
+            thread.start()
+        sleep(warmup)
+        start: dict[tuple[str, int], int] = dict(received)
+        sleep(duration)
+        end: dict[tuple[str, int], int] = dict(received)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join(5)
+        server.stop()
+
+    return {
+        job_id: sum(end[slot] - start[slot] for slot in received if slot[0] == job_id) / duration for job_id in jobs
+    }
+
+
+def test_global_limit_is_shared_fairly_between_jobs():
+    limiter: bot.BandwidthLimiter = bot.BandwidthLimiter(global_rate=RATE)
+
+    # Üç thread'li iş tek thread'li işin payını alamaz
+    rates: dict[str, float] = measure(limiter, {"busy": 3, "single": 1})
+
+    assert sum(rates.values()) <= 1.1 * RATE
+    for rate in rates.values():
+        assert 0.35 * RATE <= rate <= 0.65 * RATE, rates
+
+
+def test_job_limit_is_enforced_next_to_unlimited_job():
+    limiter: bot.BandwidthLimiter = bot.BandwidthLimiter()
+    limiter.set_job("capped", RATE // 4)
+
+    rates: dict[str, float] = measure(limiter, {"capped": 2, "free": 1})
+
+    assert 0.8 * RATE / 4 <= rates["capped"] <= 1.2 * RATE / 4, rates
+    assert rates["free"] > RATE, rates
+    assert limiter.job_limit("capped") == RATE // 4 and limiter.job_limit("free") == 0
@@ -0,0 +1,43 @@
+"""Aynı süreçte eşzamanlı çalışan indiricilerin birbirinin dizinine karışmadığını doğrulayan testler"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import bot
+from conftest import assert_downloaded
+
+JOBS: int = 6
+
+
+def test_concurrent_jobs_keep_separate_trees(tmp_path, gofile, cloudmail, tree):
+    cwd: str = os.getcwd()
+    jobs: list[tuple[str, bot.Provider]] = []
+    for i in range(JOBS):
+        for server, downloader in ((gofile, bot.GoFileDownloader), (cloudmail, bot.CloudMailDownloader)):
+            root: str = str(tmp_path / f"{downloader.name}{i}")
+            jobs.append((root, downloader(f"{server.base_url}{server.ROOT}", max_workers=4, download_dir=root)))
+
+    with ThreadPoolExecutor(len(jobs)) as executor:
+        results: list[dict] = list(executor.map(lambda job: job[1].run(), jobs))
+
+    for (root, _), result in zip(jobs, results):
+        assert_downloaded(result, root, tree)
+    assert os.getcwd() == cwd
+    assert gofile.failures and cloudmail.failures
+
+
+def test_concurrent_batches_share_one_queue(tmp_path, gofile, tree):
+    # Her alt klasör ayrı bir link; toplu işlerdeki dosyalar ortak kuyruktan indirilir
+    folders: list[str] = sorted({name.partition("/")[0] for name in tree if "/" in name})
+    links: list[tuple[str, str | None]] = [(f"https://gofile.io/d/{gofile._folders[folder]}", None) for folder in folders]
+    roots: list[str] = [str(tmp_path / f"batch{i}") for i in range(3)]
+
+    with ThreadPoolExecutor(len(roots)) as executor:
+        results: list[dict] = list(executor.map(
+            lambda root: bot.download_batch(links, root, workers=6, crawl_workers=2), roots
+        ))
+
+    for root, result in zip(roots, results):
+        assert result["ok"]
+        for folder, link in zip(folders, result["links"]):
+            files: dict[str, int] = {name: size for name, size in tree.items() if name.startswith(f"{folder}/")}
+            assert_downloaded(link, os.path.join(root, gofile._folders[folder]), files)
@@ -0,0 +1,35 @@
+"""Süresi dolan GoFile token'ı ve Cloud Mail.ru page_id'sinin bir kez yenilendiğini doğrulayan testler"""
+import bot
+from conftest import assert_downloaded
+
+
+def test_rejected_gofile_token_is_refreshed_once(tmp_path, gofile, tree, monkeypatch):
+    monkeypatch.setattr(bot.CredentialCache, "_shared", None)
+    link: str = f"{gofile.base_url}{gofile.ROOT}"
+
+    first: dict = bot.GoFileDownloader(link, download_dir=str(tmp_path / "first")).run()
+    stale: str | None = bot.CredentialCache.shared().get("gofile:token")
+    assert first["ok"] and stale and gofile.accounts == 1
+
+    # Sunucu önbellekteki token'ı reddeder; eşzamanlı istekler tek bir yeni hesapta buluşur
+    gofile.expire_tokens()
+    result: dict = bot.GoFileDownloader(link, max_workers=4, download_dir=str(tmp_path / "second")).run()
+
+    assert_downloaded(result, str(tmp_path / "second"), tree)
+    assert gofile.accounts == 2
+    assert bot.CredentialCache.shared().get("gofile:token") not in (None, stale)
+
+
+def test_rejected_cloudmail_page_id_is_refreshed_once(tmp_path, cloudmail, tree, monkeypatch):
+    monkeypatch.setattr(bot.CredentialCache, "_shared", None)
+    link: str = f"{cloudmail.base_url}{cloudmail.ROOT}"
+
+    first: dict = bot.CloudMailDownloader(link, download_dir=str(tmp_path / "first")).run()
+    assert first["ok"] and cloudmail.pages == 1
+
+    cloudmail.page_id = "fakepage2"
+    result: dict = bot.CloudMailDownloader(link, max_workers=4, download_dir=str(tmp_path / "second")).run()
+
+    assert_downloaded(result, str(tmp_path / "second"), tree)
+    assert cloudmail.pages == 2
+    assert bot.CredentialCache.shared().get("cloudmail:page_id") == "fakepage2"
@@ -0,0 +1,103 @@
+"""Disk alanı kabul denetiminin bekleme, zaman aşımı ve birim yerleşimi testleri"""
+import os
+import shutil
+from collections import namedtuple
+from threading import Thread
+from time import perf_counter, sleep
+
+import pytest
+
+import bot
+from conftest import assert_downloaded
+
+DiskUsage = namedtuple("DiskUsage", "total used free")
+
+
+@pytest.fixture
+def free(monkeypatch) -> dict[str, int]:
+    """Dizinlerin boş alanını testin verdiği değerlerden okuyan `shutil.disk_usage`"""
+    space: dict[str, int] = {}
+
+    def disk_usage(directory: str) -> DiskUsage:
+        directory = os.path.abspath(directory)
+        volume: str = max((v for v in space if directory == v or directory.startswith(v + os.sep)), key=len)
+        return DiskUsage(space[volume], 0, space[volume])
+
+    monkeypatch.setattr(shutil, "disk_usage", disk_usage)
+    return space
+
+
+def test_reserve_waits_until_space_is_released(tmp_path, free):
+    directory: str = str(tmp_path)
+    free[directory] = 1000
+    disk: bot.DiskAdmission = bot.DiskAdmission(timeout=0.05, poll=0.01)
+    assert disk.reserve(directory, 600)
+
+    waits: list[int] = []
+    results: list[bool] = []
+    thread: Thread = Thread(target=lambda: results.append(disk.reserve(directory, 600, on_wait=waits.append)))
+    thread.start()
+    sleep(0.3)
+
+    # Başka dosyaya ayrılmış yer varken zaman aşımı işlemez, o dosya bitince yer açılabilir
+    assert thread.is_alive() and waits == [400]
+    disk.release(directory, 600)
+    thread.join(1)
+    assert results == [True] and disk.available(directory) == 400
+
+
+def test_reserve_gives_up_when_nothing_can_free_space(tmp_path, free):
+    directory: str = str(tmp_path)
+    free[directory] = 1000
+    disk: bot.DiskAdmission = bot.DiskAdmission(margin=100, timeout=0.2, poll=0.01)
+
+    start: float = perf_counter()
+    assert not disk.reserve(directory, 950)
+    assert perf_counter() - start >= 0.2
+    assert not disk.reserve(directory, 950, cancelled=lambda: True)
+    assert disk.reserve(directory, 900) and disk.available(directory) == 0
+
+
+def test_jobs_are_spread_over_volumes(tmp_path, free):
+    volumes: list[str] = [str(tmp_path / "a"), str(tmp_path / "b")]
+    free.update({volumes[0]: 1000, volumes[1]: 2000})
+    disk: bot.DiskAdmission = bot.DiskAdmission(volumes)
+
+    # Eşitlikte boş yeri çok olan, sonra en az işi olan birim seçilir; aynı iş aynı birimde kalır
+    assert disk.place("first", None) == volumes[1]
+    assert disk.place("second", None) == volumes[0]
+    assert disk.place("first", None) == volumes[1]
+
+    disk.leave("second")
+    # Önceki çalışmadan dosyası kalan iş o birime döner
+    assert disk.place("resumed", None, os.path.join(volumes[1], "root", "f.bin")) == volumes[1]
+    assert disk.place("third", None) == volumes[0]
+    assert bot.DiskAdmission().place("job", "default") == "default"
+
+
+def test_provider_downloads_to_volume_with_most_space(tmp_path, gofile, tree, free, monkeypatch):
+    volumes: list[str] = [str(tmp_path / "a"), str(tmp_path / "b")]
+    free.update({volumes[0]: 10 * 1024 * 1024, volumes[1]: 100 * 1024 * 1024})
+    monkeypatch.setenv("DL_DOWNLOADDIRS", os.pathsep.join(volumes))
+    monkeypatch.setattr(bot.DiskAdmission, "_shared", None)
+
+    result: dict = bot.GoFileDownloader(f"{gofile.base_url}{gofile.ROOT}", max_workers=4).run()
+
+    assert_downloaded(result, volumes[1], tree)
+    assert not os.listdir(volumes[0])
+
+
+def test_file_larger_than_free_space_is_skipped(tmp_path, gofile, tree, free, monkeypatch):
+    free[str(tmp_path)] = 1024 * 1024
+    monkeypatch.setattr(bot.DiskAdmission, "_shared", bot.DiskAdmission(timeout=0.2, poll=0.01))
+
+    result: dict = bot.GoFileDownloader(
+        f"{gofile.base_url}{gofile.ROOT}", max_workers=4, download_dir=str(tmp_path)
+    ).run()
+
+    # Sığmayan dosya zaman aşımından sonra atlanır, diğerleri indirilir
+    states: dict[str, str] = {file["name"]: file["state"] for file in result["files"]}
+    assert not result["ok"] and states.pop("top.bin") == "failed"
+    assert set(states.values()) == {"ok"} and len(states) == len(tree) - 1
+    assert not [name for _, _, names in os.walk(tmp_path) for name in names if name.startswith("top.bin")]
+    assert bot.DiskAdmission.shared().available(str(tmp_path)) == 1024 * 1024
@@ -0,0 +1,88 @@
+"""Yeniden başlatmada iş günlüğündeki yarım işin kaldığı yerden devam ettiğini doğrulayan testler"""
+import json
+import os
+from hashlib import md5
+from time import perf_counter, sleep
+
+import bot
+from fakeservers import FakeGoFileServer, make_content
+
+PART: int = 1024 * 1024
+
+
+def wait_for(condition, timeout: float = 10.0) -> None:
+    """Koşul sağlanana kadar bekleme fonksiyonu"""
+    deadline: float = perf_counter() + timeout
+    while not condition():
+        assert perf_counter() < deadline, "koşul sağlanmadı"
+        sleep(0.01)
+
+
+def test_unfinished_job_resumes_from_part_and_segment_files(tmp_path, monkeypatch):
+    # Segment boyutu küçültülür; büyük dosyanın son segmenti kısa olduğu için kesintiden önce biter,
+    # `fresh.bin` dosyasının hiçbir segmenti bitmez
+    monkeypatch.setattr(bot, "SEGMENT_MIN_SIZE", PART)
+    tree: dict[str, int] = {"big.bin": 2 * PART + 12345, "fresh.bin": 2 * PART, "small.bin": PART}
+    server: FakeGoFileServer = FakeGoFileServer(bandwidth=PART).start()
+    for name, size in tree.items():
+        server.add(name, size)
+    monkeypatch.setenv("GF_APIURL", server.base_url)
+
+    db_path: str = str(tmp_path / "jobs.db")
+    dest: str = str(tmp_path / "out")
+    big: str = os.path.join(dest, "root", "big.bin")
+
+    def scheduler(journal: bot.JobJournal) -> bot.JobScheduler:
+        def run_job(job: bot.DownloadJob) -> None:
+            bot.GoFileDownloader(
+                job.url, job.password, max_workers=10, segments=4, cancel_event=job.cancel_event,
+                journal=journal, job_id=job.id, download_dir=dest
+            ).run()
+
+        return bot.JobScheduler(run_job, journal=journal)
+
+    def segments_done() -> list[int]:
+        try:
+            with open(f"{big}.segments") as f:
+                return json.load(f)["done"]
+        except (OSError, ValueError):
+            return []
+
+    try:
+        journal: bot.JobJournal = bot.JobJournal(db_path)
+        first: bot.JobScheduler = scheduler(journal)
+        job: bot.DownloadJob = first.submit(1, "https://gofile.io/d/root", None, "gofile")
+
+        # Kısa segment bitip diğer segmentler ve tek parçalı dosya yarıya gelmeden bot kapanır
+        wait_for(lambda: segments_done() == [2])
+        sleep(0.3)
+        first.shutdown()
+
+        assert not [name for name in tree if os.path.exists(os.path.join(dest, "root", name))]
+        offsets: dict[str, int] = {name: bot.resume_offset(os.path.join(dest, "root", name)) for name in tree}
+        assert offsets == {"big.bin": 12345, "fresh.bin": 0, "small.bin": offsets["small.bin"]}
+        assert 0 < offsets["small.bin"] < PART
+        keys: dict[str, str] = {
+            name: f"gofile:md5:{md5(make_content(name, size)).hexdigest()}:{size}" for name, size in tree.items()
+        }
+        assert {journal.file_state(job.id, key) for key in keys.values()} == {"yarım"}
+
+        # Yeniden başlatmada günlük yeni bağlantıyla açılır, iş aynı numarayla kuyruğa alınır
+        resumed: bot.JobJournal = bot.JobJournal(db_path)
+        assert resumed.unfinished() == [(job.id, 1, "https://gofile.io/d/root", None, "gofile")]
+        received: float = bot.Metrics.shared().value("dl_bytes_total", provider="gofile")
+        second: bot.JobScheduler = scheduler(resumed)
+        assert [again.id for again in second.resume()] == [job.id]
+        wait_for(lambda: second.jobs()[0].finished, 30)
+        second.shutdown()
+    finally:
+        server.stop()
+
+    assert second.jobs()[0].state == "tamamlandı" and not resumed.unfinished()
+    # Yalnızca eksik kalan byte'lar indirilir: yarım segment baştan, tek parçalı dosya kaldığı yerden
+    assert bot.Metrics.shared().value("dl_bytes_total", provider="gofile") - received == \
+        sum(size - offsets[name] for name, size in tree.items())
+    for name, size in tree.items():
+        with open(os.path.join(dest, "root", name), "rb") as f:
+            assert f.read() == make_content(name, size)
+    assert sorted(os.listdir(os.path.join(dest, "root"))) == sorted(tree)
@@ -0,0 +1,88 @@
+"""Dosyaları diske yazmadan Telegram'a aktaran relay modunun ve disk yoluna dönüşünün testleri"""
+import os
+
+import pytest
+from telegram import Bot
+
+import bot
+from fakeservers import FakeBotAPIServer, FakeGoFileServer, make_content
+from test_telegram import delivered
+
+
+@pytest.fixture
+def relay(monkeypatch) -> list[str]:
+    """Relay modunu açıp disk yoluyla indirilen dosyaların adlarını toplayan fixture"""
+    monkeypatch.setenv("TG_RELAY", "1")
+    monkeypatch.setenv("TG_RELAYWORKERS", "8")
+    monkeypatch.setenv("TG_UPLOADRETRIES", "20")
+    monkeypatch.setattr(bot.Provider, "_relay_slots", None)
+    on_disk: list[str] = []
+    download_content = bot.Provider._download_content
+
+    def recording_download_content(self, file_info: dict) -> None:
+        on_disk.append(file_info["name"])
+        download_content(self, file_info)
+
+    monkeypatch.setattr(bot.Provider, "_download_content", recording_download_content)
+    return on_disk
+
+
+def run(tmp_path, files: FakeGoFileServer, tree: dict[str, int], monkeypatch) -> tuple[dict, FakeBotAPIServer]:
+    """Ağacı sahte GoFile sunucusundan sahte Bot API sunucusuna gönderme fonksiyonu"""
+    server: FakeBotAPIServer = FakeBotAPIServer().start()
+    for name, size in tree.items():
+        files.add(name, size)
+    monkeypatch.setenv("GF_APIURL", files.base_url)
+
+    try:
+        tg: Bot = Bot(token="123:abc", base_url=server.api_url)
+        result: dict = bot.GoFileDownloader(
+            "https://gofile.io/d/root", bot=tg, chat_id=6, max_workers=4, download_dir=str(tmp_path)
+        ).run()
+    finally:
+        files.stop()
+        server.stop()
+
+    return result, server
+
+
+def test_relay_uploads_without_touching_disk(tmp_path, relay, monkeypatch):
+    tree: dict[str, int] = {f"d/r{i}.bin": 50 * 1024 + i for i in range(10)}
+    result, server = run(tmp_path, FakeGoFileServer(latency=0.002).start(), tree, monkeypatch)
+
+    assert result["ok"] and relay == []
+    documents: dict[str, list[bytes]] = delivered(server)
+    assert documents == {os.path.basename(name): [make_content(name, size)] for name, size in tree.items()}
+    assert not [name for _, _, names in os.walk(tmp_path) for name in names]
+
+
+def test_relay_falls_back_to_disk_for_unknown_or_large_sizes(tmp_path, relay, monkeypatch):
+    monkeypatch.setenv("TG_MAXUPLOAD", "64K")
+    monkeypatch.setenv("TG_PARTSIZE", "64K")
+    files: FakeGoFileServer = FakeGoFileServer().start()
+    tree: dict[str, int] = {"small.bin": 30 * 1024, "big.bin": 100 * 1024, "unknown.bin": 20 * 1024}
+    # Servis boyut bildirmezse dosya relay edilemez
+    files.add("unknown.bin", tree["unknown.bin"])
+    next(item for item in files.contents.values() if item["name"] == "unknown.bin")["size"] = 0
+    result, server = run(tmp_path, files, {name: size for name, size in tree.items() if name != "unknown.bin"}, monkeypatch)
+
+    assert result["ok"] and sorted(relay) == ["big.bin", "unknown.bin"]
+    content: bytes = make_content("big.bin", tree["big.bin"])
+    assert delivered(server) == {
+        "small.bin": [make_content("small.bin", tree["small.bin"])],
+        "unknown.bin": [make_content("unknown.bin", tree["unknown.bin"])],
+        "big.bin.001": [content[:64 * 1024]],
+        "big.bin.002": [content[64 * 1024:]]
+    }
+
+
+def test_dropped_relay_stream_is_downloaded_to_disk(tmp_path, relay, monkeypatch):
+    files: FakeGoFileServer = FakeGoFileServer(drop_rate=0.3, seed=8).start()
+    tree: dict[str, int] = {f"d/r{i}.bin": 300 * 1024 + i for i in range(10)}
+    result, server = run(tmp_path, files, tree, monkeypatch)
+
+    assert result["ok"] and files.failures and relay
+    # Yarıda kalan yükleme Telegram'a ulaşmaz, her dosya bir kez ve eksiksiz gönderilir
+    documents: dict[str, list[bytes]] = delivered(server)
+    assert documents == {os.path.basename(name): [make_content(name, size)] for name, size in tree.items()}
+    assert not [name for _, _, names in os.walk(tmp_path) for name in names]
@@ -0,0 +1,52 @@
+"""Sahte sunuculardaki 503 ve yarıda kesilen akışlarla yeniden deneme testleri"""
+from requests import get
+
+import bot
+from conftest import assert_downloaded
+from fakeservers import FakeGoFileServer, FileServer
+
+
+def test_retry_policy_recovers_from_503():
+    server: FileServer = FileServer(fail_rate=0.5, seed=3).start()
+    try:
+        url: str = server.add("file.bin", 1000)
+        policy: bot.RetryPolicy = bot.RetryPolicy(attempts=10, base_delay=0.001, max_delay=0.01, breaker_failures=100)
+        response = policy.call(url, lambda: get(url, timeout=5))
+    finally:
+        server.stop()
+
+    assert response.status_code == 200
+    assert len(response.content) == 1000
+    assert server.failures and server.requests == server.failures + 1
+
+
+def test_retry_policy_returns_last_503_and_opens_breaker():
+    server: FileServer = FileServer(fail_rate=1.0).start()
+    try:
+        url: str = server.add("file.bin", 1000)
+        policy: bot.RetryPolicy = bot.RetryPolicy(
+            attempts=3, base_delay=0.001, max_delay=0.01, breaker_failures=3, breaker_cooldown=60
+        )
+        response = policy.call(url, lambda: get(url, timeout=5))
+
+        assert response.status_code == 503
+        assert server.requests == 3
+        # Devre açıkken istek ağa çıkmaz
+        assert policy.blocked(url.split("/")[2]) > 0
+    finally:
+        server.stop()
+
+
+def test_download_survives_503_and_dropped_streams(tmp_path, monkeypatch, tree):
+    server: FakeGoFileServer = FakeGoFileServer(fail_rate=0.1, drop_rate=0.3, seed=4).start()
+    try:
+        for name, size in tree.items():
+            server.add(name, size)
+        monkeypatch.setenv("GF_APIURL", server.base_url)
+
+        result: dict = bot.download("https://gofile.io/d/root", str(tmp_path), workers=4)
+    finally:
+        server.stop()
+
+    assert_downloaded(result, str(tmp_path), tree)
+    assert server.failures
@@ -0,0 +1,127 @@
+"""Parçalı indirmenin kaldığı yerden devam etme ve kopan bağlantıyı tamamlama testleri"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import md5
+from threading import Event
+
+from requests import get
+
+import bot
+from fakeservers import FileServer, make_content
+
+SIZE: int = 4 * bot.SEGMENT_MIN_SIZE
+
+
+def test_segmented_download_resumes_missing_segments(tmp_path):
+    server: FileServer = FileServer().start()
+    url: str = server.add("big.bin", SIZE)
+    target: str = str(tmp_path / "big.bin")
+    ranges: list[str] = []
+
+    def recording_get(url: str, **kwargs):
+        ranges.append(kwargs["headers"]["Range"])
+        return get(url, **kwargs)
+
+    try:
+        cancel: Event = Event()
+        first: bot.SegmentedDownload = bot.SegmentedDownload(url, target, SIZE, {}, 4, recording_get, cancel)
+
+        # Havuz verilmeyince segmentler sırayla indirilir; ikinci segment bitince iş kesilir
+        def on_progress(downloaded: int) -> None:
+            if downloaded >= 2 * first.segment_size:
+                cancel.set()
+
+        assert not first.run(None, on_progress)
+        assert os.path.isfile(f"{target}.segments") and not os.path.exists(target)
+
+        ranges.clear()
+        hasher: bot.StreamHasher = bot.StreamHasher(f"{target}.part", "md5", md5(make_content("big.bin", SIZE)).hexdigest())
+        second: bot.SegmentedDownload = bot.SegmentedDownload(url, target, SIZE, {}, 4, recording_get, hasher=hasher)
+        assert second.downloaded == 2 * second.segment_size
+        assert second.run(None, lambda downloaded: None)
+    finally:
+        server.stop()
+
+    # Yalnızca eksik segmentler istenir, tamamlananlar yeniden indirilmez
+    assert ranges and all(int(value[6:].split("-")[0]) >= 2 * second.segment_size for value in ranges)
+    with open(target, "rb") as f:
+        assert f.read() == make_content("big.bin", SIZE)
+    assert not os.path.exists(f"{target}.segments") and not os.path.exists(f"{target}.part")
+
+
+def test_segmented_download_reconnects_dropped_streams(tmp_path):
+    server: FileServer = FileServer(drop_rate=0.5, seed=4).start()
+    url: str = server.add("big.bin", SIZE)
+    target: str = str(tmp_path / "big.bin")
+    retry: bot.RetryPolicy = bot.RetryPolicy(attempts=10, base_delay=0.001, max_delay=0.01, breaker_failures=1000)
+
+    try:
+        download: bot.SegmentedDownload = bot.SegmentedDownload(url, target, SIZE, {}, 4, get, retry=retry)
+        assert download.run(None, lambda downloaded: None)
+    finally:
+        server.stop()
+
+    assert server.failures
+    with open(target, "rb") as f:
+        assert f.read() == make_content("big.bin", SIZE)
+
+
+def test_cancel_before_first_segment_is_not_taken_as_complete(tmp_path):
+    server: FileServer = FileServer().start()
+    url: str = server.add("big.bin", SIZE)
+    target: str = str(tmp_path / "big.bin")
+
+    try:
+        cancel: Event = Event()
+        first: bot.SegmentedDownload = bot.SegmentedDownload(url, target, SIZE, {}, 4, get, cancel)
+        # İlk blok yazılır yazılmaz iş kesilir, hiçbir segment tamamlanmaz
+        assert not first.run(None, lambda downloaded: cancel.set())
+        assert os.path.getsize(f"{target}.part") == SIZE
+
+        # Baştan tam boyutta ayrılan .part tamamlanmış sayılmaz ve iş günlüğüne indirilmiş yazılmaz
+        assert not bot.promote_complete_part(target, SIZE)
+        assert bot.resume_offset(target) == 0 and not os.path.exists(target)
+
+        second: bot.SegmentedDownload = bot.SegmentedDownload(url, target, SIZE, {}, 4, get)
+        assert second.downloaded == 0
+        assert second.run(None, lambda downloaded: None)
+    finally:
+        server.stop()
+
+    with open(target, "rb") as f:
+        assert f.read() == make_content("big.bin", SIZE)
+
+
+def test_split_parts_are_reported_in_order_across_resume(tmp_path):
+    part: int = 256 * 1024
+    size: int = 12 * part + 99
+    server: FileServer = FileServer(latency=0.01).start()
+    url: str = server.add("split.bin", size)
+    target: str = str(tmp_path / "split.bin")
+    cancel: Event = Event()
+    reported: list[int] = []
+
+    def on_part(part_path: str, index: int, length: int, digest: str) -> None:
+        reported.append(index)
+        if len(reported) == 3:
+            cancel.set()
+
+    try:
+        with ThreadPoolExecutor(4) as executor:
+            first: bot.SegmentedDownload = bot.SegmentedDownload(url, target, size, {}, 4, get, cancel, part)
+            assert not first.run(executor, lambda downloaded: None, on_part)
+            # Segmentler farklı sırada bitse de parçalar artan sırayla bildirilir
+            assert reported[:3] == [0, 1, 2] and reported == sorted(reported)
+
+            # İlk parça gönderilip silinmiş gibi davranılır, diğerleri diskte bekler
+            os.remove(first.part_path(0))
+            reported.clear()
+            second: bot.SegmentedDownload = bot.SegmentedDownload(url, target, size, {}, 4, get, Event(), part)
+            assert second.run(executor, lambda downloaded: None, on_part)
+    finally:
+        server.stop()
+
+    assert reported == list(range(1, second.count))
+    for index in reported:
+        with open(second.part_path(index), "rb") as f:
+            assert f.read() == make_content("split.bin", size)[index * part:(index + 1) * part]
@@ -0,0 +1,56 @@
+"""Kalıcı durum dosyalarının çalışma dizini yerine durum dizinine yazıldığını doğrulayan testler"""
+import os
+
+import bot
+
+
+def test_state_path_prefers_bot_statedir(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_STATE_HOME", str(tmp_path / "xdg"))
+    assert bot.state_path("x.db") == str(tmp_path / "xdg" / "gofile-cloudmail-bot" / "x.db")
+
+    monkeypatch.setenv("BOT_STATEDIR", str(tmp_path / "state"))
+    assert bot.state_path("x.db") == str(tmp_path / "state" / "x.db")
+    assert os.path.isdir(tmp_path / "state")
+
+
+def test_file_id_cache_defaults_to_state_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("BOT_STATEDIR", str(tmp_path / "state"))
+    monkeypatch.delenv("DL_CACHEDB")
+    monkeypatch.setattr(bot.FileIdCache, "_shared", None)
+
+    assert bot.FileIdCache.shared() is not None
+    assert "filecache.db" in os.listdir(tmp_path / "state")
+    assert os.listdir(tmp_path) == ["state"]
+
+    monkeypatch.setenv("DL_CACHEDB", "")
+    monkeypatch.setattr(bot.FileIdCache, "_shared", None)
+    assert bot.FileIdCache.shared() is None
+
+
+def test_job_journal_defaults_to_state_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("BOT_STATEDIR", str(tmp_path / "state"))
+    monkeypatch.delenv("BOT_JOURNAL")
+    monkeypatch.setattr(bot.JobJournal, "_shared", None)
+
+    assert bot.JobJournal.shared() is not None
+    assert "jobs.db" in os.listdir(tmp_path / "state")
+    assert os.listdir(tmp_path) == ["state"]
+
+
+def test_library_keeps_credentials_in_memory(tmp_path, monkeypatch, gofile, tree):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("BOT_STATEDIR", str(tmp_path / "state"))
+    monkeypatch.delenv("DL_CREDENTIALDB")
+    monkeypatch.setattr(bot.CredentialCache, "_shared", None)
+
+    result: dict = bot.download("https://gofile.io/d/root", str(tmp_path / "out"))
+
+    assert result["ok"] and len(result["files"]) == len(tree)
+    # GoFile token'ı ne çalışma dizinine ne de durum dizinine yazılır
+    assert os.listdir(tmp_path) == ["out"]
+
+    monkeypatch.setattr(bot.CredentialCache, "_shared", None)
+    bot.CredentialCache.shared(persist=True)
+    assert "credentials.db" in os.listdir(tmp_path / "state")
@@ -0,0 +1,285 @@
+"""Sahte Bot API sunucusuyla gönderim hattı testleri"""
+import os
+from typing import Any
+
+import pytest
+from telegram import Bot
+from telegram.error import BadRequest, NetworkError, TimedOut
+
+import bot
+from fakeservers import FakeBotAPIServer, FakeGoFileServer, make_content
+
+
+class RejectingBotAPIServer(FakeBotAPIServer):
+    """`bad.bin` adlı belgeyi her seferinde geçersiz sayan sahte sunucu"""
+
+    def _document(self, document, files, message_id):
+        info = super()._document(document, files, message_id)
+        return None if info and info["file_name"] == "bad.bin" else info
+
+
+@pytest.fixture
+def stub():
+    server: FakeBotAPIServer = FakeBotAPIServer().start()
+    yield server
+    server.stop()
+
+
+def write_files(directory, sizes: dict[str, int]) -> list[str]:
+    """Verilen boyutlarda test dosyaları oluşturup yollarını döndürme fonksiyonu"""
+    paths: list[str] = []
+    for name, size in sizes.items():
+        paths.append(str(directory / name))
+        with open(paths[-1], "wb") as f:
+            f.write(make_content(name, size))
+    return paths
+
+
+def delivered(server: FakeBotAPIServer) -> dict[str, list[bytes]]:
+    """Sunucunun kabul ettiği belgeleri ada göre döndürme fonksiyonu"""
+    documents: dict[str, list[bytes]] = {}
+    for call in server.calls:
+        if call["method"] in ("sendDocument", "sendMediaGroup") and call["status"] == 200:
+            for name, content in call["files"].values():
+                documents.setdefault(name, []).append(content)
+    return documents
+
+
+def make_pipeline(tg: Bot, chat_id: int, **options) -> bot.UploadPipeline:
+    """Sahte sunucuya gönderen yükleme hattı oluşturma fonksiyonu"""
+    return bot.UploadPipeline(
+        lambda file_path: bot.send_document(tg, chat_id, file_path),
+        send_text=lambda text: tg.send_message(chat_id, text),
+        send_group=lambda file_paths: bot.send_media_group(tg, chat_id, file_paths),
+        chat_id=chat_id,
+        **options
+    )
+
+
+def test_local_bot_api_sends_file_uris(tmp_path, stub, monkeypatch):
+    monkeypatch.setenv("TG_APIURL", stub.api_url)
+    tg: Bot = Bot(token="123:abc", base_url=stub.api_url)
+    first, second = write_files(tmp_path, {"a.bin": 5000, "b.bin": 7000})
+
+    message = bot.send_document(tg, 1, first)
+    messages: list = bot.send_media_group(tg, 1, [first, second])
+
+    assert message.document.file_size == 5000
+    assert [m.document.file_size for m in messages] == [5000, 7000]
+    # Yerel sunucuda dosya baytları istekle taşınmaz
+    assert stub.calls[0]["params"]["document"].startswith("file://")
+    assert not any(call["files"] for call in stub.calls)
+
+
+def test_pipeline_sends_waiting_small_files_as_groups(tmp_path, stub):
+    tg: Bot = Bot(token="123:abc", base_url=stub.api_url)
+    sizes: dict[str, int] = {f"s{i}.bin": 1000 + i for i in range(12)}
+    sizes["large.bin"] = 200 * 1024
+    paths: list[str] = write_files(tmp_path, sizes)
+    sent: list = []
+
+    # Sohbetin sırası beklenirken kuyrukta biriken küçük dosyalar gruplanır
+    bot.TelegramRateLimiter.shared().pause(2, 0.3)
+    pipeline: bot.UploadPipeline = make_pipeline(tg, 2, workers=2, group_size=100 * 1024)
+    for file_path in paths:
+        pipeline.put(file_path, 0, sent.append)
+    pipeline.close()
+
+    documents: dict[str, list[bytes]] = delivered(stub)
+    assert {name: len(contents) for name, contents in documents.items()} == {name: 1 for name in sizes}
+    assert all(documents[name][0] == make_content(name, size) for name, size in sizes.items())
+    groups: list[dict] = [call for call in stub.calls if call["method"] == "sendMediaGroup"]
+    assert groups and all(2 <= len(call["files"]) <= bot.UploadPipeline.GROUP_LIMIT for call in groups)
+    assert all("large.bin" not in dict(call["files"].values()) for call in groups)
+    assert len(sent) == len(sizes) and not pipeline.failed
+    assert not os.listdir(tmp_path)
+
+
+def test_pipeline_waits_out_flood_replies(tmp_path):
+    server: FakeBotAPIServer = FakeBotAPIServer(flood_rate=0.4, retry_after=1, seed=7).start()
+    tg: Bot = Bot(token="123:abc", base_url=server.api_url)
+    sizes: dict[str, int] = {f"f{i}.bin": 2000 + i for i in range(8)}
+    paths: list[str] = write_files(tmp_path, sizes)
+    floods: float = bot.Metrics.shared().value("tg_retry_after_total")
+
+    try:
+        pipeline: bot.UploadPipeline = make_pipeline(tg, 3, workers=3, retries=20)
+        for file_path in paths:
+            pipeline.put(file_path)
+        pipeline.close()
+    finally:
+        server.stop()
+
+    assert server.floods and bot.Metrics.shared().value("tg_retry_after_total") - floods == server.floods
+    assert {name: len(contents) for name, contents in delivered(server).items()} == {name: 1 for name in sizes}
+    assert not pipeline.failed and not os.listdir(tmp_path)
+
+    # Reddedilen dosya Telegram'ın istediği süre dolmadan yeniden gönderilmez
+    for name in sizes:
+        times: list[tuple[float, bool]] = [
+            (call["time"], call["flood"]) for call in server.calls
+            if name in (file_name for file_name, _ in call["files"].values())
+        ]
+        for (flood_time, flood), (retry_time, _) in zip(times, times[1:]):
+            assert flood and retry_time - flood_time >= 0.9
+
+
+def test_unsent_files_stay_in_download_dir(tmp_path, monkeypatch):
+    files: FakeGoFileServer = FakeGoFileServer().start()
+    server: RejectingBotAPIServer = RejectingBotAPIServer(flood_rate=0.2, retry_after=0, seed=3).start()
+    tree: dict[str, int] = {f"d/s{i}.bin": 3000 + i for i in range(15)}
+    tree["d/bad.bin"] = 1000
+    for name, size in tree.items():
+        files.add(name, size)
+    monkeypatch.setenv("GF_APIURL", files.base_url)
+    monkeypatch.setenv("TG_GROUPSIZE", "10M")
+    monkeypatch.setenv("TG_UPLOADRETRIES", "20")
+
+    try:
+        tg: Bot = Bot(token="123:abc", base_url=server.api_url)
+        result: dict = bot.GoFileDownloader(
+            "https://gofile.io/d/root", bot=tg, chat_id=4, download_dir=str(tmp_path)
+        ).run()
+    finally:
+        files.stop()
+        server.stop()
+
+    assert result["ok"]
+    documents: dict[str, list[bytes]] = delivered(server)
+    assert "bad.bin" not in documents
+    assert {name: len(contents) for name, contents in documents.items()} == {
+        os.path.basename(name): 1 for name in tree if not name.endswith("bad.bin")
+    }
+    left: list[str] = [os.path.join(dirpath, name) for dirpath, _, names in os.walk(tmp_path) for name in names]
+    assert left == [str(tmp_path / "root" / "d" / "bad.bin")]
+
+
+def test_split_file_parts_and_manifest_arrive_in_order(tmp_path, monkeypatch):
+    files: FakeGoFileServer = FakeGoFileServer(latency=0.002, seed=6).start()
+    server: FakeBotAPIServer = FakeBotAPIServer(flood_rate=0.1, retry_after=0, seed=6).start()
+    tree: dict[str, int] = {f"small/s{i}.bin": 2000 + i for i in range(12)}
+    tree["huge.bin"] = 2 * 1024 * 1024 + 123
+    for name, size in tree.items():
+        files.add(name, size)
+    monkeypatch.setenv("GF_APIURL", files.base_url)
+    monkeypatch.setenv("TG_MAXUPLOAD", "1M")
+    monkeypatch.setenv("TG_PARTSIZE", "256K")
+    monkeypatch.setenv("TG_UPLOADRETRIES", "20")
+
+    try:
+        tg: Bot = Bot(token="123:abc", base_url=server.api_url)
+        result: dict = bot.GoFileDownloader(
+            "https://gofile.io/d/root", bot=tg, chat_id=5, segments=4, download_dir=str(tmp_path)
+        ).run()
+    finally:
+        files.stop()
+        server.stop()
+
+    assert result["ok"]
+    # Bölünen dosyanın parçaları sırayla, özet mesajı da son parçanın arkasından gönderilir
+    order: list[str] = []
+    for call in server.calls:
+        if call["status"] != 200:
+            continue
+        if call["method"] == "sendMessage" and call["params"]["text"].startswith("📦 huge.bin"):
+            order.append("manifest")
+        order += [name for name, _ in call["files"].values() if name.startswith("huge.bin")]
+
+    parts: int = -(-tree["huge.bin"] // (256 * 1024))
+    assert order == [f"huge.bin.{index + 1:03d}" for index in range(parts)] + ["manifest"]
+    assert not [name for _, _, names in os.walk(tmp_path) for name in names]
+
+
+def test_cached_files_are_resent_within_rate_limits(tmp_path, monkeypatch):
+    files: FakeGoFileServer = FakeGoFileServer().start()
+    server: FakeBotAPIServer = FakeBotAPIServer(flood_rate=0.2, retry_after=1, seed=9).start()
+    tree: dict[str, int] = {f"c/c{i}.bin": 3000 + i for i in range(8)}
+    tree["c/split.bin"] = 300 * 1024
+    for name, size in tree.items():
+        files.add(name, size)
+    monkeypatch.setenv("GF_APIURL", files.base_url)
+    monkeypatch.setenv("TG_MAXUPLOAD", "128K")
+    monkeypatch.setenv("TG_PARTSIZE", "128K")
+    monkeypatch.setenv("TG_UPLOADRETRIES", "20")
+    monkeypatch.setattr(bot.FileIdCache, "_shared", bot.FileIdCache(str(tmp_path / "filecache.db")))
+    monkeypatch.setattr(bot.TelegramRateLimiter, "_shared", bot.TelegramRateLimiter(rate=0, chat_rate=20))
+
+    try:
+        tg: Bot = Bot(token="123:abc", base_url=server.api_url)
+        first: dict = bot.GoFileDownloader(
+            "https://gofile.io/d/root", bot=tg, chat_id=8, download_dir=str(tmp_path / "first")
+        ).run()
+        uploaded: int = len(server.calls)
+        floods: float = bot.Metrics.shared().value("tg_retry_after_total")
+        second: dict = bot.GoFileDownloader(
+            "https://gofile.io/d/root", bot=tg, chat_id=8, download_dir=str(tmp_path / "second")
+        ).run()
+    finally:
+        files.stop()
+        server.stop()
+
+    assert first["ok"] and second["ok"] and {file["state"] for file in second["files"]} == {"skipped"}
+    # Önbellekteki dosyalar yeniden yüklenmez; flood yanıtları beklenip aynı file_id yeniden denenir
+    resent: list[dict] = server.calls[uploaded:]
+    assert not any(call["files"] for call in resent)
+    assert any(call["flood"] for call in resent)
+    assert bot.Metrics.shared().value("tg_retry_after_total") - floods == sum(call["flood"] for call in resent)
+    documents: list[str] = [call["params"]["document"] for call in resent if call["method"] == "sendDocument"]
+    parts: int = -(-tree["c/split.bin"] // (128 * 1024))
+    assert len([call for call in resent if call["method"] == "sendDocument" and call["status"] == 200]) == \
+        len(tree) - 1 + parts == len(set(documents))
+    manifests: list[dict] = [call for call in resent if call["method"] == "sendMessage" and call["status"] == 200]
+    assert len(manifests) == 1 and manifests[0]["params"]["text"].startswith("📦 split.bin")
+
+    # Önbellekten gönderimler de sohbetin hız sınırına uyar
+    times: list[float] = [call["time"] for call in resent]
+    assert all(later - earlier >= 0.045 for earlier, later in zip(times, times[1:]))
+    for earlier, later in zip(resent, resent[1:]):
+        if earlier["flood"]:
+            assert later["time"] - earlier["time"] >= 0.9
+
+
+def test_workers_take_a_send_slot_only_for_items_they_send(tmp_path, stub, monkeypatch):
+    tg: Bot = Bot(token="123:abc", base_url=stub.api_url)
+    paths: list[str] = write_files(tmp_path, {f"g{i}.bin": 1000 + i for i in range(9)})
+    limiter: bot.TelegramRateLimiter = bot.TelegramRateLimiter.shared()
+    acquired: list[Any] = []
+    acquire = limiter.acquire
+
+    def counting_acquire(chat_id, cancelled=None) -> bool:
+        acquired.append(chat_id)
+        return acquire(chat_id, cancelled)
+
+    monkeypatch.setattr(limiter, "acquire", counting_acquire)
+    # Sohbet beklerken uyanan yükleyiciler dosyaları diğerinin grubuna kaptırsa da sıra harcamaz
+    limiter.pause(9, 0.3)
+    pipeline: bot.UploadPipeline = make_pipeline(tg, 9, workers=4, group_size=100 * 1024)
+    for file_path in paths:
+        pipeline.put(file_path)
+    pipeline.close()
+
+    assert {name: len(contents) for name, contents in delivered(stub).items()} == {f"g{i}.bin": 1 for i in range(9)}
+    assert len(acquired) == len(stub.calls)
+
+
+def test_only_transient_telegram_errors_are_retried(stub):
+    tg: Bot = Bot(token="123:abc", base_url=stub.api_url)
+    pipeline: bot.UploadPipeline = make_pipeline(tg, 10, retries=3)
+    errors: list[Exception] = [TimedOut(), NetworkError("bağlantı koptu")]
+
+    def flaky() -> str:
+        if errors:
+            raise errors.pop(0)
+        return "ok"
+
+    def bad_request() -> None:
+        errors.append(BadRequest("geçersiz dosya"))
+        raise errors[-1]
+
+    try:
+        assert pipeline._with_retries(flaky) == "ok" and not errors
+        with pytest.raises(BadRequest):
+            pipeline._with_retries(bad_request)
+        assert len(errors) == 1
+    finally:
+        pipeline.close()